@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Agrégation par fenêtres des données de vol
+------------------------------------------
+Ce script implémente une étape de prétraitement vectorisée qui réduit la fréquence
+des données de vol (1 kHz) avant leur mise en forme pour le modèle LSTM. Chaque
+fenêtre de `window` échantillons consécutifs est résumée par six statistiques par
+caractéristique, ce qui divise le nombre d'échantillons d'entraînement par `window`.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Agrégation vectorisée (sans boucle Python) : moyenne, écart-type, minimum,
+      maximum, dernière valeur et différence première (dernière - première valeur)
+      de chaque caractéristique sur chaque fenêtre.
+    - Étiquette de fenêtre : 1 si au moins un échantillon de la fenêtre est étiqueté crash.
+    - Noms des caractéristiques agrégées, pour l'analyse des résultats.
+    - Mise en cache des matrices agrégées par fichier et par taille de fenêtre
+      (fichiers `.npz`, nommés d'après le chemin absolu du fichier source), invalidée si
+      le fichier CSV source est plus récent.
+
+Bibliothèques requises :
+    - os, hashlib : Gestion des fichiers et répertoires du cache.
+    - numpy : Calcul vectorisé des statistiques.
+    - pandas : Lecture des fichiers CSV.
+    - selection_features_lib : Colonnes d'entrée retenues (le nom du cache en dépend).
+
+Utilisation :
+    1. Appelez `load_aggregated(file_path, window)` pour obtenir les données agrégées
+       (brutes, non normalisées) d'un fichier de vol.
+    2. `prepare_data(file_path, window=...)` de `modele_lstm_lib` utilise cette étape
+       puis normalise et met en forme les données pour le LSTM.
+
+Remarques :
+    - Les échantillons finaux qui ne remplissent pas une fenêtre complète sont ignorés.
+    - `window=1` ne réduit pas les données : utilisez directement `prepare_data`.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from selection_features_lib import feature_selection
+
+#%% CONSTANTES
+AGGREGATES = ("mean", "std", "min", "max", "last", "diff")
+
+#%% FONCTIONS
+def aggregate_windows(X, y, window):
+    """
+    Résume chaque fenêtre de `window` échantillons par six statistiques par caractéristique.
+
+    Paramètres:
+        - X (numpy.ndarray): Caractéristiques brutes, de forme (échantillons, caractéristiques).
+        - y (numpy.ndarray): Étiquettes (0 ou 1) de chaque échantillon.
+        - window (int): Nombre d'échantillons par fenêtre.
+
+    Retourne:
+        - X_agg (numpy.ndarray): Caractéristiques agrégées, de forme
+          (fenêtres, 6 * caractéristiques), dans l'ordre de `AGGREGATES`.
+        - y_agg (numpy.ndarray): Étiquette de chaque fenêtre (maximum des étiquettes).
+
+    Exceptions:
+        - ValueError: Si `window` est inférieur à 1 ou supérieur au nombre d'échantillons.
+    """
+    if window < 1 or window > len(X):
+        raise ValueError("La taille de fenêtre doit être comprise entre 1 et le nombre d'échantillons.")
+
+    n_windows = len(X) // window
+    W = np.asarray(X, dtype=np.float64)[:n_windows * window].reshape(n_windows, window, -1)
+    X_agg = np.concatenate([
+        W.mean(axis=1),
+        W.std(axis=1),
+        W.min(axis=1),
+        W.max(axis=1),
+        W[:, -1, :],
+        W[:, -1, :] - W[:, 0, :],
+    ], axis=1)
+    y_agg = np.asarray(y)[:n_windows * window].reshape(n_windows, window).max(axis=1)
+    return X_agg, y_agg
+
+
+def aggregated_feature_names(columns):
+    """
+    Construit les noms des caractéristiques agrégées.
+
+    Paramètres:
+        - columns (list of str): Noms des caractéristiques brutes.
+
+    Retourne:
+        - list of str: Noms de la forme 'altitude (m)_mean', dans l'ordre de `aggregate_windows`.
+    """
+    return [f"{column}_{aggregate}" for aggregate in AGGREGATES for column in columns]
+
+
+def load_aggregated(file_path, window, cache_folder="cache_agregation/"):
+    """
+    Lit un fichier de vol et retourne ses données agrégées, en utilisant le cache si possible.
+
+    Paramètres:
+        - file_path (str): Chemin vers le fichier CSV contenant les données.
+        - window (int): Nombre d'échantillons par fenêtre.
+        - cache_folder (str ou None): Dossier du cache (None pour désactiver le cache).
+
+    Retourne:
+        - X (numpy.ndarray): Caractéristiques agrégées non normalisées.
+        - y (numpy.ndarray): Étiquettes des fenêtres.
+
+    Remarque:
+        - Le fichier de cache est nommé d'après le chemin absolu du fichier source (deux
+          vols `flight_1.csv` de dossiers différents ont des entrées distinctes), la
+          taille de fenêtre et la sélection de colonnes ; il est recalculé si le fichier
+          source a été modifié depuis. Il est écrit sous un nom temporaire puis renommé :
+          plusieurs processus peuvent partager le cache sans lire une entrée partielle.
+    """
+    cache_path = None
+    if cache_folder is not None:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        source = hashlib.blake2b(os.path.abspath(file_path).encode(), digest_size=4).hexdigest()
+        cache_path = os.path.join(cache_folder, f"{name}_{source}_w{window}{feature_selection.tag}.npz")
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            with np.load(cache_path) as cached:
+                return cached["X"], cached["y"]
+
+    data = pd.read_csv(file_path, usecols=feature_selection.usecols())
+    X, y = aggregate_windows(feature_selection.select(data), data['crash'].values, window)
+
+    if cache_path is not None:
+        os.makedirs(cache_folder, exist_ok=True)
+        # Written under a temporary name then renamed: parallel workers never read a partial file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, X=X, y=y)
+        os.replace(tmp_path, cache_path)
+    return X, y
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure du compromis temps d'entraînement / performance selon la taille de fenêtre
+---------------------------------------------------------------------------------
+Ce script entraîne le modèle LSTM pour plusieurs tailles de fenêtre d'agrégation,
+l'évalue sur les fichiers de test et compare le temps d'entraînement aux métriques
+obtenues (F1-score, ROC AUC), afin de choisir la réduction de fréquence acceptable.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Paramètres :
+    - `windows` : Tailles de fenêtre comparées (1 : données brutes à 1 kHz).
+    - `threshold` : Seuil de référence des métriques.
+    - `results_file` : Fichier JSON de sortie.
+
+Bibliothèques requises :
+    - modele_lstm_lib : Entraînement (`train_model`) et évaluation (`evaluate_model`).
+    - sklearn : Normaliseur MinMaxScaler partagé, comme pour le modèle livré.
+
+Remarques :
+    - Le premier passage sur une taille de fenêtre remplit le cache d'agrégation ;
+      le temps de préparation est donc inclus dans la première mesure.
+"""
+
+import json
+import time
+from sklearn.preprocessing import MinMaxScaler
+from modele_lstm_lib import train_model, evaluate_model, training_folder
+
+testing_folder = "testing_flights/"
+windows = [1, 10, 100]
+threshold = 0.3
+results_file = "compromis_fenetrage.json"
+
+results = []
+for window in windows:
+    print(f"Fenêtre de {window} échantillon(s)")
+    start = time.perf_counter()
+    scaler = MinMaxScaler()  # shared by training and evaluation, as in production
+    model = train_model(training_folder, window, scaler=scaler)
+    train_time = time.perf_counter() - start
+
+    summary = evaluate_model(model, testing_folder, window, scaler=scaler).summary(threshold)
+    results.append({
+        "window": window,
+        "train_time_s": train_time,
+        "f1": summary["at_threshold"]["f1"],
+        "best_f1": summary["best"]["f1"],
+        "roc_auc": summary["roc_auc"],
+    })
+
+print(f"{'fenêtre':>8} {'entraînement (s)':>17} {'accélération':>13} {'F1':>6} {'F1 max':>7} {'AUC':>6}")
+for r in results:
+    speedup = results[0]["train_time_s"] / r["train_time_s"]
+    print(f"{r['window']:>8} {r['train_time_s']:>17.1f} {speedup:>12.1f}x "
+          f"{r['f1']:>6.3f} {r['best_f1']:>7.3f} {r['roc_auc']:>6.3f}")
+
+with open(results_file, "w") as f:
+    json.dump(results, f, indent=2)
+print(f"Résultats enregistrés dans '{results_file}'.")
@@ -1,10 +1,10 @@
 import numpy as np
 import pandas as pd
 import os
+import json
 
-# Créer un dossier pour sauvegarder les fichiers
-output_folder = "flights"
-os.makedirs(output_folder, exist_ok=True)
+# Début du crash, en fraction de la durée du vol
+CRASH_ONSET_FRACTION = 0.7
 
 def simulate_detailed_flight(flight_id, duration_s, scenario=None):
     """
@@ -75,7 +75,7 @@ def simulate_detailed_flight(flight_id, duration_s, scenario=None):
 
     # Intégration des scénarios de crash
     if scenario:
-        crash_start = int(num_points * 0.7)
+        crash_start = int(num_points * CRASH_ONSET_FRACTION)
         for i in range(crash_start, num_points):
             if scenario == "pitot_failure":
                 speed[i] = 0 if i % 2 == 0 else speed[i - 1] * np.random.uniform(0.9, 1.1)
@@ -126,18 +126,30 @@ def simulate_detailed_flight(flight_id, duration_s, scenario=None):
 
     return flight_data
 
-# Générer des vols avec répartition des crashs
+# Scénarios de crash simulés
 scenarios = ["pitot_failure", "stall", "hydraulic_failure", "icing", "engine_failure"]
-num_flights = 100  # Nombre total de vols
-crash_flights = int(num_flights * 0.2)
-normal_flights = num_flights - crash_flights
-
-for flight_id in range(num_flights):
-    if flight_id < crash_flights:
-        scenario = scenarios[flight_id % len(scenarios)]  # Répartition équitable des scénarios
-    else:
-        scenario = None  # Vol normal
-    flight_data = simulate_detailed_flight(flight_id, 3600, scenario)
-    file_name = os.path.join(output_folder, f"flight_{flight_id+1}.csv")
-    flight_data.to_csv(file_name, index=False)
-    print(f"Vol {flight_id} sauvegardé dans {file_name} avec crash={bool(scenario)} ({scenario if scenario else 'normal'})")
+
+if __name__ == "__main__":
+    # Créer un dossier pour sauvegarder les fichiers
+    output_folder = "flights"
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Générer des vols avec répartition des crashs
+    num_flights = 100  # Nombre total de vols
+    crash_flights = int(num_flights * 0.2)
+    normal_flights = num_flights - crash_flights
+
+    manifest = {}  # Scénario de chaque fichier, pour la validation croisée stratifiée
+    for flight_id in range(num_flights):
+        if flight_id < crash_flights:
+            scenario = scenarios[flight_id % len(scenarios)]  # Répartition équitable des scénarios
+        else:
+            scenario = None  # Vol normal
+        flight_data = simulate_detailed_flight(flight_id, 3600, scenario)
+        file_name = os.path.join(output_folder, f"flight_{flight_id+1}.csv")
+        flight_data.to_csv(file_name, index=False)
+        manifest[os.path.basename(file_name)] = scenario or "normal"
+        print(f"Vol {flight_id} sauvegardé dans {file_name} avec crash={bool(scenario)} ({scenario if scenario else 'normal'})")
+
+    with open(os.path.join(output_folder, "scenarios.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
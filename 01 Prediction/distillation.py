@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Distillation du modèle LSTM et rapport de comparaison
+-----------------------------------------------------
+Ce script entraîne les modèles élèves de `distillation_lib` à partir du modèle LSTM
+enregistré, puis compare enseignant et élèves : latence par échantillon, mémoire des
+paramètres, F1-score et aire sous la courbe ROC sur les fichiers de test.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Paramètres :
+    - `teacher_file` / `scaler_file` : Modèle et normaliseur enregistrés par `modele_lstm_lib`.
+    - `selection_file` : Colonnes retenues à l'entraînement (si le fichier existe).
+    - `students` : Élèves entraînés ('gru', 'conv', 'gbm').
+    - `seq_len` : Historique (échantillons) des élèves 'conv' et 'gbm'.
+    - `temperature`, `alpha` : Adoucissement et poids des sorties de l'enseignant.
+    - `latency_budget_us` : Budget de calcul par échantillon du détecteur embarqué.
+    - `threshold` : Seuil de référence des métriques.
+    - `report_file` : Fichier JSON du rapport.
+
+Bibliothèques requises :
+    - distillation_lib : Entraînement, évaluation et mesures des élèves.
+    - tensorflow.keras : Chargement de l'enseignant.
+
+Résultats attendus :
+    - Les élèves `modele_eleve_gru.h5`, `modele_eleve_conv.h5` et `modele_eleve_gbm.pkl`.
+    - Un tableau comparatif affiché et le rapport `rapport_distillation.json`.
+
+Remarques :
+    - Les données à 1 kHz donnent un budget naturel de 1000 µs par échantillon.
+    - Les élèves utilisent le normaliseur de l'enseignant.
+"""
+
+import os
+import json
+import pickle
+from tensorflow.keras.models import load_model
+from modele_lstm_lib import prepare_data, training_folder
+from distillation_lib import (train_students, evaluate_students, latest_input, measure_latency,
+                              model_memory_bytes)
+from selection_features_lib import feature_selection
+
+teacher_file = "modele_lstm_reduit_overfitting.h5"
+scaler_file = "modele_lstm_reduit_overfitting_scaler.pkl"
+selection_file = "selection_features.json"
+testing_folder = "testing_flights/"
+students = ("gru", "conv", "gbm")
+window = 1
+seq_len = 16
+temperature = 2.0
+alpha = 0.9
+epochs = 3
+latency_budget_us = 1000
+threshold = 0.3
+report_file = "rapport_distillation.json"
+
+if __name__ == "__main__":
+    teacher = load_model(teacher_file)
+    if os.path.exists(selection_file):
+        feature_selection.load(selection_file)
+    scaler = None
+    if os.path.exists(scaler_file):
+        with open(scaler_file, "rb") as f:
+            scaler = pickle.load(f)
+
+    trained = train_students(teacher, training_folder, students, scaler, window, seq_len, temperature, alpha, epochs)
+    for kind, student in trained.items():
+        if kind == "gbm":
+            with open("modele_eleve_gbm.pkl", "wb") as f:
+                pickle.dump(student, f)
+        else:
+            student.save(f"modele_eleve_{kind}.h5")
+
+    metrics, agreement = evaluate_students(teacher, trained, testing_folder, scaler, window, seq_len)
+
+    # One sample, shaped for each model
+    X, _ = prepare_data(os.path.join(testing_folder, sorted(os.listdir(testing_folder))[0]), window, scaler)
+    models = {"teacher": teacher, **trained}
+    report = {"latency_budget_us": latency_budget_us, "seq_len": seq_len, "temperature": temperature,
+              "alpha": alpha, "models": {}}
+    for name, model in models.items():
+        inputs = latest_input(name, X, seq_len)
+        summary = metrics[name].summary(threshold)
+        report["models"][name] = {
+            "latency": measure_latency(name, model, inputs),
+            "memory": model_memory_bytes(name, model),
+            "f1": summary["at_threshold"]["f1"],
+            "best_f1": summary["best"]["f1"],
+            "roc_auc": summary["roc_auc"],
+            "teacher_deviation": agreement.get(name, 0.0),
+        }
+
+    print(f"{'modèle':<10} {'latence (µs)':>13} {'p99 (µs)':>10} {'mémoire (ko)':>13} {'F1':>7} "
+          f"{'meilleur F1':>12} {'ROC AUC':>8} {'écart':>7} {'budget':>7}")
+    for name, r in report["models"].items():
+        within = "oui" if r["latency"]["p99_us"] <= latency_budget_us else "non"
+        print(f"{name:<10} {r['latency']['median_us']:>13.1f} {r['latency']['p99_us']:>10.1f} "
+              f"{r['memory']['bytes'] / 1024:>13.1f} {r['f1']:>7.3f} {r['best_f1']:>12.3f} "
+              f"{r['roc_auc']:>8.3f} {r['teacher_deviation']:>7.3f} {within:>7}")
+
+    with open(report_file, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Rapport enregistré dans '{report_file}'.")
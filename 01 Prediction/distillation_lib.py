@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+Distillation du modèle LSTM en modèles élèves de faible latence
+---------------------------------------------------------------
+Ce script implémente l'entraînement de petits modèles « élèves » à partir des sorties
+probabilistes du modèle LSTM « enseignant » sur les vols d'entraînement, afin d'obtenir
+un détecteur embarqué respectant un budget de calcul par échantillon.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Cibles de distillation : probabilités de l'enseignant adoucies par une température,
+      mélangées aux étiquettes réelles (`distillation_targets`).
+    - Trois élèves, chacun avec sa propre mise en forme des entrées (`student_inputs`),
+      sans matérialiser les fenêtres d'un vol entier :
+        - `gru` : une seule petite couche GRU, sur l'entrée de l'enseignant ;
+        - `conv` : convolutions 1-D causales dilatées sur les `seq_len` derniers échantillons,
+          fournis par lots (`tf.data`, `sequence_dataset`) ;
+        - `gbm` : arbres de décision boostés (scikit-learn) sur des statistiques glissantes
+          des `seq_len` derniers échantillons (mêmes agrégats que `agregation_lib`),
+          calculées par sommes cumulées et par blocs d'instants.
+    - Entraînement fichier par fichier (`train_students`) et évaluation en un seul passage
+      sur un dossier de test (`evaluate_students`).
+    - Mesure de la latence d'une prédiction sur un seul échantillon et de la mémoire des
+      paramètres de chaque modèle.
+
+Bibliothèques requises :
+    - os, time, pickle : Gestion des fichiers, mesures et taille des modèles.
+    - numpy : Mise en forme des entrées et statistiques glissantes.
+    - sklearn : Élève à base d'arbres boostés.
+    - tensorflow / tensorflow.keras : Élèves neuronaux et mesure de latence.
+    - modele_lstm_lib : Préparation des données.
+    - metriques_lib : Métriques d'évaluation en flux.
+    - agregation_lib : Liste des agrégats des statistiques glissantes.
+
+Utilisation :
+    Le script `distillation.py` entraîne les élèves à partir du modèle enregistré par
+    `modele_lstm_lib` et écrit le rapport de comparaison.
+
+Remarques :
+    - Les `seq_len - 1` premiers échantillons d'un vol n'ont pas d'historique complet :
+      le premier échantillon est répété pour compléter leur fenêtre.
+    - L'élève `gbm` est une régression sur les probabilités cibles, bornée à [0, 1].
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import time
+import pickle
+import numpy as np
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.ensemble import HistGradientBoostingRegressor
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import GRU, Conv1D, Cropping1D, Flatten, Dense, Input
+from modele_lstm_lib import prepare_data
+from metriques_lib import StreamingMetrics
+from agregation_lib import AGGREGATES
+
+#%% CONSTANTES
+STUDENTS = ("gru", "conv", "gbm")
+
+#%% FONCTIONS
+def distillation_targets(teacher_prob, y, temperature=2.0, alpha=0.9):
+    """
+    Calcule les cibles d'entraînement des élèves.
+
+    Paramètres:
+        - teacher_prob (numpy.ndarray): Probabilités de crash prédites par l'enseignant.
+        - y (numpy.ndarray): Étiquettes réelles (0 ou 1).
+        - temperature (float): Température d'adoucissement (1 : probabilités inchangées).
+        - alpha (float): Poids des probabilités de l'enseignant (1 - alpha : étiquettes réelles).
+
+    Retourne:
+        - numpy.ndarray: Cibles dans [0, 1], en float32.
+    """
+    p = np.clip(np.ravel(teacher_prob).astype(np.float64), 1e-7, 1 - 1e-7)
+    soft = 1 / (1 + np.exp(-np.log(p / (1 - p)) / temperature))
+    return (alpha * soft + (1 - alpha) * np.ravel(y)).astype(np.float32)
+
+
+def sequence_windows(X, seq_len):
+    """
+    Vue des `seq_len` derniers échantillons de chaque instant, sans copie des données.
+
+    Paramètres:
+        - X (numpy.ndarray): Caractéristiques normalisées, (échantillons, caractéristiques).
+        - seq_len (int): Longueur de l'historique.
+
+    Retourne:
+        - numpy.ndarray: Vue de forme (échantillons, seq_len, caractéristiques).
+
+    Remarque:
+        - Toute opération élément par élément sur la vue (ou son passage à `model.fit`)
+          crée un tableau `seq_len` fois plus grand que `X` : réservée aux petits
+          tableaux (mesure de latence). Pour un vol entier, utilisez `sequence_dataset`.
+    """
+    padded = np.concatenate([np.repeat(X[:1], seq_len - 1, axis=0), X])
+    return sliding_window_view(padded, seq_len, axis=0).transpose(0, 2, 1)
+
+
+def sequence_dataset(X, seq_len, targets=None, batch_size=512, shuffle=False, seed=0):
+    """
+    Lots des `seq_len` derniers échantillons de chaque instant, construits à la volée.
+
+    Paramètres:
+        - X (numpy.ndarray): Caractéristiques normalisées, (échantillons, caractéristiques).
+        - seq_len (int): Longueur de l'historique.
+        - targets (numpy.ndarray ou None): Cible de chaque instant (None : entrées seules).
+        - batch_size (int): Nombre de fenêtres par lot.
+        - shuffle (bool): Mélange l'ordre des fenêtres (entraînement).
+        - seed (int): Graine du mélange.
+
+    Retourne:
+        - tensorflow.data.Dataset: Lots de forme (lot, seq_len, caractéristiques), avec les
+          cibles si `targets` est fourni.
+
+    Remarque:
+        - Seul un lot de fenêtres est en mémoire à la fois, au lieu des
+          (échantillons, seq_len, caractéristiques) valeurs du vol entier.
+    """
+    padded = np.concatenate([np.repeat(X[:1], seq_len - 1, axis=0), X])
+    return tf.keras.utils.timeseries_dataset_from_array(padded, targets, seq_len, batch_size=batch_size,
+                                                        shuffle=shuffle, seed=seed)
+
+
+def window_features(X, seq_len, rows=slice(None), chunk_rows=16384):
+    """
+    Statistiques glissantes des `seq_len` derniers échantillons de chaque instant.
+
+    Paramètres:
+        - X (numpy.ndarray): Caractéristiques normalisées, (échantillons, caractéristiques).
+        - seq_len (int): Longueur de l'historique.
+        - rows (slice): Instants pour lesquels calculer les statistiques (tous par défaut).
+        - chunk_rows (int): Nombre d'instants traités à la fois.
+
+    Retourne:
+        - numpy.ndarray: (instants, caractéristiques * 6), dans l'ordre de `AGGREGATES`
+          (moyenne, écart-type, min, max, dernière valeur, différence dernière - première).
+
+    Remarque:
+        - Moyenne et écart-type sont obtenus par sommes cumulées (float64) : aucun
+          temporaire de taille (instants, seq_len, caractéristiques) n'est créé, et le
+          minimum et le maximum sont calculés par blocs de `chunk_rows` instants.
+    """
+    padded = np.concatenate([np.repeat(X[:1], seq_len - 1, axis=0), X])
+    windows = sliding_window_view(padded, seq_len, axis=0)  # (instants, features, seq_len) view
+    instants = np.arange(*rows.indices(len(X)))
+    out = np.empty((len(instants), len(AGGREGATES) * X.shape[1]), dtype=np.float32)
+    for a in range(0, len(instants), chunk_rows):
+        idx = instants[a:a + chunk_rows]
+        # Cumulative sums over the padded rows spanned by this block
+        segment = padded[idx[0]:idx[-1] + seq_len].astype(np.float64)
+        zero = np.zeros((1, segment.shape[1]))
+        c1 = np.concatenate([zero, np.cumsum(segment, axis=0)])
+        c2 = np.concatenate([zero, np.cumsum(segment ** 2, axis=0)])
+        local = idx - idx[0]
+        mean = (c1[local + seq_len] - c1[local]) / seq_len
+        var = (c2[local + seq_len] - c2[local]) / seq_len - mean ** 2
+        block = windows[idx]
+        features = {
+            "mean": mean,
+            "std": np.sqrt(np.maximum(var, 0)),
+            "min": block.min(axis=2),
+            "max": block.max(axis=2),
+            "last": padded[idx + seq_len - 1],
+            "diff": padded[idx + seq_len - 1] - padded[idx],
+        }
+        out[a:a + len(idx)] = np.hstack([features[name] for name in AGGREGATES])
+    return out
+
+
+def student_inputs(kind, X, seq_len=16, targets=None, batch_size=512, shuffle=False):
+    """
+    Met en forme les entrées d'un élève à partir des entrées de l'enseignant.
+
+    Paramètres:
+        - kind (str): Type d'élève ('gru', 'conv' ou 'gbm').
+        - X (numpy.ndarray): Entrées de l'enseignant, (échantillons, 1, caractéristiques).
+        - seq_len (int): Longueur de l'historique des élèves 'conv' et 'gbm'.
+        - targets, batch_size, shuffle: Voir `sequence_dataset` (élève 'conv' seulement).
+
+    Retourne:
+        - numpy.ndarray ou tensorflow.data.Dataset: Entrées de l'élève ; pour 'conv', un
+          `tf.data.Dataset` de lots (avec les cibles si `targets` est fourni).
+
+    Exceptions:
+        - ValueError: Si le type d'élève est inconnu.
+    """
+    if kind == "gru":
+        return X
+    if kind == "conv":
+        return sequence_dataset(X[:, -1], seq_len, targets, batch_size, shuffle)
+    if kind == "gbm":
+        return window_features(X[:, -1], seq_len)
+    raise ValueError(f"Élève inconnu : {kind}")
+
+
+def latest_input(kind, X, seq_len=16):
+    """
+    Entrée d'un modèle pour le dernier instant seulement, avec un lot de taille 1.
+
+    Paramètres:
+        - kind (str): Type de modèle ('teacher', 'gru', 'conv' ou 'gbm').
+        - X (numpy.ndarray): Entrées de l'enseignant, (échantillons, 1, caractéristiques).
+        - seq_len (int): Longueur de l'historique des élèves 'conv' et 'gbm'.
+
+    Retourne:
+        - numpy.ndarray: Entrée du dernier instant, pour la mesure de latence.
+    """
+    if kind in ("teacher", "gru"):
+        return X[-1:]
+    recent = X[-seq_len:, -1]
+    if kind == "conv":
+        return np.ascontiguousarray(sequence_windows(recent, seq_len)[-1:])
+    return window_features(recent, seq_len, slice(len(recent) - 1, None))
+
+
+def build_gru_student(input_shape, units=8):
+    """
+    Construit un élève à une seule petite couche GRU.
+
+    Paramètres:
+        - input_shape (tuple): (timesteps, caractéristiques).
+        - units (int): Nombre d'unités de la couche GRU.
+
+    Retourne:
+        - tensorflow.keras.models.Sequential: Modèle compilé.
+    """
+    model = Sequential([Input(input_shape), GRU(units), Dense(1, activation='sigmoid')])
+    model.compile(optimizer='adam', loss='binary_crossentropy')
+    return model
+
+
+def build_conv_student(input_shape, filters=8, kernel_size=2, dilations=(1, 2, 4, 8)):
+    """
+    Construit un élève à convolutions 1-D causales dilatées.
+
+    Paramètres:
+        - input_shape (tuple): (seq_len, caractéristiques).
+        - filters (int): Nombre de filtres de chaque couche.
+        - kernel_size (int): Taille des noyaux.
+        - dilations (tuple): Dilatation de chaque couche ; le champ réceptif vaut
+          1 + (kernel_size - 1) * sum(dilations) échantillons.
+
+    Retourne:
+        - tensorflow.keras.models.Sequential: Modèle compilé ; seule la sortie du dernier
+          instant est utilisée.
+    """
+    model = Sequential([Input(input_shape)])
+    for dilation in dilations:
+        model.add(Conv1D(filters, kernel_size, dilation_rate=dilation, padding='causal', activation='relu'))
+    model.add(Cropping1D((input_shape[0] - 1, 0)))  # last time step only
+    model.add(Flatten())
+    model.add(Dense(1, activation='sigmoid'))
+    model.compile(optimizer='adam', loss='binary_crossentropy')
+    return model
+
+
+def predict_student(kind, student, inputs, batch_size=4096):
+    """
+    Probabilités de crash prédites par un élève.
+
+    Paramètres:
+        - kind (str): Type d'élève.
+        - student: Modèle Keras ou HistGradientBoostingRegressor.
+        - inputs (numpy.ndarray): Entrées mises en forme par `student_inputs`.
+        - batch_size (int): Taille des lots des élèves Keras.
+
+    Retourne:
+        - numpy.ndarray: Probabilités, (échantillons,).
+    """
+    if kind == "gbm":
+        return np.clip(student.predict(inputs), 0, 1)
+    if isinstance(inputs, tf.data.Dataset):
+        return student.predict(inputs, verbose=0).ravel()
+    return student.predict(inputs, batch_size=batch_size, verbose=0).ravel()
+
+
+def predict_flight(kind, student, X, seq_len=16, batch_size=4096, chunk_rows=1 << 18):
+    """
+    Probabilités de crash prédites par un élève sur un vol entier, à mémoire bornée.
+
+    Paramètres:
+        - kind (str): Type d'élève.
+        - student: Modèle Keras ou HistGradientBoostingRegressor.
+        - X (numpy.ndarray): Entrées de l'enseignant, (échantillons, 1, caractéristiques).
+        - seq_len (int): Longueur de l'historique des élèves 'conv' et 'gbm'.
+        - batch_size (int): Taille des lots des élèves Keras.
+        - chunk_rows (int): Nombre d'instants dont les statistiques glissantes de l'élève
+          'gbm' sont calculées à la fois.
+
+    Retourne:
+        - numpy.ndarray: Probabilités, (échantillons,).
+    """
+    if kind == "gbm":
+        return np.concatenate([predict_student(kind, student, window_features(X[:, -1], seq_len, slice(a, a + chunk_rows)))
+                               for a in range(0, len(X), chunk_rows)])
+    return predict_student(kind, student, student_inputs(kind, X, seq_len, batch_size=batch_size), batch_size)
+
+
+def train_students(teacher, training_folder, kinds=STUDENTS, scaler=None, window=1, seq_len=16, temperature=2.0,
+                   alpha=0.9, epochs=3, batch_size=512, gbm_subsample=10, verbose=1):
+    """
+    Entraîne les élèves sur les sorties de l'enseignant, fichier par fichier.
+
+    Paramètres:
+        - teacher (tensorflow.keras.Model): Modèle enseignant.
+        - training_folder (str): Dossier des fichiers CSV d'entraînement.
+        - kinds (tuple): Types d'élèves à entraîner.
+        - scaler (MinMaxScaler ou None): Normaliseur enregistré avec l'enseignant.
+        - window (int): Taille des fenêtres d'agrégation de l'enseignant.
+        - seq_len (int): Longueur de l'historique des élèves 'conv' et 'gbm'.
+        - temperature, alpha: Voir `distillation_targets`.
+        - epochs (int): Nombre d'époques par fichier des élèves Keras.
+        - batch_size (int): Taille des lots d'entraînement.
+        - gbm_subsample (int): Un échantillon sur `gbm_subsample` est gardé pour l'élève 'gbm',
+          entraîné en une fois à la fin.
+        - verbose (int): Niveau d'affichage.
+
+    Retourne:
+        - dict: Élève entraîné de chaque type.
+    """
+    students = {}
+    gbm_X, gbm_y = [], []
+    for file_name in sorted(os.listdir(training_folder)):
+        if not file_name.endswith(".csv"):
+            continue
+        if verbose:
+            print(f"Distilling with: {file_name}")
+        X, y = prepare_data(os.path.join(training_folder, file_name), window, scaler)
+        targets = distillation_targets(teacher.predict(X, batch_size=4096, verbose=0), y, temperature, alpha)
+
+        for kind in kinds:
+            if kind == "gbm":
+                # Only the kept instants are computed
+                gbm_X.append(window_features(X[:, -1], seq_len, slice(None, None, gbm_subsample)))
+                gbm_y.append(targets[::gbm_subsample])
+                continue
+            if kind not in students:
+                build = build_gru_student if kind == "gru" else build_conv_student
+                students[kind] = build(X.shape[1:] if kind == "gru" else (seq_len, X.shape[-1]))
+            if kind == "conv":
+                # Windows are built batch by batch, shuffled like `fit` does for arrays
+                dataset = student_inputs(kind, X, seq_len, targets, batch_size, shuffle=True)
+                students[kind].fit(dataset, epochs=epochs, shuffle=False, verbose=0)
+            else:
+                students[kind].fit(X, targets, epochs=epochs, batch_size=batch_size, verbose=0)
+
+    if "gbm" in kinds:
+        students["gbm"] = HistGradientBoostingRegressor(max_iter=100, max_depth=4, random_state=0)
+        students["gbm"].fit(np.concatenate(gbm_X), np.concatenate(gbm_y))
+    return students
+
+
+def evaluate_students(teacher, students, testing_folder, scaler=None, window=1, seq_len=16, n_bins=1000):
+    """
+    Évalue l'enseignant et les élèves sur un dossier de test, en un seul passage.
+
+    Paramètres:
+        - teacher (tensorflow.keras.Model): Modèle enseignant.
+        - students (dict): Élèves retournés par `train_students`.
+        - testing_folder (str): Dossier des fichiers CSV de test.
+        - scaler, window, seq_len: Voir `train_students`.
+        - n_bins (int): Nombre d'intervalles de probabilité des histogrammes.
+
+    Retourne:
+        - metrics (dict): StreamingMetrics de l'enseignant ('teacher') et de chaque élève.
+        - agreement (dict): Écart absolu moyen entre les probabilités de chaque élève et
+          celles de l'enseignant.
+    """
+    metrics = {name: StreamingMetrics(n_bins) for name in ["teacher", *students]}
+    deviation = {kind: 0.0 for kind in students}
+    n_samples = 0
+    for file_name in sorted(os.listdir(testing_folder)):
+        if not file_name.endswith(".csv"):
+            continue
+        X, y = prepare_data(os.path.join(testing_folder, file_name), window, scaler)
+        teacher_prob = teacher.predict(X, batch_size=4096, verbose=0).ravel()
+        metrics["teacher"].update(y, teacher_prob)
+        for kind, student in students.items():
+            prob = predict_flight(kind, student, X, seq_len)
+            metrics[kind].update(y, prob)
+            deviation[kind] += float(np.abs(prob - teacher_prob).sum())
+        n_samples += len(y)
+    return metrics, {kind: total / max(1, n_samples) for kind, total in deviation.items()}
+
+
+def measure_latency(kind, model, sample, repeats=200):
+    """
+    Mesure la latence d'une prédiction sur un seul échantillon.
+
+    Paramètres:
+        - kind (str): Type de modèle ('teacher' et 'gru', 'conv' : Keras ; 'gbm' : arbres).
+        - model: Modèle à mesurer.
+        - sample (numpy.ndarray): Une entrée mise en forme, avec un lot de taille 1.
+        - repeats (int): Nombre de prédictions mesurées.
+
+    Retourne:
+        - dict: Latences médiane et au 99e centile (microsecondes).
+
+    Remarque:
+        - Les modèles Keras sont appelés à travers une `tf.function` tracée au préalable,
+          sans le coût fixe de `model.predict`.
+    """
+    if kind == "gbm":
+        predict = model.predict
+    else:
+        predict = tf.function(lambda x: model(x, training=False))
+        sample = tf.constant(sample)
+    for _ in range(10):  # warm-up (tracing, caches)
+        predict(sample)
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        predict(sample)
+        timings[i] = time.perf_counter() - start
+    return {"median_us": 1e6 * float(np.median(timings)), "p99_us": 1e6 * float(np.percentile(timings, 99))}
+
+
+def model_memory_bytes(kind, model):
+    """
+    Taille des paramètres d'un modèle.
+
+    Paramètres:
+        - kind (str): Type de modèle.
+        - model: Modèle Keras ou arbres boostés.
+
+    Retourne:
+        - dict: `parameters` (nombre de poids, None pour les arbres) et `bytes`.
+    """
+    if kind == "gbm":
+        return {"parameters": None, "bytes": len(pickle.dumps(model))}
+    return {"parameters": int(model.count_params()), "bytes": int(sum(w.nbytes for w in model.get_weights()))}
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Échantillonnage équilibré de fenêtres pour l'entraînement
+---------------------------------------------------------
+Ce script implémente un échantillonneur qui tire des mini-lots équilibrés à partir
+d'un index de fenêtres temporelles, au lieu de parcourir tous les échantillons de tous
+les fichiers. Les fenêtres positives sont prises autour du début du crash, les
+négatives sont sous-échantillonnées à un taux configurable, et seules les fenêtres
+tirées sont lues sur le disque.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Construction de l'index (`build_window_index`), en une lecture de chaque CSV :
+        - conversion des caractéristiques de chaque vol en tableau `.npy` (float32),
+          lu ensuite par projection mémoire (memmap) ;
+        - liste des fenêtres (vol, début, étiquette) : positives si la fenêtre recouvre
+          l'intervalle [début du crash - `onset_margin`, début du crash + `positive_horizon`],
+          négatives si elle se termine avant le début du crash ou si le vol est normal ;
+        - ajustement d'un normaliseur MinMaxScaler sur l'ensemble des vols ;
+        - paramètres de construction (dossier, `window_len`, `stride`, marges, colonnes
+          retenues) enregistrés avec l'index : `get_window_index` reconstruit un index
+          construit avec d'autres paramètres au lieu de le réutiliser.
+    - Échantillonneur `BalancedWindowSampler` (PyDataset Keras) : à chaque époque, un
+      sous-ensemble aléatoire des négatives (`negative_rate`) est complété par des
+      positives tirées avec remise pour atteindre la proportion `positive_fraction`.
+    - Lecture par lot des seules fenêtres sélectionnées, triées par vol et position
+      pour des accès disque séquentiels.
+
+Bibliothèques requises :
+    - os, pickle : Gestion des fichiers de l'index.
+    - numpy : Tableaux projetés en mémoire et tirages aléatoires.
+    - pandas : Lecture des fichiers CSV lors de la construction de l'index.
+    - sklearn : Normaliseur MinMaxScaler.
+    - tensorflow.keras : Classe de base PyDataset.
+    - creation_de_données_de_vol : Instant de début du crash (`CRASH_ONSET_FRACTION`).
+    - selection_features_lib : Colonnes d'entrée retenues.
+
+Utilisation :
+    1. Construisez l'index une fois : `index = get_window_index(folder, index_folder)`
+       (relu aux lancements suivants tant que ses paramètres sont inchangés).
+    2. Créez l'échantillonneur : `sampler = BalancedWindowSampler(index, batch_size=512)`.
+    3. Entraînez un modèle de forme d'entrée `sampler.input_shape` avec `model.fit(sampler)`.
+
+Remarques :
+    - Les fenêtres d'un vol avec crash situées après `positive_horizon` ne sont pas
+      utilisées : leur étiquette est déjà connue bien après le début du crash.
+    - Les étiquettes de fenêtre dépendent de l'instant du crash, et non de la colonne
+      `crash` constante sur tout le fichier : les pondérations de classe ne sont plus
+      nécessaires, l'équilibre est fixé par `positive_fraction`.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+from tensorflow.keras.utils import PyDataset
+from creation_de_données_de_vol import CRASH_ONSET_FRACTION
+from selection_features_lib import feature_selection
+
+#%% FONCTIONS
+def window_index_params(training_folder, window_len, stride, onset_margin, positive_horizon):
+    """
+    Paramètres de construction d'un index, enregistrés avec lui.
+
+    Paramètres:
+        - training_folder, window_len, stride, onset_margin, positive_horizon: Voir 
+          `build_window_index`.
+
+    Retourne:
+        - dict: Paramètres, avec le chemin absolu du dossier et les colonnes d'entrée 
+          retenues (None : toutes).
+    """
+    return {
+        "training_folder": os.path.abspath(training_folder),
+        "window_len": window_len,
+        "stride": stride,
+        "onset_margin": onset_margin,
+        "positive_horizon": positive_horizon,
+        "columns": feature_selection.columns,
+    }
+
+
+def build_window_index(training_folder, index_folder="index_fenetres/", window_len=100, stride=50,
+                       onset_margin=0, positive_horizon=5000):
+    """
+    Construit l'index des fenêtres d'un dossier de vols et les tableaux `.npy` associés.
+
+    Paramètres:
+        - training_folder (str): Dossier contenant les fichiers CSV des vols.
+        - index_folder (str): Dossier de sortie (tableaux `.npy` et fichier `index.pkl`).
+        - window_len (int): Nombre d'échantillons par fenêtre (timesteps du LSTM).
+        - stride (int): Décalage entre deux fenêtres consécutives.
+        - onset_margin (int): Échantillons avant le début du crash comptés comme positifs.
+        - positive_horizon (int): Échantillons après le début du crash comptés comme positifs.
+
+    Retourne:
+        - dict: Index : `files` (chemins des `.npy`), `file_id`, `start`, `label` (tableaux
+          d'une entrée par fenêtre), `window_len`, `scaler` et `params` (voir 
+          `window_index_params`).
+
+    Remarque:
+        - L'index est enregistré dans `index_folder/index.pkl` ; `load_window_index` le relit.
+    """
+    os.makedirs(index_folder, exist_ok=True)
+    scaler = MinMaxScaler()
+    files, file_ids, starts, labels = [], [], [], []
+    for file_name in sorted(os.listdir(training_folder)):
+        if not file_name.endswith(".csv"):
+            continue
+        data = pd.read_csv(os.path.join(training_folder, file_name), usecols=feature_selection.usecols())
+        X = feature_selection.select(data).astype(np.float32)
+        scaler.partial_fit(X)
+        npy_path = os.path.join(index_folder, os.path.splitext(file_name)[0] + ".npy")
+        np.save(npy_path, X)
+
+        start = np.arange(0, len(X) - window_len + 1, stride)
+        end = start + window_len
+        if data['crash'].iloc[0]:
+            onset = int(len(X) * CRASH_ONSET_FRACTION)
+            positive = (end > onset - onset_margin) & (start < onset + positive_horizon)
+            negative = end <= onset - onset_margin
+        else:
+            positive = np.zeros(len(start), dtype=bool)
+            negative = np.ones(len(start), dtype=bool)
+        keep = positive | negative
+
+        file_ids.append(np.full(np.count_nonzero(keep), len(files), dtype=np.int32))
+        starts.append(start[keep])
+        labels.append(positive[keep].astype(np.int8))
+        files.append(npy_path)
+
+    index = {
+        "files": files,
+        "file_id": np.concatenate(file_ids),
+        "start": np.concatenate(starts),
+        "label": np.concatenate(labels),
+        "window_len": window_len,
+        "scaler": scaler,
+        "params": window_index_params(training_folder, window_len, stride, onset_margin, positive_horizon),
+    }
+    with open(os.path.join(index_folder, "index.pkl"), "wb") as f:
+        pickle.dump(index, f)
+    return index
+
+
+def load_window_index(index_folder="index_fenetres/"):
+    """
+    Relit un index construit par `build_window_index`.
+
+    Paramètres:
+        - index_folder (str): Dossier de l'index.
+
+    Retourne:
+        - dict: Index des fenêtres (voir `build_window_index`).
+    """
+    with open(os.path.join(index_folder, "index.pkl"), "rb") as f:
+        return pickle.load(f)
+
+
+def get_window_index(training_folder, index_folder="index_fenetres/", window_len=100, stride=50,
+                     onset_margin=0, positive_horizon=5000):
+    """
+    Relit l'index de `index_folder` s'il a été construit avec les mêmes paramètres, 
+    sinon le (re)construit.
+
+    Paramètres:
+        - training_folder, index_folder, window_len, stride, onset_margin, positive_horizon: 
+          Voir `build_window_index`.
+
+    Retourne:
+        - dict: Index des fenêtres (voir `build_window_index`).
+
+    Remarque:
+        - Un index sans paramètres enregistrés (version précédente) est reconstruit.
+    """
+    params = window_index_params(training_folder, window_len, stride, onset_margin, positive_horizon)
+    if os.path.exists(os.path.join(index_folder, "index.pkl")):
+        index = load_window_index(index_folder)
+        if index.get("params") == params:
+            return index
+        print(f"Index '{index_folder}' built with other parameters: rebuilding it.")
+    return build_window_index(training_folder, index_folder, window_len, stride, onset_margin, positive_horizon)
+
+#%% CLASSES
+class BalancedWindowSampler(PyDataset):
+    """Mini-lots équilibrés de fenêtres tirées dans un index"""
+    def __init__(self, index, batch_size=512, negative_rate=0.05, positive_fraction=0.5, seed=0, **kwargs) -> None:
+        """
+        Paramètres:
+            - index (dict): Index des fenêtres (voir `build_window_index`).
+            - batch_size (int): Nombre de fenêtres par lot.
+            - negative_rate (float): Fraction des fenêtres négatives tirées à chaque époque.
+            - positive_fraction (float): Proportion de fenêtres positives dans une époque.
+            - seed (int): Graine des tirages.
+            - kwargs: Options de PyDataset (`workers`, `use_multiprocessing`, `max_queue_size`).
+
+        Exceptions:
+            - ValueError: Si l'index ne contient aucune fenêtre positive ou négative.
+        """
+        super().__init__(**kwargs)
+        self.index = index
+        self.batch_size = batch_size
+        self.window_len = index["window_len"]
+        self.positives = np.flatnonzero(index["label"] == 1)
+        self.negatives = np.flatnonzero(index["label"] == 0)
+        if len(self.positives) == 0 or len(self.negatives) == 0:
+            raise ValueError("L'index doit contenir des fenêtres positives et négatives.")
+
+        self.n_negatives = max(1, int(len(self.negatives) * negative_rate))
+        self.n_positives = max(1, int(round(self.n_negatives * positive_fraction / (1 - positive_fraction))))
+        self.rng = np.random.default_rng(seed)
+        self.arrays = [np.load(path, mmap_mode="r") for path in index["files"]]
+        self.scale = index["scaler"].scale_.astype(np.float32)
+        self.offset = index["scaler"].min_.astype(np.float32)
+        self.on_epoch_end()
+
+    @property
+    def input_shape(self):
+        """Forme d'une entrée du modèle : (timesteps, caractéristiques)."""
+        return (self.window_len, len(self.scale))
+
+    def __len__(self):
+        return -(-(self.n_positives + self.n_negatives) // self.batch_size)
+
+    def on_epoch_end(self):
+        """Tire les fenêtres de l'époque suivante."""
+        epoch = np.concatenate([
+            self.rng.choice(self.negatives, self.n_negatives, replace=False),
+            self.rng.choice(self.positives, self.n_positives, replace=True),
+        ])
+        self.epoch = self.rng.permutation(epoch)
+
+    def __getitem__(self, idx):
+        """
+        Lit et normalise les fenêtres du lot `idx`.
+
+        Retourne:
+            - X (numpy.ndarray): Fenêtres normalisées, (lot, timesteps, caractéristiques).
+            - y (numpy.ndarray): Étiquettes des fenêtres.
+        """
+        selected = self.epoch[idx * self.batch_size:(idx + 1) * self.batch_size]
+        # Sequential reads: sort by flight then position
+        selected = selected[np.lexsort((self.index["start"][selected], self.index["file_id"][selected]))]
+
+        X = np.empty((len(selected), self.window_len, len(self.scale)), dtype=np.float32)
+        for i, window in enumerate(selected):
+            start = self.index["start"][window]
+            X[i] = self.arrays[self.index["file_id"][window]][start:start + self.window_len]
+        X *= self.scale
+        X += self.offset
+        return X, self.index["label"][selected].astype(np.float32)
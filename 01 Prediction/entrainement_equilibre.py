@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Entraînement du modèle LSTM par fenêtres équilibrées
+----------------------------------------------------
+Ce script entraîne le modèle LSTM sur des séquences de `window_len` échantillons
+tirées par `BalancedWindowSampler` : chaque époque ne lit qu'une fraction des données,
+avec une proportion de fenêtres de crash contrôlée.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Paramètres :
+    - `training_folder` : Dossier des fichiers CSV d'entraînement.
+    - `index_folder` : Dossier de l'index des fenêtres (construit au premier lancement, et
+      reconstruit si `training_folder`, `window_len`, `stride` ou la sélection de colonnes changent).
+    - `window_len`, `stride` : Longueur des fenêtres et décalage entre fenêtres.
+    - `negative_rate`, `positive_fraction` : Taux de tirage des négatives et proportion de positives.
+    - `epochs`, `batch_size` : Paramètres d'entraînement.
+    - `selection_file` : Colonnes d'entrée retenues (si le fichier existe), appliquées à
+      la construction de l'index.
+
+Bibliothèques requises :
+    - echantillonnage_lib : Index des fenêtres et échantillonneur équilibré.
+    - modele_lstm_lib : Construction du modèle (`build_lstm_model`).
+
+Résultats attendus :
+    - Un modèle enregistré sous le nom `modele_lstm_equilibre.h5`, qui attend des
+      séquences de forme (window_len, caractéristiques), et son normaliseur
+      `modele_lstm_equilibre_scaler.pkl`.
+"""
+
+import os
+import pickle
+from echantillonnage_lib import get_window_index, BalancedWindowSampler
+from modele_lstm_lib import build_lstm_model
+from selection_features_lib import feature_selection
+
+training_folder = "training_flights/"
+index_folder = "index_fenetres/"
+window_len = 100
+stride = 50
+negative_rate = 0.05
+positive_fraction = 0.5
+epochs = 10
+batch_size = 512
+selection_file = "selection_features.json"
+
+# Input columns kept by the feature analysis, if any
+if os.path.exists(selection_file):
+    feature_selection.load(selection_file)
+
+# Build the window index once (again if its parameters changed)
+index = get_window_index(training_folder, index_folder, window_len, stride)
+print(f"{len(index['label'])} windows, {int(index['label'].sum())} positive")
+
+sampler = BalancedWindowSampler(index, batch_size, negative_rate, positive_fraction)
+print(f"{sampler.n_negatives} negative and {sampler.n_positives} positive windows per epoch")
+
+model = build_lstm_model(sampler.input_shape)
+model.fit(sampler, epochs=epochs, verbose=1)
+
+model.save("modele_lstm_equilibre.h5")
+with open("modele_lstm_equilibre_scaler.pkl", "wb") as f:
+    pickle.dump(index["scaler"], f)
+print("Model trained and saved as 'modele_lstm_equilibre.h5'.")
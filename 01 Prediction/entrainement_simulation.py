@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Entraînement du modèle LSTM sur des vols simulés à la volée
+-----------------------------------------------------------
+Ce script entraîne le modèle LSTM directement sur les vols produits par
+`SimulatedFlightStream`, sans écriture ni lecture de fichiers CSV : la simulation
+tourne en parallèle de l'entraînement et chaque époque voit de nouveaux vols.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Paramètres :
+    - `epochs`, `flights_per_epoch` : Nombre d'époques et de vols simulés par époque.
+    - `n_workers`, `queue_size` : Processus de simulation et vols simulés en avance.
+    - `duration_s` : Intervalle des durées de vol tirées (secondes).
+    - `window` : Taille des fenêtres d'agrégation.
+    - `batch_size` : Taille des lots d'entraînement.
+    - `selection_file` : Colonnes d'entrée retenues (si le fichier existe).
+
+Bibliothèques requises :
+    - flux_simulation_lib : Source de vols simulés en mémoire partagée.
+    - modele_lstm_lib : Normalisation, pondérations de classe et construction du modèle.
+
+Remarques :
+    - Le normaliseur est ajusté une seule fois, avant l'entraînement, sur une époque de
+      préchauffage de `flights_per_epoch` vols simulés distincts de ceux de l'entraînement :
+      tous les vols sont ensuite normalisés avec le normaliseur enregistré et utilisé à
+      l'inférence. Des valeurs hors de l'intervalle observé sortent simplement de [0, 1].
+
+Résultats attendus :
+    - Un modèle `modele_lstm_simulation.h5` et son normaliseur `modele_lstm_simulation_scaler.pkl`.
+"""
+
+import os
+import pickle
+from sklearn.preprocessing import MinMaxScaler
+from flux_simulation_lib import SimulatedFlightStream
+from modele_lstm_lib import scale_and_reshape, calculate_class_weights, build_lstm_model
+from selection_features_lib import feature_selection
+
+epochs = 10
+flights_per_epoch = 20
+n_workers = max(1, (os.cpu_count() or 2) - 1)
+queue_size = 4
+duration_s = (600, 3600)
+window = 1
+batch_size = 512
+selection_file = "selection_features.json"
+
+if __name__ == "__main__":
+    # Input columns kept by the feature analysis, if any (passed to the simulation workers)
+    if os.path.exists(selection_file):
+        feature_selection.load(selection_file)
+
+    scaler = MinMaxScaler()
+    model = None
+    with SimulatedFlightStream(flights_per_epoch, n_workers, duration_s, window=window,
+                               queue_size=queue_size) as stream:
+        # Scaler shared by all flights, fitted once on a warm-up epoch (flights not used for training)
+        print("Fitting the scaler on a warm-up epoch")
+        for _ in stream.epoch(epochs, transform=lambda X, y: (scaler.partial_fit(X), None)):
+            pass
+
+        for epoch in range(epochs):
+            print(f"Epoch {epoch + 1}/{epochs}")
+            for X, y in stream.epoch(epoch, transform=lambda X, y: scale_and_reshape(X, y, scaler)):
+                if model is None:
+                    model = build_lstm_model(X.shape[1:])
+                model.fit(X, y, epochs=1, batch_size=batch_size,
+                          class_weight=calculate_class_weights(y), verbose=0)
+
+    model.save("modele_lstm_simulation.h5")
+    with open("modele_lstm_simulation_scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
+    print("Model trained and saved as 'modele_lstm_simulation.h5'.")
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Flux de vols simulés en mémoire pour l'entraînement
+---------------------------------------------------
+Ce script implémente une source de données d'entraînement qui exécute le simulateur
+`simulate_detailed_flight` dans des processus de calcul et transmet les vols terminés
+à l'entraînement par mémoire partagée, sans passer par des fichiers CSV. Chaque époque
+utilise de nouvelles variantes de scénarios (graines, durées, répartition des crashs).
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Processus de simulation (`simulation_worker`) : chaque vol est simulé avec sa propre
+      graine, ses caractéristiques sont copiées dans un segment de mémoire partagée dont
+      seul le nom transite par une file bornée.
+    - La file bornée (`queue_size`) limite le nombre de vols simulés en avance : les
+      processus de simulation attendent lorsque l'entraînement est plus lent.
+    - `SimulatedFlightStream.epoch(epoch)` : tire les variantes de l'époque (scénario,
+      durée, graine), les distribue aux processus et fournit les vols au fur et à mesure.
+    - Transformation optionnelle appliquée directement sur le segment partagé (par
+      exemple la normalisation), ce qui évite toute copie intermédiaire.
+
+Bibliothèques requises :
+    - multiprocessing : Processus de simulation, files et mémoire partagée.
+    - numpy : Tableaux des caractéristiques.
+    - creation_de_données_de_vol : Simulateur et liste des scénarios.
+    - agregation_lib : Agrégation optionnelle par fenêtres, dans les processus de simulation.
+    - selection_features_lib : Colonnes d'entrée retenues, transmises aux processus.
+
+Utilisation :
+    with SimulatedFlightStream(flights_per_epoch=20, n_workers=4) as stream:
+        for epoch in range(epochs):
+            for X, y in stream.epoch(epoch, transform=...):
+                model.fit(X, y, ...)
+
+Remarques :
+    - Sans `transform`, les vols fournis sont des copies ; avec `transform`, la fonction
+      doit retourner de nouveaux tableaux (les vues sur la mémoire partagée sont libérées
+      dès le vol suivant).
+    - Les vols d'une époque arrivent dans l'ordre de fin de simulation, pas dans l'ordre
+      de tirage.
+"""
+
+#%% BIBLIOTHEQUES
+import queue
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from creation_de_données_de_vol import simulate_detailed_flight, scenarios
+from agregation_lib import aggregate_windows
+from selection_features_lib import feature_selection, FIRST_COLUMN, LAST_COLUMN
+
+#%% FONCTIONS
+def simulation_worker(task_queue, result_queue, window, columns=None):
+    """
+    Boucle d'un processus de simulation.
+
+    Paramètres:
+        - task_queue (multiprocessing.Queue): Tâches (identifiant, scénario, durée, graine),
+          None pour arrêter le processus.
+        - result_queue (multiprocessing.Queue): File bornée des vols simulés :
+          (nom du segment partagé, forme, étiquettes).
+        - window (int): Taille des fenêtres d'agrégation (1 : données brutes).
+        - columns (list of str ou None): Colonnes d'entrée retenues (None : toutes).
+    """
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        flight_id, scenario, duration_s, seed = task
+        np.random.seed(seed)
+        data = simulate_detailed_flight(flight_id, duration_s, scenario)
+        X = (data.loc[:, FIRST_COLUMN:LAST_COLUMN] if columns is None else data[columns]).values
+        y = data['crash'].values.astype(np.int8)
+        if window > 1:
+            X, y = aggregate_windows(X, y, window)
+            y = y.astype(np.int8)
+
+        shm = shared_memory.SharedMemory(create=True, size=X.size * 4)
+        np.ndarray(X.shape, dtype=np.float32, buffer=shm.buf)[:] = X
+        result_queue.put((shm.name, X.shape, y))  # blocks while the queue is full
+        shm.close()
+
+#%% CLASSES
+class SimulatedFlightStream:
+    """Source de vols simulés à la volée par des processus de calcul"""
+    def __init__(self, flights_per_epoch=20, n_workers=2, duration_s=(600, 3600), crash_fraction=0.2,
+                 window=1, queue_size=4, seed=0, columns=None) -> None:
+        """
+        Paramètres:
+            - flights_per_epoch (int): Nombre de vols simulés par époque.
+            - n_workers (int): Nombre de processus de simulation.
+            - duration_s (int ou tuple): Durée des vols (secondes), ou intervalle (min, max)
+              dans lequel elle est tirée pour chaque vol.
+            - crash_fraction (float): Proportion de vols avec crash (scénario tiré au hasard).
+            - window (int): Taille des fenêtres d'agrégation appliquée par les processus.
+            - queue_size (int): Nombre maximal de vols simulés en attente d'entraînement.
+            - seed (int): Graine des tirages ; (seed, époque) détermine les vols d'une époque.
+            - columns (list of str ou None): Colonnes d'entrée retenues (None : celles de
+              `feature_selection` au moment de la création).
+        """
+        self.flights_per_epoch = flights_per_epoch
+        self.n_workers = n_workers
+        self.duration_s = duration_s
+        self.crash_fraction = crash_fraction
+        self.window = window
+        self.queue_size = queue_size
+        self.seed = seed
+        self.columns = columns if columns is not None else feature_selection.columns
+        self.workers = []
+
+    def __enter__(self):
+        ctx = mp.get_context("spawn")
+        self.task_queue = ctx.Queue()
+        self.result_queue = ctx.Queue(self.queue_size)
+        self.workers = [ctx.Process(target=simulation_worker, args=(self.task_queue, self.result_queue, self.window, self.columns),
+                                    daemon=True) for _ in range(self.n_workers)]
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Arrête les processus de simulation et libère les vols non consommés."""
+        # Pending simulations of an unfinished epoch are cancelled
+        try:
+            while True:
+                self.task_queue.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in self.workers:
+            self.task_queue.put(None)
+        while any(worker.is_alive() for worker in self.workers) or not self.result_queue.empty():
+            # Drain the results so that blocked workers can reach the stop message
+            try:
+                name, _, _ = self.result_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            shared_memory.SharedMemory(name=name).unlink()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+
+    def variants(self, epoch):
+        """
+        Tire les vols d'une époque.
+
+        Paramètres:
+            - epoch (int): Numéro de l'époque.
+
+        Retourne:
+            - list of tuple: (identifiant, scénario ou None, durée, graine) de chaque vol.
+        """
+        rng = np.random.default_rng([self.seed, epoch])
+        tasks = []
+        for i in range(self.flights_per_epoch):
+            scenario = str(rng.choice(scenarios)) if rng.random() < self.crash_fraction else None
+            if isinstance(self.duration_s, tuple):
+                duration_s = int(rng.integers(self.duration_s[0], self.duration_s[1] + 1))
+            else:
+                duration_s = self.duration_s
+            tasks.append((epoch * self.flights_per_epoch + i, scenario, duration_s, int(rng.integers(2**32))))
+        return tasks
+
+    def epoch(self, epoch, transform=None):
+        """
+        Fournit les vols simulés d'une époque, au fur et à mesure de leur simulation.
+
+        Paramètres:
+            - epoch (int): Numéro de l'époque.
+            - transform (callable ou None): Fonction (X, y) -> (X, y) appliquée sur la vue
+              en mémoire partagée ; elle doit retourner de nouveaux tableaux.
+
+        Retourne:
+            - generator: Couples (X, y) ; X de forme (échantillons, caractéristiques) en
+              float32 sans `transform`.
+        """
+        for task in self.variants(epoch):
+            self.task_queue.put(task)
+        for _ in range(self.flights_per_epoch):
+            name, shape, y = self.result_queue.get()
+            shm = shared_memory.SharedMemory(name=name)
+            try:
+                X = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+                result = transform(X, y) if transform is not None else (X.copy(), y)
+                del X
+            finally:
+                shm.close()
+                shm.unlink()
+            yield result
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation des étapes du pipeline d'apprentissage
+------------------------------------------------------
+Ce script implémente une couche de mesure légère pour savoir où passe le temps dans
+l'entraînement et l'évaluation : lecture des CSV, normalisation, mise en forme,
+`fit` et `predict`. Chaque étape instrumentée enregistre son temps réel, son temps
+CPU, le nombre de lignes traitées et la mémoire maximale atteinte.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Gestionnaire de contexte `profiler.stage(nom, rows=...)` et décorateur
+      `profiler.track(nom)` autour de chaque étape.
+    - Mesures par appel : temps réel (`perf_counter`), temps CPU du processus
+      (`process_time`), lignes traitées et débit, pic de mémoire résidente du processus
+      et, si activé, pic des allocations suivies par `tracemalloc` pendant l'étape.
+    - Écriture d'une ligne JSON par appel dans un fichier (format JSON lines).
+    - Agrégation par étape sur l'exécution et tableau récapitulatif en fin d'exécution.
+
+Bibliothèques requises :
+    - time, json, resource, tracemalloc : Mesures et écriture des résultats (bibliothèque standard).
+
+Utilisation :
+    1. Les bibliothèques du projet utilisent l'instance partagée `profiler`.
+    2. Un script active l'écriture avec `profiler.open("profil.jsonl")`.
+    3. En fin d'exécution, `profiler.print_summary()` affiche le tableau récapitulatif.
+
+Remarques :
+    - Sans appel à `open`, les mesures sont seulement agrégées en mémoire ; leur coût est
+      de quelques microsecondes par étape.
+    - Le suivi `tracemalloc` ralentit les allocations Python : il n'est actif qu'avec
+      `open(..., trace_memory=True)`. Il ne voit pas la mémoire allouée par TensorFlow.
+    - `tracemalloc` n'a qu'un seul pic : une étape imbriquée dans une autre remet à zéro
+      celui de l'étape englobante. Instrumentez de préférence des étapes disjointes.
+    - `resource` n'existe pas sous Windows : le pic de mémoire résidente vaut alors None.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import sys
+import time
+import json
+import functools
+import tracemalloc
+from contextlib import contextmanager
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+#%% FONCTIONS
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son lancement (Mo), ou None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+#%% CLASSES
+class Profiler:
+    """Mesure et agrégation des étapes d'une exécution"""
+    def __init__(self) -> None:
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.stages = {}
+        self.output = None
+        self.trace_memory = False
+
+    def open(self, path, trace_memory=False):
+        """
+        Active l'écriture des mesures dans un fichier JSON lines.
+
+        Paramètres:
+            - path (str): Fichier de sortie (les lignes sont ajoutées à la fin).
+            - trace_memory (bool): Active `tracemalloc` pour mesurer le pic d'allocations par étape.
+        """
+        self.output = open(path, "a")
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def close(self):
+        """Ferme le fichier de sortie."""
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Mesure une étape.
+
+        Paramètres:
+            - name (str): Nom de l'étape (clé d'agrégation).
+            - rows (int ou None): Nombre de lignes traitées, si connu à l'avance.
+
+        Retourne:
+            - dict: Enregistrement de l'étape ; `record["rows"]` peut être renseigné dans
+              le bloc lorsque le nombre de lignes n'est connu qu'après coup.
+        """
+        record = {"run_id": self.run_id, "stage": name, "rows": rows}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            record["rows_per_s"] = record["rows"] / record["wall_s"] if record["rows"] and record["wall_s"] else None
+            record["peak_rss_mb"] = peak_rss_mb()
+            if self.trace_memory:
+                record["traced_peak_mb"] = (tracemalloc.get_traced_memory()[1] - traced_start) / 2**20
+            self._add(record)
+
+    def track(self, name):
+        """
+        Décorateur mesurant chaque appel d'une fonction comme une étape `name`.
+
+        Paramètres:
+            - name (str): Nom de l'étape.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _add(self, record):
+        total = self.stages.setdefault(record["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0, "peak_mb": 0.0})
+        total["calls"] += 1
+        total["wall_s"] += record["wall_s"]
+        total["cpu_s"] += record["cpu_s"]
+        total["rows"] += record["rows"] or 0
+        total["peak_mb"] = max(total["peak_mb"], record.get("traced_peak_mb") or record["peak_rss_mb"] or 0.0)
+        if self.output is not None:
+            self.output.write(json.dumps(record) + "\n")
+            self.output.flush()
+
+    def summary(self):
+        """
+        Agrégats par étape de l'exécution.
+
+        Retourne:
+            - dict: Pour chaque étape : `calls`, `wall_s`, `cpu_s`, `rows`, `peak_mb`.
+        """
+        return self.stages
+
+    def print_summary(self):
+        """Affiche le tableau récapitulatif des étapes, par temps réel décroissant, et l'écrit dans le fichier."""
+        total_wall = sum(s["wall_s"] for s in self.stages.values()) or 1.0
+        print(f"{'étape':<20} {'appels':>7} {'réel (s)':>10} {'%':>6} {'CPU (s)':>10} {'lignes':>12} {'lignes/s':>12} {'pic (Mo)':>9}")
+        for name, s in sorted(self.stages.items(), key=lambda item: item[1]["wall_s"], reverse=True):
+            rate = s["rows"] / s["wall_s"] if s["rows"] and s["wall_s"] else 0
+            print(f"{name:<20} {s['calls']:>7} {s['wall_s']:>10.2f} {100 * s['wall_s'] / total_wall:>5.1f}% "
+                  f"{s['cpu_s']:>10.2f} {s['rows']:>12} {rate:>12.0f} {s['peak_mb']:>9.1f}")
+        if self.output is not None:
+            self.output.write(json.dumps({"run_id": self.run_id, "summary": self.stages}) + "\n")
+            self.output.flush()
+
+#%% INSTANCE PARTAGEE
+profiler = Profiler()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Banc de mesure du délai de détection des crashs
+-----------------------------------------------
+Ce script rejoue chaque scénario de crash simulé à travers le détecteur (prétraitement
+puis modèle LSTM), par paquets successifs comme en vol, et mesure la rapidité de la
+détection : le simulateur connaît exactement l'instant de début du crash
+(`CRASH_ONSET_FRACTION` de la durée du vol).
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Simulation d'un vol par scénario (et d'un vol normal de référence).
+    - Rejeu par paquets de `chunk_ms` millisecondes simulées : prétraitement et
+      prédiction de chaque paquet, avec mesure du temps de calcul réel.
+    - Par scénario :
+        - délai de détection : millisecondes simulées entre le début du crash et la
+          première alarme (probabilité >= `threshold`) ;
+        - taux de fausses alarmes avant le début du crash ;
+        - temps de calcul par seconde simulée et facteur temps réel.
+    - Affichage d'un tableau par scénario et enregistrement des résultats en JSON.
+
+Paramètres :
+    - `model_file` / `scaler_file` : Modèle et normaliseur enregistrés par `modele_lstm_lib`.
+    - `selection_file` : Spécification des colonnes retenues (si elle existe).
+    - `window` : Taille des fenêtres d'agrégation (identique à l'entraînement).
+    - `duration_s` : Durée des vols simulés (secondes).
+    - `chunk_ms` : Durée simulée de chaque paquet rejoué (multiple de `window`).
+    - `threshold` : Seuil d'alarme.
+    - `results_file` : Fichier JSON de sortie.
+
+Bibliothèques requises :
+    - creation_de_données_de_vol : Simulateur de vols et scénarios de crash.
+    - modele_lstm_lib : Prétraitement des données (`prepare_frame`).
+    - tensorflow.keras : Chargement et exécution du modèle.
+
+Remarques :
+    - Avec une fenêtre d'agrégation, l'alarme d'une fenêtre est datée de son dernier
+      échantillon : le délai inclut donc l'attente de la fin de la fenêtre.
+    - Si aucun normaliseur n'a été enregistré, il est ajusté sur le vol entier avant
+      le rejeu (comme `prepare_data`), ce qui n'est pas causal.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import json
+import time
+import pickle
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from tensorflow.keras.models import load_model
+from creation_de_données_de_vol import simulate_detailed_flight, scenarios, CRASH_ONSET_FRACTION
+from modele_lstm_lib import prepare_frame
+from selection_features_lib import feature_selection
+
+#%% PARAMETRES
+model_file = "modele_lstm_reduit_overfitting.h5"
+scaler_file = "modele_lstm_reduit_overfitting_scaler.pkl"
+selection_file = "selection_features.json"
+window = 1
+duration_s = 60
+chunk_ms = 100
+threshold = 0.3
+results_file = "latence_detection.json"
+
+#%% FONCTIONS
+def replay_flight(model, data, window, chunk_ms, threshold, scaler):
+    """
+    Rejoue un vol par paquets à travers le détecteur.
+
+    Paramètres:
+        - model (tensorflow.keras.Model): Détecteur.
+        - data (pandas.DataFrame): Vol simulé.
+        - window (int): Taille des fenêtres d'agrégation.
+        - chunk_ms (int): Nombre d'échantillons (ms simulées) par paquet.
+        - threshold (float): Seuil d'alarme.
+        - scaler (MinMaxScaler): Normaliseur appliqué à chaque paquet.
+
+    Retourne:
+        - alarm_samples (numpy.ndarray): Indices des échantillons datant chaque alarme.
+        - output_samples (numpy.ndarray): Indices des échantillons datant chaque sortie du modèle.
+        - compute_s (float): Temps de calcul réel total (prétraitement et prédiction).
+    """
+    alarm_samples, output_samples = [], []
+    compute_s = 0.0
+    for start in range(0, len(data) - window + 1, chunk_ms):
+        chunk = data.iloc[start:start + chunk_ms]
+        begin = time.perf_counter()
+        X, _ = prepare_frame(chunk, window, scaler)
+        y_prob = model(X, training=False).numpy().ravel()
+        compute_s += time.perf_counter() - begin
+
+        samples = start + (np.arange(len(y_prob)) + 1) * window - 1
+        output_samples.append(samples)
+        alarm_samples.append(samples[y_prob >= threshold])
+    return np.concatenate(alarm_samples), np.concatenate(output_samples), compute_s
+
+
+def detection_report(scenario, alarm_samples, output_samples, compute_s, num_points, crash_start):
+    """
+    Calcule les indicateurs de détection d'un vol rejoué.
+
+    Paramètres:
+        - scenario (str ou None): Scénario simulé (None : vol normal).
+        - alarm_samples, output_samples, compute_s: Résultats de `replay_flight`.
+        - num_points (int): Nombre d'échantillons du vol (1 par ms).
+        - crash_start (int): Indice du premier échantillon du crash.
+
+    Retourne:
+        - dict: `scenario`, `detection_ms` (None si aucune alarme après le début du crash),
+          `false_alarm_rate` (avant le début du crash), `compute_ms_per_s`, `realtime_factor`.
+    """
+    before = output_samples < crash_start
+    after_alarms = alarm_samples[alarm_samples >= crash_start]
+    false_alarms = np.count_nonzero(alarm_samples < crash_start)
+    compute_ms_per_s = 1000 * compute_s / (num_points / 1000)
+    return {
+        "scenario": scenario or "normal",
+        "detection_ms": int(after_alarms[0] - crash_start) if scenario and len(after_alarms) else None,
+        "false_alarm_rate": false_alarms / max(1, np.count_nonzero(before)),
+        "compute_ms_per_s": compute_ms_per_s,
+        "realtime_factor": 1000 / compute_ms_per_s if compute_ms_per_s else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    model = load_model(model_file)
+    if os.path.exists(selection_file):
+        feature_selection.load(selection_file)
+    saved_scaler = None
+    if os.path.exists(scaler_file):
+        with open(scaler_file, "rb") as f:
+            saved_scaler = pickle.load(f)
+
+    results = []
+    for flight_id, scenario in enumerate(scenarios + [None]):
+        print(f"Rejeu du scénario : {scenario or 'normal'}")
+        data = simulate_detailed_flight(flight_id, duration_s, scenario)
+        num_points = len(data)
+        # Every alarm of a normal flight is a false alarm
+        crash_start = int(num_points * CRASH_ONSET_FRACTION) if scenario else num_points
+
+        scaler = saved_scaler
+        if scaler is None:
+            scaler = MinMaxScaler()
+            prepare_frame(data, window, scaler, fit_scaler=True)
+
+        alarm_samples, output_samples, compute_s = replay_flight(model, data, window, chunk_ms, threshold, scaler)
+        results.append(detection_report(scenario, alarm_samples, output_samples, compute_s, num_points, crash_start))
+
+    print(f"{'scénario':<18} {'détection (ms)':>14} {'fausses alarmes':>16} {'calcul (ms/s)':>14} {'temps réel':>11}")
+    for r in results:
+        detection = "-" if r["detection_ms"] is None else str(r["detection_ms"])
+        print(f"{r['scenario']:<18} {detection:>14} {100 * r['false_alarm_rate']:>15.1f}% "
+              f"{r['compute_ms_per_s']:>14.1f} {r['realtime_factor']:>10.1f}x")
+
+    with open(results_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Résultats enregistrés dans '{results_file}'.")
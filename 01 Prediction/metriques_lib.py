@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Métriques d'évaluation en flux pour la détection de crash
+---------------------------------------------------------
+Ce script implémente un moteur de métriques qui met à jour, lot après lot, des
+histogrammes de probabilités prédites séparés par classe. À partir d'un seul passage
+sur les données, il fournit la matrice de confusion pour n'importe quel seuil, la
+précision, le rappel, le F1-score, les courbes ROC et précision/rappel ainsi que le
+meilleur seuil de décision, sans conserver les prédictions en mémoire.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Mise à jour incrémentale des histogrammes positifs / négatifs par intervalles
+      de probabilité (`StreamingMetrics.update`).
+    - Fusion de plusieurs accumulateurs (par fichier, par processus) par simple somme.
+    - Balayage de tous les seuils en une seule somme cumulée : matrices de confusion,
+      précision, rappel, F1-score, taux de faux positifs.
+    - Courbes ROC et précision/rappel, aires sous les courbes.
+    - Recherche du meilleur seuil selon une métrique choisie.
+
+Bibliothèques requises :
+    - numpy : Calcul des histogrammes et des sommes cumulées.
+
+Utilisation :
+    1. Créez un objet `StreamingMetrics` avant la boucle d'évaluation.
+    2. Appelez `update(y_true, y_prob)` pour chaque lot de prédictions.
+    3. Interrogez `metrics(seuil)`, `roc_curve()`, `pr_curve()` ou `best_threshold()`
+       à la fin du passage.
+
+Remarques :
+    - Les seuils évalués sont les bornes des intervalles : i / n_bins pour i = 0..n_bins.
+      Les résultats sont exacts pour ces seuils (la prédiction vaut 1 si p >= seuil).
+    - La mémoire utilisée ne dépend que de `n_bins`, pas du nombre d'échantillons.
+"""
+
+#%% BIBLIOTHEQUES
+import numpy as np
+
+#%% CLASSES
+class StreamingMetrics:
+    """Accumulateur de métriques binaires par histogrammes de probabilités"""
+    def __init__(self, n_bins=1000) -> None:
+        self.n_bins = n_bins
+        self.pos_hist = np.zeros(n_bins, dtype=np.int64)
+        self.neg_hist = np.zeros(n_bins, dtype=np.int64)
+
+    def update(self, y_true, y_prob):
+        """
+        Ajoute un lot de prédictions aux histogrammes.
+
+        Paramètres:
+            - y_true (array-like): Étiquettes binaires (0 ou 1) du lot.
+            - y_prob (array-like): Probabilités prédites pour la classe 1, de même taille.
+
+        Retourne:
+            - StreamingMetrics: L'accumulateur mis à jour.
+
+        Exceptions:
+            - ValueError: Si les deux tableaux n'ont pas le même nombre d'éléments.
+        """
+        y_true = np.asarray(y_true).ravel().astype(bool)
+        y_prob = np.asarray(y_prob, dtype=np.float64).ravel()
+        if y_true.shape != y_prob.shape:
+            raise ValueError("y_true et y_prob doivent contenir le même nombre d'éléments.")
+
+        bins = np.clip((y_prob * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.pos_hist += np.bincount(bins[y_true], minlength=self.n_bins)
+        self.neg_hist += np.bincount(bins[~y_true], minlength=self.n_bins)
+        return self
+
+    def merge(self, other):
+        """
+        Ajoute les histogrammes d'un autre accumulateur (même `n_bins`).
+
+        Paramètres:
+            - other (StreamingMetrics): Accumulateur à fusionner.
+
+        Retourne:
+            - StreamingMetrics: L'accumulateur mis à jour.
+
+        Exceptions:
+            - ValueError: Si les nombres d'intervalles diffèrent.
+        """
+        if other.n_bins != self.n_bins:
+            raise ValueError("Impossible de fusionner des accumulateurs de tailles différentes.")
+        self.pos_hist += other.pos_hist
+        self.neg_hist += other.neg_hist
+        return self
+
+    @property
+    def n_samples(self):
+        """Nombre total d'échantillons accumulés."""
+        return int(self.pos_hist.sum() + self.neg_hist.sum())
+
+    def thresholds(self):
+        """Seuils évalués par le balayage : i / n_bins pour i = 0..n_bins."""
+        return np.arange(self.n_bins + 1) / self.n_bins
+
+    def sweep(self):
+        """
+        Calcule la matrice de confusion pour tous les seuils en une seule passe.
+
+        Retourne:
+            - dict: Tableaux de taille n_bins + 1 indexés par seuil :
+              `thresholds`, `tp`, `fp`, `tn`, `fn`.
+
+        Remarque:
+            - Le seuil i / n_bins classe positifs tous les échantillons des intervalles
+              d'indice >= i ; les vrais/faux positifs sont donc des sommes cumulées inverses.
+        """
+        zero = np.zeros(1, dtype=np.int64)
+        tp = np.concatenate([np.cumsum(self.pos_hist[::-1])[::-1], zero])
+        fp = np.concatenate([np.cumsum(self.neg_hist[::-1])[::-1], zero])
+        n_pos = self.pos_hist.sum()
+        n_neg = self.neg_hist.sum()
+        return {
+            "thresholds": self.thresholds(),
+            "tp": tp,
+            "fp": fp,
+            "tn": n_neg - fp,
+            "fn": n_pos - tp,
+        }
+
+    def _threshold_index(self, threshold):
+        return int(np.clip(np.ceil(threshold * self.n_bins - 1e-9), 0, self.n_bins))
+
+    def metrics(self, threshold=0.5):
+        """
+        Calcule les métriques de classification pour un seuil donné.
+
+        Paramètres:
+            - threshold (float): Seuil de probabilité (arrondi à la borne d'intervalle
+              supérieure la plus proche).
+
+        Retourne:
+            - dict: `threshold`, `tp`, `fp`, `tn`, `fn`, `accuracy`, `precision`,
+              `recall`, `f1`, `fpr`.
+        """
+        i = self._threshold_index(threshold)
+        counts = self.sweep()
+        curves = _rates(counts)
+        result = {"threshold": float(counts["thresholds"][i])}
+        for name in ("tp", "fp", "tn", "fn"):
+            result[name] = int(counts[name][i])
+        for name in ("accuracy", "precision", "recall", "f1", "fpr"):
+            result[name] = float(curves[name][i])
+        return result
+
+    def roc_curve(self):
+        """
+        Courbe ROC issue du balayage des seuils.
+
+        Retourne:
+            - tuple: (fpr, tpr, thresholds, auc), l'aire étant calculée par la méthode
+              des trapèzes.
+        """
+        counts = self.sweep()
+        curves = _rates(counts)
+        fpr, tpr = curves["fpr"], curves["recall"]
+        auc = float(np.sum(np.diff(fpr[::-1]) * (tpr[::-1][1:] + tpr[::-1][:-1]) / 2))
+        return fpr, tpr, counts["thresholds"], auc
+
+    def pr_curve(self):
+        """
+        Courbe précision / rappel issue du balayage des seuils.
+
+        Retourne:
+            - tuple: (precision, recall, thresholds, average_precision).
+
+        Remarque:
+            - La précision moyenne est la somme des précisions pondérées par les
+              accroissements de rappel, comme dans scikit-learn.
+        """
+        counts = self.sweep()
+        curves = _rates(counts)
+        precision, recall = curves["precision"], curves["recall"]
+        average_precision = float(np.sum(-np.diff(recall) * precision[:-1]))
+        return precision, recall, counts["thresholds"], average_precision
+
+    def best_threshold(self, metric="f1"):
+        """
+        Recherche le seuil qui maximise une métrique.
+
+        Paramètres:
+            - metric (str): 'f1', 'accuracy', 'precision', 'recall' ou 'youden'
+              (rappel - taux de faux positifs).
+
+        Retourne:
+            - dict: Métriques complètes au meilleur seuil (voir `metrics`).
+
+        Exceptions:
+            - ValueError: Si la métrique est inconnue.
+        """
+        curves = _rates(self.sweep())
+        if metric == "youden":
+            score = curves["recall"] - curves["fpr"]
+        elif metric in ("f1", "accuracy", "precision", "recall"):
+            score = curves[metric]
+        else:
+            raise ValueError(f"Métrique inconnue : {metric}")
+        return self.metrics(self.thresholds()[int(np.argmax(score))])
+
+    def summary(self, threshold=0.5, metric="f1"):
+        """
+        Résumé sérialisable (JSON) de l'évaluation.
+
+        Paramètres:
+            - threshold (float): Seuil de référence.
+            - metric (str): Métrique utilisée pour le meilleur seuil.
+
+        Retourne:
+            - dict: Métriques au seuil de référence et au meilleur seuil, aires sous
+              les courbes ROC et précision/rappel, nombre d'échantillons.
+        """
+        return {
+            "n_samples": self.n_samples,
+            "n_positives": int(self.pos_hist.sum()),
+            "at_threshold": self.metrics(threshold),
+            "best": self.best_threshold(metric),
+            "roc_auc": self.roc_curve()[3],
+            "average_precision": self.pr_curve()[3],
+        }
+
+#%% FONCTIONS
+def _rates(counts):
+    """Dérive les taux (précision, rappel, F1...) des comptes d'un balayage."""
+    tp, fp, tn, fn = (counts[k].astype(np.float64) for k in ("tp", "fp", "tn", "fn"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        fpr = np.where(fp + tn > 0, fp / (fp + tn), 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        accuracy = np.where(tp + fp + tn + fn > 0, (tp + tn) / (tp + fp + tn + fn), 0.0)
+    return {"precision": precision, "recall": recall, "fpr": fpr, "f1": f1, "accuracy": accuracy}
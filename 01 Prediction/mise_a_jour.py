@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Mise à jour incrémentale du modèle LSTM sur de nouveaux vols
+------------------------------------------------------------
+Ce script ajuste la dernière version du modèle sur les vols arrivés depuis, au lieu
+de réentraîner le modèle sur tout l'historique, et enregistre une nouvelle version.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Paramètres :
+    - `new_flights_folder` : Dossier des nouveaux fichiers CSV.
+    - `models_folder` : Dossier des versions du modèle et de leur registre.
+    - `replay_ratio` : Nombre d'échantillons passés rejoués par nouvel échantillon.
+    - `epochs`, `batch_size`, `learning_rate` : Paramètres de l'ajustement fin.
+    - `window` : Taille des fenêtres d'agrégation (identique à l'entraînement).
+    - `selection_file` : Colonnes retenues à l'entraînement (si le fichier existe).
+
+Bibliothèques requises :
+    - mise_a_jour_lib : Mémoire de rejeu, ajustement fin et registre des versions.
+    - tensorflow.keras : Chargement du modèle.
+
+Fichiers requis :
+    - Sans version enregistrée : le modèle de `modele_lstm_lib` et ses fichiers associés
+      (`modele_lstm_reduit_overfitting.h5`, `_scaler.pkl`, `_replay.npz`), qui
+      deviennent la version 0.
+
+Résultats attendus :
+    - Dans `models_folder` : `modele_lstm_v<N>.h5` et `modele_lstm_v<N>_replay.npz`, et
+      une entrée ajoutée au registre `versions.json`.
+
+Remarques :
+    - Seuls les vols absents du registre sont utilisés : relancer le script sans
+      nouveau vol n'écrit pas de nouvelle version.
+    - Le normaliseur de la version 0 est partagé par toutes les versions.
+"""
+
+import os
+import pickle
+from tensorflow.keras.models import load_model
+from mise_a_jour_lib import ReplayBuffer, fine_tune_model, load_versions, register_version
+from selection_features_lib import feature_selection
+
+new_flights_folder = "new_flights/"
+models_folder = "modeles/"
+replay_ratio = 1.0
+epochs = 3
+batch_size = 512
+learning_rate = 1e-4
+window = 1
+selection_file = "selection_features.json"
+
+# Version 0: the fully trained model
+versions = load_versions(models_folder)
+if not versions:
+    register_version(models_folder, {
+        "version": 0,
+        "model": "modele_lstm_reduit_overfitting.h5",
+        "scaler": "modele_lstm_reduit_overfitting_scaler.pkl",
+        "replay": "modele_lstm_reduit_overfitting_replay.npz",
+        "parent": None,
+        "files": [],
+        "new_samples": 0,
+    })
+    versions = load_versions(models_folder)
+current = versions[-1]
+
+# Only flights not used by any version
+used = {name for version in versions for name in version["files"]}
+new_files = sorted(f for f in os.listdir(new_flights_folder) if f.endswith(".csv") and f not in used)
+if not new_files:
+    print(f"No new flight in '{new_flights_folder}', version {current['version']} is up to date.")
+else:
+    print(f"Updating version {current['version']} with {len(new_files)} new flights.")
+    model = load_model(current["model"])
+    if os.path.exists(selection_file):
+        feature_selection.load(selection_file)
+    with open(current["scaler"], "rb") as f:
+        scaler = pickle.load(f)
+    replay_buffer = ReplayBuffer.load(current["replay"]) if os.path.exists(current["replay"]) else ReplayBuffer()
+
+    n_new = fine_tune_model(model, [os.path.join(new_flights_folder, f) for f in new_files], scaler,
+                            replay_buffer, window, replay_ratio, epochs, batch_size, learning_rate,
+                            seed=current["version"] + 1)
+
+    # Save the new version
+    version = current["version"] + 1
+    model_path = os.path.join(models_folder, f"modele_lstm_v{version}.h5")
+    replay_path = os.path.join(models_folder, f"modele_lstm_v{version}_replay.npz")
+    model.save(model_path)
+    replay_buffer.save(replay_path)
+    register_version(models_folder, {
+        "version": version,
+        "model": model_path,
+        "scaler": current["scaler"],
+        "replay": replay_path,
+        "parent": current["version"],
+        "files": new_files,
+        "new_samples": n_new,
+    })
+    print(f"Model updated and saved as '{model_path}'.")
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Mise à jour incrémentale du modèle sur de nouveaux vols
+-------------------------------------------------------
+Ce script implémente l'ajustement fin (fine-tuning) d'un modèle déjà entraîné sur les
+seuls vols nouvellement arrivés, sans réentraînement complet. Pour limiter l'oubli des
+vols passés (oubli catastrophique), chaque lot de nouvelles données est mélangé à des
+échantillons passés tirés dans une mémoire de rejeu (replay buffer) de taille fixe.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Mémoire de rejeu `ReplayBuffer` (définie dans `modele_lstm_lib`) : échantillon
+      uniforme de taille fixe de tous les échantillons d'entraînement vus
+      (échantillonnage par réservoir), enregistré à côté de chaque version du modèle.
+    - Ajustement fin (`fine_tune_model`) : chaque nouveau vol est complété par
+      `replay_ratio` fois autant d'échantillons tirés dans la mémoire de rejeu, avec un
+      taux d'apprentissage réduit ; le vol est ensuite ajouté à la mémoire.
+    - Registre des versions (`versions.json`) : fichiers du modèle, du normaliseur et de
+      la mémoire de rejeu, version parente et vols utilisés par chaque version.
+
+Bibliothèques requises :
+    - os, json : Gestion des fichiers et du registre des versions.
+    - numpy : Mémoire de rejeu et tirages aléatoires.
+    - tensorflow.keras : Optimiseur de l'ajustement fin.
+    - modele_lstm_lib : Préparation des données, pondérations de classe et mémoire de rejeu.
+    - instrumentation_lib : Mesure du temps de chaque étape.
+
+Utilisation :
+    1. `modele_lstm_lib` remplit une mémoire de rejeu pendant l'entraînement complet et
+       l'enregistre avec le modèle (`modele_lstm_reduit_overfitting_replay.npz`).
+    2. Le script `mise_a_jour.py` ajuste la dernière version sur les nouveaux vols et
+       enregistre la version suivante.
+
+Remarques :
+    - Le normaliseur n'est pas modifié : les nouvelles données sont normalisées comme
+      celles de l'entraînement initial. La mémoire de rejeu est remplie avec ce même
+      normaliseur, ajusté sur tous les vols avant l'entraînement (`train_model`) : les
+      échantillons rejoués et les nouveaux vols sont à la même échelle.
+      Des valeurs hors de l'intervalle d'origine sortent simplement de [0, 1].
+    - Le coût d'une mise à jour est proportionnel au nombre de nouveaux échantillons
+      (plus `replay_ratio` fois autant d'échantillons rejoués), pas à l'historique.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import json
+import numpy as np
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping
+from instrumentation_lib import profiler
+from modele_lstm_lib import prepare_data, calculate_class_weights, ReplayBuffer
+
+#%% CONSTANTES
+VERSIONS_FILE = "versions.json"
+
+#%% FONCTIONS
+def load_versions(models_folder="modeles/"):
+    """
+    Relit le registre des versions du modèle.
+
+    Paramètres:
+        - models_folder (str): Dossier des versions.
+
+    Retourne:
+        - list of dict: Entrées du registre, de la plus ancienne à la plus récente
+          (liste vide si le registre n'existe pas).
+    """
+    path = os.path.join(models_folder, VERSIONS_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def register_version(models_folder, entry):
+    """
+    Ajoute une version au registre.
+
+    Paramètres:
+        - models_folder (str): Dossier des versions.
+        - entry (dict): Description de la version (`version`, `model`, `scaler`, `replay`,
+          `parent`, `files`, ...).
+
+    Remarque:
+        - Le registre est écrit sous un nom temporaire puis renommé.
+    """
+    os.makedirs(models_folder, exist_ok=True)
+    versions = load_versions(models_folder) + [entry]
+    path = os.path.join(models_folder, VERSIONS_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(versions, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def fine_tune_model(model, new_files, scaler, replay_buffer, window=1, replay_ratio=1.0, epochs=3,
+                    batch_size=512, learning_rate=1e-4, seed=0, verbose=1):
+    """
+    Ajuste un modèle entraîné sur de nouveaux vols, mélangés à des échantillons rejoués.
+
+    Paramètres:
+        - model (tensorflow.keras.Model): Modèle à ajuster (modifié en place).
+        - new_files (list of str): Fichiers CSV des nouveaux vols.
+        - scaler (MinMaxScaler ou None): Normaliseur enregistré avec le modèle (non modifié).
+        - replay_buffer (ReplayBuffer): Mémoire de rejeu ; les nouveaux vols y sont ajoutés.
+        - window (int): Taille des fenêtres d'agrégation (identique à l'entraînement).
+        - replay_ratio (float): Nombre d'échantillons rejoués par nouvel échantillon.
+        - epochs (int): Nombre d'époques par nouveau vol.
+        - batch_size (int): Taille des lots d'entraînement.
+        - learning_rate (float): Taux d'apprentissage de l'ajustement fin.
+        - seed (int): Graine des tirages.
+        - verbose (int): Niveau d'affichage.
+
+    Retourne:
+        - int: Nombre de nouveaux échantillons utilisés.
+
+    Remarque:
+        - Le modèle est recompilé avec un taux d'apprentissage réduit : l'état de
+          l'optimiseur de l'entraînement initial n'est pas conservé.
+        - Comme dans `train_model`, les 20 % finaux de chaque vol servent de validation
+          (arrêt anticipé, patience d'une époque, restauration des meilleurs poids).
+    """
+    model.compile(optimizer=Adam(learning_rate), loss='binary_crossentropy', metrics=['accuracy'])
+    rng = np.random.default_rng(seed)
+    n_new = 0
+    for file_path in new_files:
+        if verbose:
+            print(f"Fine-tuning with: {os.path.basename(file_path)}")
+        X, y = prepare_data(file_path, window, scaler)
+        n_train = int(len(X) * 0.8)
+        X_val, y_val = X[n_train:], y[n_train:]
+
+        # New samples mixed with past ones
+        X_mix, y_mix = X[:n_train], y[:n_train]
+        if replay_buffer.size:
+            X_replay, y_replay = replay_buffer.sample(int(n_train * replay_ratio), rng)
+            X_mix = np.concatenate([X_mix, X_replay.astype(X.dtype)])
+            y_mix = np.concatenate([y_mix, y_replay.astype(y.dtype)])
+        order = rng.permutation(len(X_mix))
+        if verbose:
+            print(f"{n_train} new and {len(X_mix) - n_train} replayed samples")
+
+        # Early stopping on the new flight's validation part
+        callbacks = [EarlyStopping(monitor='val_loss', patience=1, restore_best_weights=True)] if len(X_val) else []
+        with profiler.stage("fine_tune", rows=len(X_mix) * epochs):
+            model.fit(X_mix[order], y_mix[order], validation_data=(X_val, y_val) if len(X_val) else None,
+                      epochs=epochs, batch_size=batch_size, class_weight=calculate_class_weights(y_mix),
+                      callbacks=callbacks, verbose=verbose)
+
+        replay_buffer.add(X[:n_train], y[:n_train], rng)
+        n_new += n_train
+    return n_new
@@ -18,20 +18,33 @@ Date de création:
 
 Description des fonctionnalités :
     - Préparation des données : 
-      Normalisation des caractéristiques et mise en forme pour le modèle LSTM.
+      Normalisation des caractéristiques et mise en forme pour le modèle LSTM, 
+      avec agrégation optionnelle par fenêtres (voir `agregation_lib`) et réutilisation 
+      des données déjà prétraitées (voir `stockage_features_lib`).
     - Calcul des pondérations de classe pour équilibrer les données d'entraînement, 
       même en cas de classes absentes.
     - Construction d'un modèle LSTM avec régularisation (Dropout et L2).
     - Entraînement du modèle avec arrêt anticipé (early stopping) pour prévenir 
       le surapprentissage.
-    - Enregistrement du modèle entraîné dans un fichier HDF5.
+    - Enregistrement du modèle entraîné dans un fichier HDF5 et du normaliseur associé.
+    - Points de reprise périodiques (poids, état de l'optimiseur, normaliseur, position 
+      dans les données) et reprise exacte d'un entraînement interrompu (`--resume`).
+    - Évaluation d'un modèle sur un dossier de test en un seul passage (`evaluate_model`).
+    - Mémoire de rejeu (`ReplayBuffer`) des échantillons d'entraînement, enregistrée avec 
+      le modèle pour les mises à jour incrémentales (voir `mise_a_jour_lib`).
 
 Bibliothèques requises :
     - os : Gestion des fichiers et répertoires.
+    - pickle, argparse : Points de reprise et options de la ligne de commande.
     - numpy : Manipulation de tableaux numériques.
     - pandas : Gestion des données tabulaires (CSV).
     - sklearn : Prétraitement des données et gestion des classes déséquilibrées.
     - tensorflow.keras : Construction, entraînement et évaluation du modèle LSTM.
+    - agregation_lib : Agrégation par fenêtres des données de vol.
+    - metriques_lib : Métriques d'évaluation en flux.
+    - instrumentation_lib : Mesure du temps et de la mémoire de chaque étape.
+    - stockage_features_lib : Magasin des données prétraitées, relues par projection mémoire.
+    - selection_features_lib : Colonnes d'entrée retenues (`selection_features.json`).
 
 Fichiers requis :
     - Dossier `training_flights/` contenant les fichiers CSV avec les colonnes suivantes :
@@ -40,34 +53,55 @@ Fichiers requis :
 
 Résultats attendus :
     - Un modèle entraîné enregistré sous le nom : `modele_lstm_reduit_overfitting.h5`.
+    - Le normaliseur associé : `modele_lstm_reduit_overfitting_scaler.pkl`.
+    - La mémoire de rejeu associée : `modele_lstm_reduit_overfitting_replay.npz`.
+    - Un point de reprise `modele_lstm_checkpoint.pkl`, mis à jour pendant l'entraînement.
+    - Les mesures de chaque étape dans `profil_entrainement.jsonl` et un tableau 
+      récapitulatif affiché en fin d'entraînement.
     - Des pondérations de classe calculées pour chaque fichier de données, affichées 
       dans la console.
 
 Utilisation :
     1. Placez vos fichiers CSV dans le dossier spécifié par `training_folder`.
-    2. Exécutez le script pour entraîner le modèle et l'enregistrer.
+    2. Exécutez le script pour entraîner le modèle et l'enregistrer (la taille de 
+       fenêtre `window` doit être la même à l'entraînement et à l'évaluation).
     3. Le modèle enregistré peut être utilisé pour des prédictions sur de nouvelles données.
+    4. Après une interruption, relancez le script avec `--resume` pour reprendre 
+       l'entraînement là où il s'est arrêté.
 
 """
 #%% BIBLIOTHEQUES
 import os
+import pickle
+import argparse
 import numpy as np
-from tensorflow.keras.models import Sequential
+from tensorflow.keras.models import Sequential, model_from_json
 from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.callbacks import Callback
 from tensorflow.keras.regularizers import l2
 from sklearn.utils.class_weight import compute_class_weight
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
+from agregation_lib import load_aggregated, aggregate_windows
+from metriques_lib import StreamingMetrics
+from instrumentation_lib import profiler
+from stockage_features_lib import feature_store
+from selection_features_lib import feature_selection
 
 #%% FONCTIONS
-def prepare_data(file_path):
+def prepare_data(file_path, window=1, scaler=None, fit_scaler=False):
     """
     Prépare les données pour l'entraînement ou l'évaluation.
     Normalise les caractéristiques et les met en forme pour les modèles LSTM.
 
     Paramètres:
         - file_path (str): Chemin vers le fichier CSV contenant les données.
+        - window (int): Taille des fenêtres d'agrégation (1 : données brutes à 1 kHz). 
+          Au-delà de 1, chaque fenêtre est résumée par `agregation_lib.load_aggregated`.
+        - scaler (MinMaxScaler ou None): Normaliseur partagé entre fichiers. None : un 
+          normaliseur est ajusté sur ce seul fichier.
+        - fit_scaler (bool): Met à jour `scaler` avec ce fichier (`partial_fit`) avant 
+          de l'appliquer (entraînement) ; sinon il est seulement appliqué (évaluation).
 
     Retourne:
         - X (numpy.ndarray): Données d'entrée normalisées et mises en forme 
@@ -75,23 +109,175 @@ def prepare_data(file_path):
         - y (numpy.ndarray): Étiquettes (0 ou 1) correspondant aux données d'entrée.
 
     Remarque:
-        - Les colonnes 'altitude (m)' à 'alarms' sont utilisées comme caractéristiques.
+        - Les colonnes 'altitude (m)' à 'alarms' sont utilisées comme caractéristiques, 
+          restreintes aux colonnes retenues si une spécification `feature_selection` est chargée.
         - La colonne 'crash' est utilisée comme étiquette.
         - La normalisation est effectuée sur les caractéristiques pour les ramener dans 
           l'intervalle [0, 1].
         - Les données sont mises en forme pour être compatibles avec les LSTM, 
           qui attendent des entrées sous la forme (échantillons, timesteps, caractéristiques).
+        - Avec `window` > 1, il y a un échantillon par fenêtre et 6 fois plus de 
+          caractéristiques (moyenne, écart-type, min, max, dernière valeur, différence).
+        - Si le magasin `feature_store` est ouvert, le résultat est relu par projection 
+          mémoire (float32, lecture seule) lorsqu'il a déjà été calculé.
     """
-    data = pd.read_csv(file_path)
-    X = data.loc[:, 'altitude (m)':'alarms'].values  # Features
+    if feature_store.enabled:
+        return prepare_data_from_store(file_path, window, scaler, fit_scaler)
+    X, y = load_features(file_path, window)
+    return scale_and_reshape(X, y, scaler, fit_scaler)
+
+
+def load_features(file_path, window=1):
+    """
+    Lit les caractéristiques brutes (ou agrégées) et les étiquettes d'un fichier CSV.
+
+    Paramètres:
+        - file_path (str): Chemin vers le fichier CSV contenant les données.
+        - window (int): Taille des fenêtres d'agrégation (1 : données brutes).
+
+    Retourne:
+        - X (numpy.ndarray): Caractéristiques non normalisées, (échantillons, caractéristiques).
+        - y (numpy.ndarray): Étiquettes (0 ou 1).
+    """
+    with profiler.stage("read_csv" if window == 1 else "load_aggregated") as record:
+        if window > 1:
+            X, y = load_aggregated(file_path, window)
+        else:
+            data = pd.read_csv(file_path, usecols=feature_selection.usecols())
+            X = feature_selection.select(data)  # Features
+            y = data['crash'].values  # Labels
+        record["rows"] = len(X)
+    return X, y
+
+
+def prepare_data_from_store(file_path, window=1, scaler=None, fit_scaler=False):
+    """
+    Version de `prepare_data` servie par le magasin de caractéristiques `feature_store`.
+
+    Paramètres:
+        - file_path, window, scaler, fit_scaler: Voir `prepare_data`.
+
+    Retourne:
+        - X (numpy.memmap): Données normalisées et mises en forme, en lecture seule.
+        - y (numpy.memmap): Étiquettes.
+
+    Remarque:
+        - La clé de l'entrée comprend les paramètres du normaliseur : un normaliseur 
+          partagé est d'abord mis à jour avec les minimums et maximums du fichier, 
+          eux-mêmes conservés dans le magasin, sans relire le CSV.
+    """
+    config = {"columns": feature_selection.columns or ["altitude (m)", "alarms"], "window": window}
+    if scaler is not None and fit_scaler:
+        scaler.partial_fit(file_min_max(file_path, window))
+
+    scaling = "per_file" if scaler is None else {"min": scaler.min_.tolist(), "scale": scaler.scale_.tolist()}
+    key = feature_store.key(file_path, dict(config, scaling=scaling))
+    with profiler.stage("feature_store") as record:
+        entry = feature_store.get(key)
+        if entry is not None:
+            record["rows"] = len(entry["y"])
+    if entry is None:
+        X, y = load_features(file_path, window)
+        X, y = scale_and_reshape(X, y, scaler)
+        entry = feature_store.put(key, X=X.astype(np.float32), y=y)
+    return entry["X"], entry["y"]
+
+
+def file_min_max(file_path, window=1):
+    """
+    Minimums et maximums des caractéristiques (brutes ou agrégées) d'un fichier de vol.
+
+    Paramètres:
+        - file_path (str): Chemin vers le fichier CSV contenant les données.
+        - window (int): Taille des fenêtres d'agrégation.
+
+    Retourne:
+        - numpy.ndarray: (2, caractéristiques) : minimums puis maximums, à passer à 
+          `MinMaxScaler.partial_fit`.
+
+    Remarque:
+        - Si le magasin `feature_store` est ouvert, les statistiques y sont conservées 
+          et le CSV n'est lu qu'une fois.
+    """
+    if not feature_store.enabled:
+        X, _ = load_features(file_path, window)
+        return np.vstack([X.min(axis=0), X.max(axis=0)])
+    config = {"columns": feature_selection.columns or ["altitude (m)", "alarms"], "window": window}
+    stats_key = feature_store.key(file_path, dict(config, stats=True))
+    stats = feature_store.get(stats_key)
+    if stats is None:
+        X, _ = load_features(file_path, window)
+        stats = feature_store.put(stats_key, min=X.min(axis=0), max=X.max(axis=0))
+    return np.vstack([stats["min"], stats["max"]])
+
+
+def fit_scaler(scaler, file_paths, window=1):
+    """
+    Ajuste un normaliseur partagé sur l'ensemble des fichiers d'entraînement, avant 
+    l'entraînement : tous les fichiers sont ensuite normalisés avec le normaliseur final, 
+    celui qui est enregistré avec le modèle et utilisé à l'évaluation.
+
+    Paramètres:
+        - scaler (MinMaxScaler): Normaliseur à ajuster (modifié en place).
+        - file_paths (list of str): Fichiers CSV d'entraînement.
+        - window (int): Taille des fenêtres d'agrégation.
+
+    Retourne:
+        - MinMaxScaler: Le normaliseur ajusté.
+    """
+    with profiler.stage("fit_scaler", rows=len(file_paths)):
+        for file_path in file_paths:
+            scaler.partial_fit(file_min_max(file_path, window))
+    return scaler
+
+
+def prepare_frame(data, window=1, scaler=None, fit_scaler=False):
+    """
+    Prépare un vol déjà chargé en mémoire (DataFrame), comme `prepare_data` pour un fichier.
+
+    Paramètres:
+        - data (pandas.DataFrame): Données d'un vol, au format de `simulate_detailed_flight`.
+        - window, scaler, fit_scaler: Voir `prepare_data`.
+
+    Retourne:
+        - X (numpy.ndarray): Données d'entrée normalisées, (échantillons, timesteps, caractéristiques).
+        - y (numpy.ndarray): Étiquettes (0 ou 1).
+
+    Remarque:
+        - Aucun cache n'est utilisé : les données ne proviennent pas d'un fichier.
+    """
+    X = feature_selection.select(data)  # Features
     y = data['crash'].values  # Labels
+    if window > 1:
+        X, y = aggregate_windows(X, y, window)
+    return scale_and_reshape(X, y, scaler, fit_scaler)
+
 
+def scale_and_reshape(X, y, scaler=None, fit_scaler=False):
+    """
+    Normalise les caractéristiques et les met en forme pour le LSTM.
+
+    Paramètres:
+        - X (numpy.ndarray): Caractéristiques brutes (ou agrégées), (échantillons, caractéristiques).
+        - y (numpy.ndarray): Étiquettes (0 ou 1).
+        - scaler, fit_scaler: Voir `prepare_data`.
+
+    Retourne:
+        - X (numpy.ndarray): Données normalisées, (échantillons, 1, caractéristiques).
+        - y (numpy.ndarray): Étiquettes, inchangées.
+    """
     # Normalization
-    scaler = MinMaxScaler()
-    X = scaler.fit_transform(X)
+    with profiler.stage("scale", rows=len(X)):
+        if scaler is None:
+            X = MinMaxScaler().fit_transform(X)
+        else:
+            if fit_scaler:
+                scaler.partial_fit(X)
+            X = scaler.transform(X)
 
     # Reshape for LSTM
-    X = X.reshape((X.shape[0], 1, X.shape[1]))  # Expected format: (samples, timesteps, features)
+    with profiler.stage("reshape", rows=len(X)):
+        X = X.reshape((X.shape[0], 1, X.shape[1]))  # Expected format: (samples, timesteps, features)
     return X, y
 
 
@@ -135,13 +321,16 @@ def calculate_class_weights(y):
 # Path to training files
 training_folder = "training_flights/"
 
-def build_lstm_model(input_shape):
+def build_lstm_model(input_shape, units=(32, 16), dropout=0.3, l2_factor=0.01):
     """
     Construit un modèle LSTM avec régularisation pour réduire le surapprentissage.
 
     Paramètres:
         - input_shape (tuple): Dimensions des données d'entrée, sous la forme 
           (timesteps, caractéristiques).
+        - units (tuple): Nombre d'unités des deux couches LSTM.
+        - dropout (float): Taux de Dropout après chaque couche LSTM.
+        - l2_factor (float): Facteur de régularisation L2 des noyaux.
 
     Retourne:
         - tensorflow.keras.models.Sequential: Modèle LSTM compilé.
@@ -155,47 +344,397 @@ def build_lstm_model(input_shape):
           l'optimiseur `adam`.
     """
     model = Sequential()
-    model.add(LSTM(32, input_shape=input_shape, return_sequences=True, kernel_regularizer=l2(0.01)))
-    model.add(Dropout(0.3))  # Dropout Regularization
-    model.add(LSTM(16, return_sequences=False, kernel_regularizer=l2(0.01)))
-    model.add(Dropout(0.3))  # Dropout Regularization
-    model.add(Dense(1, activation='sigmoid', kernel_regularizer=l2(0.01)))  # L2 Regularization
+    model.add(LSTM(units[0], input_shape=input_shape, return_sequences=True, kernel_regularizer=l2(l2_factor)))
+    model.add(Dropout(dropout))  # Dropout Regularization
+    model.add(LSTM(units[1], return_sequences=False, kernel_regularizer=l2(l2_factor)))
+    model.add(Dropout(dropout))  # Dropout Regularization
+    model.add(Dense(1, activation='sigmoid', kernel_regularizer=l2(l2_factor)))  # L2 Regularization
     model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
     return model
 
-# Train the model on training files
-input_shape = None
-for file_name in os.listdir(training_folder):
-    file_path = os.path.join(training_folder, file_name)
-    if file_name.endswith(".csv"):
-        print(f"Training with: {file_name}")
+
+def save_checkpoint(checkpoint_path, model, scaler, cursor, replay_buffer=None):
+    """
+    Enregistre un point de reprise de l'entraînement.
+
+    Paramètres:
+        - checkpoint_path (str): Fichier du point de reprise.
+        - model (tensorflow.keras.Model): Modèle en cours d'entraînement.
+        - scaler (MinMaxScaler ou None): Normaliseur partagé.
+        - cursor (dict): Position dans les données : `file_index`, `file`, `epoch`, `offset` 
+          (nombre d'échantillons de l'époque déjà vus), et état de l'arrêt anticipé du 
+          fichier en cours : `best_loss`, `best_weights`, `wait`.
+        - replay_buffer (ReplayBuffer ou None): Mémoire de rejeu en cours de remplissage.
+
+    Remarque:
+        - Le fichier est écrit sous un nom temporaire puis renommé : une interruption 
+          pendant l'écriture laisse intact le point de reprise précédent.
+    """
+    checkpoint = {
+        "architecture": model.to_json(),
+        "weights": model.get_weights(),
+        "optimizer": [v.numpy() for v in model.optimizer.variables],
+        "scaler": scaler,
+        "cursor": cursor,
+        "replay": replay_buffer,
+    }
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Restaure un point de reprise écrit par `save_checkpoint`.
+
+    Paramètres:
+        - checkpoint_path (str): Fichier du point de reprise.
+
+    Retourne:
+        - model (tensorflow.keras.Model): Modèle compilé avec ses poids et l'état de l'optimiseur.
+        - scaler (MinMaxScaler ou None): Normaliseur partagé.
+        - cursor (dict): Position à laquelle reprendre l'entraînement.
+        - replay_buffer (ReplayBuffer ou None): Mémoire de rejeu.
+    """
+    with open(checkpoint_path, "rb") as f:
+        checkpoint = pickle.load(f)
+    model = model_from_json(checkpoint["architecture"])
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    model.set_weights(checkpoint["weights"])
+    model.optimizer.build(model.trainable_variables)
+    for variable, value in zip(model.optimizer.variables, checkpoint["optimizer"]):
+        variable.assign(value)
+    return model, checkpoint["scaler"], checkpoint["cursor"], checkpoint.get("replay")
+
+
+class TrainingCheckpoint(Callback):
+    """Callback Keras écrivant un point de reprise tous les `every` lots"""
+    def __init__(self, checkpoint_path, every, scaler, cursor, batch_size, replay_buffer=None) -> None:
+        super().__init__()
+        self.checkpoint_path = checkpoint_path
+        self.every = every
+        self.scaler = scaler
+        self.cursor = cursor
+        self.batch_size = batch_size
+        self.replay_buffer = replay_buffer
+
+    def on_train_batch_end(self, batch, logs=None):
+        if (batch + 1) % self.every == 0:
+            cursor = dict(self.cursor, offset=self.cursor["offset"] + (batch + 1) * self.batch_size)
+            save_checkpoint(self.checkpoint_path, self.model, self.scaler, cursor, self.replay_buffer)
+
+
+def train_model(training_folder, window=1, epochs=1, batch_size=512, model_params=None, model=None, verbose=1,
+                scaler=None, checkpoint_path=None, checkpoint_every=1000, resume=False, seed=0, replay_buffer=None,
+                files=None, validation_files=None):
+    """
+    Entraîne un modèle LSTM sur l'ensemble des fichiers CSV d'un dossier.
+
+    Paramètres:
+        - training_folder (str): Dossier contenant les fichiers CSV d'entraînement.
+        - window (int): Taille des fenêtres d'agrégation transmise à `prepare_data`.
+        - epochs (int): Nombre d'époques par fichier.
+        - batch_size (int): Taille des lots d'entraînement.
+        - model_params (dict ou None): Hyperparamètres transmis à `build_lstm_model` 
+          (`units`, `dropout`, `l2_factor`).
+        - model (tensorflow.keras.Model ou None): Modèle à continuer d'entraîner 
+          (None pour en construire un nouveau).
+        - verbose (int): Niveau d'affichage de `model.fit`.
+        - scaler (MinMaxScaler ou None): Normaliseur partagé, ajusté sur tous les fichiers 
+          d'entraînement avant le premier lot (`fit_scaler`) s'il ne l'est pas déjà (un 
+          normaliseur déjà ajusté est utilisé tel quel, par exemple pour continuer 
+          l'entraînement d'un modèle) ; None : normalisation propre à chaque fichier. Lors 
+          d'une reprise, son état est restauré en place depuis le point de reprise.
+        - checkpoint_path (str ou None): Fichier de point de reprise (None : pas de reprise).
+        - checkpoint_every (int): Nombre de lots entre deux points de reprise.
+        - resume (bool): Reprend l'entraînement depuis `checkpoint_path` s'il existe.
+        - seed (int): Graine du mélange des échantillons de chaque époque.
+        - replay_buffer (ReplayBuffer ou None): Mémoire de rejeu remplie avec les échantillons 
+          d'entraînement de chaque fichier, normalisés par `scaler` (requis : les échantillons 
+          rejoués doivent être à l'échelle du normaliseur enregistré avec le modèle). Lors 
+          d'une reprise, son état est restauré en place.
+        - files (list of str ou None): Noms des fichiers de `training_folder` à utiliser 
+          (None : tous les fichiers CSV).
+        - validation_files (list of str ou None): Chemins de vols entiers réservés à la 
+          validation (arrêt anticipé). None : les 20 % finaux de chaque fichier.
+
+    Retourne:
+        - tensorflow.keras.models.Sequential: Modèle entraîné.
+
+    Exceptions:
+        - ValueError: Si `replay_buffer` est fourni sans `scaler`.
+
+    Remarque:
+        - Le modèle est construit une seule fois, sur la forme du premier fichier, puis 
+          entraîné successivement sur chaque fichier avec ses propres pondérations de classe.
+        - Sans `validation_files`, les 20 % finaux de chaque fichier servent de validation 
+          (comme `validation_split=0.2`) : c'est la phase d'atterrissage, très corrélée au 
+          reste du vol. Des vols de validation distincts donnent un arrêt anticipé plus fiable ; 
+          ils sont prétraités une seule fois, avec le normaliseur final.
+          L'ordre des échantillons d'entraînement de chaque époque est un mélange déterminé 
+          par (seed, fichier, époque) : une reprise rejoue exactement la suite des lots.
+        - Un point de reprise contient les poids, l'état de l'optimiseur, le normaliseur 
+          (déjà ajusté sur tous les fichiers) et le curseur (fichier, époque, position dans 
+          l'époque, état de l'arrêt anticipé). Il est écrit tous les `checkpoint_every` lots 
+          et à la fin de chaque époque.
+        - L'arrêt anticipé (patience de 5 époques, restauration des meilleurs poids) est 
+          suivi par fichier ; son état est restauré lors d'une reprise. Sans données de 
+          validation (fichier trop court), toutes les époques sont effectuées ; si la perte 
+          de validation n'est jamais finie, les poids ne sont pas restaurés.
+    """
+    if replay_buffer is not None and scaler is None:
+        raise ValueError("La mémoire de rejeu nécessite un normaliseur partagé (scaler).")
+    files = sorted(files if files is not None else (f for f in os.listdir(training_folder) if f.endswith(".csv")))
+    cursor = {"file_index": 0, "file": None, "epoch": 0, "offset": 0}
+    if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+        model, saved_scaler, cursor, saved_replay = load_checkpoint(checkpoint_path)
+        if scaler is not None:
+            vars(scaler).update(vars(saved_scaler))  # restored in place for the caller
+        if replay_buffer is not None and saved_replay is not None:
+            vars(replay_buffer).update(vars(saved_replay))
+        if verbose:
+            print(f"Resuming from {cursor['file']}, epoch {cursor['epoch']}, sample {cursor['offset']}")
+    elif scaler is not None and not hasattr(scaler, "scale_"):
+        fit_scaler(scaler, [os.path.join(training_folder, f) for f in files], window)
+
+    # Held-out validation flights, scaled once with the final scaler
+    if validation_files:
+        validation = [prepare_data(path, window, scaler) for path in validation_files]
+        X_val = np.concatenate([v[0] for v in validation])
+        y_val = np.concatenate([v[1] for v in validation])
+
+    for file_index in range(cursor["file_index"], len(files)):
+        file_name = files[file_index]
+        file_path = os.path.join(training_folder, file_name)
+        if verbose:
+            print(f"Training with: {file_name}")
 
         # Prepare data
-        X_train, y_train = prepare_data(file_path)
-        input_shape = X_train.shape[1:]  # (timesteps, features)
+        X, y = prepare_data(file_path, window, scaler)
 
         # Calculate class weights
-        class_weights = calculate_class_weights(y_train)
-        print(f"Class weights: {class_weights}")
+        class_weights = calculate_class_weights(y)
+        if verbose:
+            print(f"Class weights: {class_weights}")
 
         # Build the model
-        model = build_lstm_model(input_shape)
-
-        # Early stopping
-        early_stopping = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
-
-        # Train the model
-        model.fit(
-            X_train,
-            y_train,
-            validation_split=0.2,
-            epochs=1,
-            batch_size=512,
-            class_weight=class_weights,
-            callbacks=[early_stopping],
-            verbose=1
-        )
-
-# Save the model
-model.save("modele_lstm_reduit_overfitting.h5")
-print("Model trained and saved as 'modele_lstm_reduit_overfitting.h5'.")
+        if model is None:
+            model = build_lstm_model(X.shape[1:], **(model_params or {}))  # (timesteps, features)
+
+        # Training / validation split: held-out flights, or last 20 % (as validation_split=0.2)
+        if validation_files:
+            n_train = len(X)
+        else:
+            n_train = int(len(X) * 0.8)
+            X_val, y_val = X[n_train:], y[n_train:]
+
+        # Replay buffer, unless this file was already added before the interruption
+        if replay_buffer is not None and (file_index != cursor["file_index"] or (cursor["epoch"], cursor["offset"]) == (0, 0)):
+            replay_buffer.add(X[:n_train], y[:n_train], np.random.default_rng([seed, file_index]))
+
+        # Early stopping, restored when resuming inside this file
+        if file_index == cursor["file_index"] and "best_loss" in cursor:
+            best_loss, best_weights, wait = cursor["best_loss"], cursor["best_weights"], cursor["wait"]
+        else:
+            best_loss, best_weights, wait = np.inf, None, 0
+
+        start_epoch = cursor["epoch"] if file_index == cursor["file_index"] else 0
+        for epoch in range(start_epoch, epochs):
+            offset = cursor["offset"] if (file_index, epoch) == (cursor["file_index"], cursor["epoch"]) else 0
+            order = np.random.default_rng([seed, file_index, epoch]).permutation(n_train)[offset:]
+            early_stopping = {"best_loss": best_loss, "best_weights": best_weights, "wait": wait}
+            epoch_cursor = {"file_index": file_index, "file": file_name, "epoch": epoch, "offset": offset,
+                            **early_stopping}
+
+            # Train the model
+            callbacks = []
+            if checkpoint_path is not None:
+                callbacks.append(TrainingCheckpoint(checkpoint_path, checkpoint_every, scaler, epoch_cursor, batch_size,
+                                                    replay_buffer))
+            with profiler.stage("fit", rows=len(order)):
+                history = model.fit(
+                    X[order],
+                    y[order],
+                    validation_data=(X_val, y_val) if len(X_val) else None,
+                    epochs=1,
+                    batch_size=batch_size,
+                    shuffle=False,
+                    class_weight=class_weights,
+                    callbacks=callbacks,
+                    verbose=verbose
+                )
+
+            # Patience only counts with validation data; a NaN loss is never an improvement
+            if len(X_val):
+                val_loss = history.history.get("val_loss", [np.inf])[-1]
+                if val_loss < best_loss:
+                    best_loss, best_weights, wait = val_loss, model.get_weights(), 0
+                else:
+                    wait += 1
+
+            # Next position: following epoch (with the early stopping state), or next file
+            if epoch + 1 < epochs:
+                next_cursor = {"file_index": file_index, "file": file_name, "epoch": epoch + 1, "offset": 0,
+                               "best_loss": best_loss, "best_weights": best_weights, "wait": wait}
+            else:
+                next_cursor = {"file_index": file_index + 1, "file": None, "epoch": 0, "offset": 0}
+            if wait >= 5:
+                if best_weights is not None:
+                    model.set_weights(best_weights)
+                next_cursor = {"file_index": file_index + 1, "file": None, "epoch": 0, "offset": 0}
+            if checkpoint_path is not None:
+                save_checkpoint(checkpoint_path, model, scaler, next_cursor, replay_buffer)
+            if wait >= 5:
+                break
+    return model
+
+
+def evaluate_model(model, testing_folder, window=1, n_bins=1000, scaler=None, files=None):
+    """
+    Évalue un modèle sur l'ensemble des fichiers CSV d'un dossier, en un seul passage.
+
+    Paramètres:
+        - model (tensorflow.keras.Model): Modèle à évaluer.
+        - testing_folder (str): Dossier contenant les fichiers CSV de test.
+        - window (int): Taille des fenêtres d'agrégation (identique à l'entraînement).
+        - n_bins (int): Nombre d'intervalles de probabilité des histogrammes.
+        - scaler (MinMaxScaler ou None): Normaliseur enregistré à l'entraînement 
+          (None : normalisation propre à chaque fichier).
+        - files (list of str ou None): Noms des fichiers de `testing_folder` à évaluer 
+          (None : tous les fichiers CSV).
+
+    Retourne:
+        - StreamingMetrics: Comptes cumulés sur tous les fichiers de test.
+    """
+    metrics = StreamingMetrics(n_bins)
+    for file_name in sorted(files if files is not None else (f for f in os.listdir(testing_folder) if f.endswith(".csv"))):
+        X_test, y_test = prepare_data(os.path.join(testing_folder, file_name), window, scaler)
+        with profiler.stage("predict", rows=len(X_test)):
+            y_prob = model.predict(X_test, batch_size=4096, verbose=0)
+        metrics.update(y_test, y_prob)
+    return metrics
+
+
+class ReplayBuffer:
+    """Échantillon uniforme de taille fixe des échantillons d'entraînement vus (réservoir)"""
+    def __init__(self, capacity=100000) -> None:
+        """
+        Paramètres:
+            - capacity (int): Nombre maximal d'échantillons conservés.
+        """
+        self.capacity = capacity
+        self.X = None
+        self.y = None
+        self.size = 0
+        self.n_seen = 0
+
+    def add(self, X, y, rng=None):
+        """
+        Ajoute des échantillons : chacun des `n_seen` échantillons vus a la même
+        probabilité `capacity / n_seen` d'être conservé.
+
+        Paramètres:
+            - X (numpy.ndarray): Échantillons normalisés, (échantillons, timesteps, caractéristiques).
+            - y (numpy.ndarray): Étiquettes.
+            - rng (numpy.random.Generator ou None): Générateur des tirages.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        if self.X is None:
+            self.X = np.empty((self.capacity,) + X.shape[1:], dtype=np.float32)
+            self.y = np.empty(self.capacity, dtype=np.int8)
+
+        # Free slots are filled first
+        n_free = min(self.capacity - self.size, len(X))
+        self.X[self.size:self.size + n_free] = X[:n_free]
+        self.y[self.size:self.size + n_free] = y[:n_free]
+        self.size += n_free
+
+        # Then sample t replaces a random slot with probability capacity / (t + 1)
+        seen = self.n_seen + n_free + np.arange(len(X) - n_free)
+        slots = (rng.random(len(seen)) * (seen + 1)).astype(np.int64)
+        kept = np.flatnonzero(slots < self.capacity)
+        self.X[slots[kept]] = X[n_free + kept]
+        self.y[slots[kept]] = y[n_free + kept]
+        self.n_seen += len(X)
+
+    def sample(self, n, rng=None):
+        """
+        Tire des échantillons sans remise.
+
+        Paramètres:
+            - n (int): Nombre d'échantillons (limité à la taille de la mémoire, qui ne doit
+              pas être vide).
+            - rng (numpy.random.Generator ou None): Générateur des tirages.
+
+        Retourne:
+            - X (numpy.ndarray): Échantillons tirés.
+            - y (numpy.ndarray): Étiquettes.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        selected = np.sort(rng.choice(self.size, min(n, self.size), replace=False))
+        return self.X[selected], self.y[selected]
+
+    def save(self, path):
+        """
+        Enregistre la mémoire de rejeu dans un fichier `.npz`.
+
+        Paramètres:
+            - path (str): Fichier de sortie.
+        """
+        np.savez(path, X=self.X[:self.size] if self.X is not None else np.empty(0, np.float32),
+                 y=self.y[:self.size] if self.y is not None else np.empty(0, np.int8),
+                 capacity=self.capacity, n_seen=self.n_seen)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Relit une mémoire de rejeu enregistrée par `save`.
+
+        Paramètres:
+            - path (str): Fichier `.npz`.
+
+        Retourne:
+            - ReplayBuffer: Mémoire de rejeu restaurée.
+        """
+        with np.load(path) as data:
+            buffer = cls(int(data["capacity"]))
+            if len(data["y"]):
+                buffer.add(data["X"], data["y"])
+            buffer.n_seen = int(data["n_seen"])
+        return buffer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the crash detection LSTM model.")
+    parser.add_argument("--resume", action="store_true", help="resume from the last checkpoint")
+    parser.add_argument("--checkpoint", default="modele_lstm_checkpoint.pkl", help="checkpoint file")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="batches between checkpoints")
+    parser.add_argument("--profile", default="profil_entrainement.jsonl", help="per-stage timings (JSON lines)")
+    args = parser.parse_args()
+    profiler.open(args.profile)
+    feature_store.open("features/")
+    if os.path.exists("selection_features.json"):
+        feature_selection.load("selection_features.json")
+
+    # Aggregation window (1 : raw 1 kHz data, 100 : one sample every 100 ms)
+    window = 1
+
+    # Scaler shared by all files (fitted on all of them before training), saved with the model for evaluation
+    scaler = MinMaxScaler()
+
+    # Sample of past training data, replayed by incremental updates (mise_a_jour.py)
+    replay_buffer = ReplayBuffer(capacity=100000)
+
+    # Train the model on training files
+    model = train_model(training_folder, window, scaler=scaler, checkpoint_path=args.checkpoint,
+                        checkpoint_every=args.checkpoint_every, resume=args.resume, replay_buffer=replay_buffer)
+
+    # Save the model and the scaler
+    model.save("modele_lstm_reduit_overfitting.h5")
+    with open("modele_lstm_reduit_overfitting_scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
+    replay_buffer.save("modele_lstm_reduit_overfitting_replay.npz")
+    print("Model trained and saved as 'modele_lstm_reduit_overfitting.h5'.")
+    profiler.print_summary()
+    profiler.close()
@@ -3,7 +3,8 @@ Programme d'évaluation de modèle LSTM sur des données de vol
 -----------------------------------------------------------
 Ce script évalue un modèle LSTM pré-entraîné sur des fichiers de données de vol 
 au format CSV, en calculant l'accuracy pour chaque fichier de test, ainsi que 
-l'accuracy moyenne globale.
+les métriques globales (précision, rappel, F1-score, courbes ROC et précision/rappel, 
+meilleur seuil) obtenues en un seul passage sur l'ensemble des fichiers.
 
 Auteurs:
     Can Kaya (kayac)
@@ -14,20 +15,33 @@ Date de création:
 
 Description des fonctionnalités :
     - Chargement d'un modèle LSTM depuis un fichier pré-entraîné (`modele_lstm_reduit_overfitting.h5`).
+    - Chargement du normaliseur de l'entraînement (`modele_lstm_reduit_overfitting_scaler.pkl`) 
+      s'il existe.
     - Parcours des fichiers CSV d'un répertoire de test spécifié.
     - Préparation des données pour le modèle via une fonction utilitaire (`prepare_data`).
     - Prédiction des résultats à partir des données testées.
-    - Calcul et affichage de l'accuracy par fichier et de l'accuracy moyenne sur l'ensemble des fichiers testés.
+    - Calcul et affichage de l'accuracy par fichier.
+    - Cumul des comptes de tous les fichiers dans un accumulateur `StreamingMetrics` 
+      (histogrammes de probabilités) et balayage de tous les seuils en fin de passage.
+    - Enregistrement du résumé et des courbes dans `metriques_evaluation.json`.
+    - Mesure du temps et de la mémoire de chaque étape (`profil_evaluation.jsonl`) et 
+      tableau récapitulatif en fin d'évaluation.
 
 Paramètres :
     - `testing_folder` : Répertoire contenant les fichiers CSV à évaluer.
-    - Seuil de probabilité pour la classification : 0.3 (modifiable selon le besoin).
+    - `window` : Taille des fenêtres d'agrégation, identique à celle utilisée à l'entraînement.
+    - `threshold` : Seuil de probabilité de référence pour la classification : 0.3 
+      (le meilleur seuil selon le F1-score est également recherché).
+    - `metrics_file` : Fichier JSON de sortie des métriques et des courbes.
 
 Bibliothèques requises :
     - `os` : Gestion des chemins de fichiers et des répertoires.
     - `numpy` : Calcul des métriques et manipulation des tableaux.
     - `tensorflow.keras` : Chargement et exécution du modèle LSTM.
-    - `utils` : Fonction personnalisée `prepare_data` pour préparer les données à partir des fichiers CSV.
+    - `modele_lstm_lib` : Fonction `prepare_data` pour préparer les données à partir des fichiers CSV.
+    - `metriques_lib` : Accumulateur de métriques en flux `StreamingMetrics`.
+    - `instrumentation_lib` : Mesure des étapes du pipeline.
+    - `stockage_features_lib` : Magasin des données prétraitées (dossier `features/`).
 
 Utilisation :
     Ce programme est conçu pour des projets impliquant la classification ou la 
@@ -38,41 +52,99 @@ Utilisation :
 Remarques :
     - Les fichiers de test doivent être au format CSV et respectent le format attendu 
       par la fonction `prepare_data`.
-    - La performance globale est indiquée sous forme d'accuracy moyenne sur tous 
-      les fichiers de test.
+    - La performance globale est calculée sur les comptes cumulés de tous les fichiers 
+      de test, et non comme une moyenne des accuracies par fichier.
 """
 
 import os
-import numpy as np
+import json
+import pickle
 from tensorflow.keras.models import load_model
-from utils import prepare_data  # Importer la fonction utilitaire
+from modele_lstm_lib import prepare_data  # Importer la fonction utilitaire
+from metriques_lib import StreamingMetrics
+from instrumentation_lib import profiler
+from stockage_features_lib import feature_store
+from selection_features_lib import feature_selection
+
+# Mesures de chaque étape (lecture, normalisation, prédiction...)
+profiler.open("profil_evaluation.jsonl")
+
+# Données prétraitées partagées avec l'entraînement (calculées au premier passage)
+feature_store.open("features/")
+
+# Colonnes d'entrée retenues à l'entraînement (sinon, toutes les colonnes)
+selection_file = "selection_features.json"
+if os.path.exists(selection_file):
+    feature_selection.load(selection_file)
+    print(f"Sélection des caractéristiques chargée depuis '{selection_file}'.")
 
 # Charger le modèle
 model = load_model("modele_lstm_reduit_overfitting.h5")
 print("Modèle chargé depuis 'modele_lstm_reduit_overfitting.h5'.")
 
+# Charger le normaliseur de l'entraînement (sinon, normalisation propre à chaque fichier)
+scaler = None
+scaler_file = "modele_lstm_reduit_overfitting_scaler.pkl"
+if os.path.exists(scaler_file):
+    with open(scaler_file, "rb") as f:
+        scaler = pickle.load(f)
+    print(f"Normaliseur chargé depuis '{scaler_file}'.")
+
 # Chemin vers les fichiers de test
 testing_folder = "testing_flights/"
 
-# Évaluer les fichiers de test
-accuracies = []
+# Taille des fenêtres d'agrégation (identique à celle de l'entraînement)
+window = 1
+
+# Seuil de référence et fichier de sortie des métriques
+threshold = 0.3
+metrics_file = "metriques_evaluation.json"
+
+# Évaluer les fichiers de test (un seul passage, comptes cumulés sur tous les fichiers)
+metrics = StreamingMetrics(n_bins=1000)
 for file_name in os.listdir(testing_folder):
     file_path = os.path.join(testing_folder, file_name)
     if file_name.endswith(".csv"):
         print(f"Évaluation avec : {file_name}")
 
         # Préparer les données de test
-        X_test, y_test = prepare_data(file_path)
+        X_test, y_test = prepare_data(file_path, window, scaler)
 
         # Prédictions
-        y_prob = model.predict(X_test)
-        y_pred = (y_prob >= 0.3).astype(int)
+        with profiler.stage("predict", rows=len(X_test)):
+            y_prob = model.predict(X_test, batch_size=4096)
+
+        # Métriques du fichier et mise à jour des comptes globaux
+        with profiler.stage("metrics", rows=len(X_test)):
+            file_metrics = StreamingMetrics(n_bins=metrics.n_bins).update(y_test, y_prob)
+            metrics.merge(file_metrics)
+        print(f"Accuracy pour {file_name}: {file_metrics.metrics(threshold)['accuracy']:.2f}")
+
+# Métriques globales (comptes cumulés, et non moyenne des accuracies par fichier)
+summary = metrics.summary(threshold)
+at_threshold, best = summary["at_threshold"], summary["best"]
+print(f"Résultats globaux au seuil {at_threshold['threshold']:.3f} : "
+      f"accuracy {at_threshold['accuracy']:.3f}, précision {at_threshold['precision']:.3f}, "
+      f"rappel {at_threshold['recall']:.3f}, F1 {at_threshold['f1']:.3f}")
+print(f"Meilleur seuil (F1) : {best['threshold']:.3f} : "
+      f"accuracy {best['accuracy']:.3f}, précision {best['precision']:.3f}, "
+      f"rappel {best['recall']:.3f}, F1 {best['f1']:.3f}")
+print(f"ROC AUC : {summary['roc_auc']:.3f}, précision moyenne : {summary['average_precision']:.3f}")
 
-        # Calcul de l'accuracy
-        accuracy = np.mean(y_pred.flatten() == y_test)
-        print(f"Accuracy pour {file_name}: {accuracy:.2f}")
-        accuracies.append(accuracy)
+# Sauvegarde du résumé et des courbes ROC / précision-rappel
+fpr, tpr, thresholds, _ = metrics.roc_curve()
+precision, recall, _, _ = metrics.pr_curve()
+summary["curves"] = {
+    "thresholds": thresholds.tolist(),
+    "fpr": fpr.tolist(),
+    "tpr": tpr.tolist(),
+    "precision": precision.tolist(),
+    "recall": recall.tolist(),
+}
+with open(metrics_file, "w") as f:
+    json.dump(summary, f, indent=2)
+print(f"Métriques enregistrées dans '{metrics_file}'.")
 
-# Accuracy moyenne sur tous les fichiers de test
-mean_accuracy = sum(accuracies) / len(accuracies)
-print(f"Accuracy moyenne sur les fichiers de test : {mean_accuracy:.2f}")
\ No newline at end of file
+# Temps passé dans chaque étape
+profiler.print_summary()
+profiler.close()
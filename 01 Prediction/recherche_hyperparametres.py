@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Recherche parallèle d'hyperparamètres du modèle LSTM
+----------------------------------------------------
+Ce script explore l'architecture et l'entraînement du modèle LSTM (unités des deux
+couches, Dropout, régularisation L2, taille de lot, nombre d'époques) en répartissant
+les essais sur plusieurs processus, dans un budget de cœurs CPU fixé.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Tirage aléatoire reproductible (graine fixe) de configurations distinctes dans
+      `search_space` (sans remise dans la grille des combinaisons).
+    - Exécution des essais dans `n_workers` processus ; chaque processus limite
+      TensorFlow à `cpu_budget // n_workers` threads intra-op et 1 thread inter-op,
+      pour ne pas dépasser le nombre de cœurs alloués.
+    - Arrêt anticipé des essais peu prometteurs (règle de la médiane) : après chaque
+      époque, un essai est arrêté si son score est inférieur à la médiane des scores
+      des autres essais à la même époque.
+    - Enregistrement de chaque essai terminé dans un fichier JSON lines, avec l'empreinte
+      de sa configuration (hyperparamètres, dossiers et fenêtre) ; une recherche
+      interrompue reprend en ignorant les essais dont la configuration a déjà été évaluée.
+      Si `search_space`, `n_trials` ou `seed` changent, les configurations différentes
+      sont réévaluées au lieu de reprendre les scores d'un autre essai.
+    - Affichage des meilleures configurations.
+
+Paramètres :
+    - `training_folder` / `validation_folder` : Fichiers CSV d'entraînement et de validation.
+    - `window` : Taille des fenêtres d'agrégation (voir `agregation_lib`).
+    - `search_space` : Valeurs possibles de chaque hyperparamètre.
+    - `n_trials`, `seed` : Nombre d'essais et graine du tirage.
+    - `cpu_budget`, `n_workers` : Nombre de cœurs alloués et de processus parallèles.
+    - `min_reports` : Nombre minimal d'essais à une époque avant d'appliquer la règle de la médiane.
+    - `results_file` : Fichier JSON lines des résultats.
+
+Bibliothèques requises :
+    - multiprocessing : Processus parallèles et partage des scores intermédiaires.
+    - modele_lstm_lib : Entraînement (`train_model`) et évaluation (`evaluate_model`),
+      importé uniquement dans les processus de calcul.
+
+Remarques :
+    - Le score d'un essai est le F1-score au meilleur seuil sur `validation_folder`.
+    - Comme pour le modèle livré, chaque essai ajuste un normaliseur MinMaxScaler partagé
+      sur ses fichiers d'entraînement et l'applique aux vols de validation.
+    - Les processus sont lancés avec la méthode 'spawn' : TensorFlow n'est jamais
+      importé dans le processus principal, ce qui évite les problèmes de fork.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import json
+import hashlib
+import random
+import itertools
+import statistics
+import multiprocessing as mp
+
+#%% PARAMETRES
+training_folder = "training_flights/"
+validation_folder = "validation_flights/"
+window = 100
+search_space = {
+    "units": [(16, 8), (32, 16), (64, 32)],
+    "dropout": [0.1, 0.3, 0.5],
+    "l2_factor": [0.0, 0.001, 0.01],
+    "batch_size": [256, 512, 1024],
+    "epochs": [1, 3, 5],
+}
+n_trials = 20
+seed = 0
+cpu_budget = os.cpu_count()
+n_workers = max(1, cpu_budget // 4)
+min_reports = 3
+results_file = "recherche_hyperparametres.jsonl"
+
+#%% FONCTIONS
+def sample_trials(search_space, n_trials, seed):
+    """
+    Tire des configurations aléatoires dans l'espace de recherche.
+
+    Paramètres:
+        - search_space (dict): Valeurs possibles de chaque hyperparamètre.
+        - n_trials (int): Nombre de configurations à tirer (limité au nombre de combinaisons).
+        - seed (int): Graine du générateur aléatoire.
+
+    Retourne:
+        - list of dict: Configurations distinctes, chacune identifiée par la clé `trial`.
+
+    Remarque:
+        - Le tirage est déterministe : une recherche reprise retrouve les mêmes essais.
+        - Les configurations sont tirées sans remise : aucune n'est entraînée deux fois,
+          ni comptée deux fois par la règle de la médiane.
+    """
+    rng = random.Random(seed)
+    grid = list(itertools.product(*search_space.values()))
+    trials = []
+    for trial, values in enumerate(rng.sample(grid, min(n_trials, len(grid)))):
+        params = dict(zip(search_space, values))
+        params["trial"] = trial
+        trials.append(params)
+    return trials
+
+
+def trial_key(params):
+    """
+    Empreinte d'une configuration, indépendante de son numéro d'essai.
+
+    Paramètres:
+        - params (dict): Configuration issue de `sample_trials`.
+
+    Retourne:
+        - str: Empreinte BLAKE2b des hyperparamètres, des dossiers et de la fenêtre.
+    """
+    config = {name: value for name, value in params.items() if name != "trial"}
+    config.update(training_folder=training_folder, validation_folder=validation_folder, window=window)
+    return hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def load_results(results_file):
+    """
+    Lit les résultats des essais déjà terminés.
+
+    Paramètres:
+        - results_file (str): Fichier JSON lines des résultats.
+
+    Retourne:
+        - dict: Résultats indexés par empreinte de configuration (vide si le fichier
+          n'existe pas) ; les lignes sans empreinte sont ignorées.
+    """
+    results = {}
+    if os.path.exists(results_file):
+        with open(results_file) as f:
+            for line in f:
+                if line.strip():
+                    result = json.loads(line)
+                    if "key" in result:
+                        results[result["key"]] = result
+    return results
+
+
+def init_worker(threads, reports, lock):
+    """
+    Initialise un processus de calcul : limite les threads de TensorFlow.
+
+    Paramètres:
+        - threads (int): Nombre de threads intra-op alloués à ce processus.
+        - reports (dict partagé): Scores intermédiaires {époque: [scores]} de tous les essais.
+        - lock (verrou partagé): Protège les mises à jour de `reports`.
+
+    Remarque:
+        - Les variables d'environnement sont fixées avant l'import de TensorFlow,
+          seul moment où elles sont prises en compte.
+    """
+    global _reports, _lock
+    _reports, _lock = reports, lock
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(params):
+    """
+    Entraîne et évalue une configuration, époque par époque, avec arrêt anticipé.
+
+    Paramètres:
+        - params (dict): Configuration issue de `sample_trials`.
+
+    Retourne:
+        - dict: Configuration, scores par époque, meilleur score, statut
+          ('complete' ou 'pruned') et durée de l'essai.
+    """
+    import time
+    from sklearn.preprocessing import MinMaxScaler
+    from modele_lstm_lib import train_model, evaluate_model
+
+    start = time.perf_counter()
+    model_params = {"units": tuple(params["units"]), "dropout": params["dropout"], "l2_factor": params["l2_factor"]}
+    model = None
+    scaler = MinMaxScaler()  # fitted on the training files by the first train_model call
+    scores = []
+    status = "complete"
+    for epoch in range(params["epochs"]):
+        model = train_model(training_folder, window, epochs=1, batch_size=params["batch_size"],
+                            model_params=model_params, model=model, verbose=0, scaler=scaler)
+        score = evaluate_model(model, validation_folder, window, scaler=scaler).best_threshold("f1")["f1"]
+        scores.append(score)
+
+        # Median stopping rule against the other trials at the same epoch
+        with _lock:
+            others = list(_reports.get(epoch, []))
+            _reports[epoch] = others + [score]
+        if len(others) >= min_reports and score < statistics.median(others):
+            status = "pruned"
+            break
+
+    return dict(params, key=trial_key(params), scores=scores, score=max(scores), status=status,
+                duration_s=time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sampled = sample_trials(search_space, n_trials, seed)
+    finished = load_results(results_file)
+    # Only the results of the configurations sampled now are reused
+    done = {trial_key(t): finished[trial_key(t)] for t in sampled if trial_key(t) in finished}
+    trials = [t for t in sampled if trial_key(t) not in done]
+    print(f"{len(done)} essai(s) déjà terminé(s), {len(trials)} à exécuter "
+          f"sur {n_workers} processus x {max(1, cpu_budget // n_workers)} thread(s).")
+
+    ctx = mp.get_context("spawn")
+    with ctx.Manager() as manager:
+        # Intermediate scores of the finished trials are known from the results file
+        reports = manager.dict()
+        for result in done.values():
+            for epoch, score in enumerate(result["scores"]):
+                reports[epoch] = reports.get(epoch, []) + [score]
+
+        with ctx.Pool(n_workers, initializer=init_worker,
+                      initargs=(max(1, cpu_budget // n_workers), reports, manager.Lock())) as pool:
+            for result in pool.imap_unordered(run_trial, trials):
+                done[result["key"]] = result
+                with open(results_file, "a") as f:
+                    f.write(json.dumps(result) + "\n")
+                print(f"Essai {result['trial']} ({result['status']}) : F1 {result['score']:.3f} "
+                      f"en {result['duration_s']:.0f} s")
+
+    # Meilleures configurations
+    ranking = sorted(done.values(), key=lambda r: r["score"], reverse=True)
+    print("Meilleures configurations :")
+    for r in ranking[:5]:
+        print(f"  F1 {r['score']:.3f} : units={tuple(r['units'])}, dropout={r['dropout']}, "
+              f"l2={r['l2_factor']}, batch_size={r['batch_size']}, epochs={len(r['scores'])}/{r['epochs']}")
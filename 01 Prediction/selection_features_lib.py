@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Sélection automatique des caractéristiques d'entrée
+---------------------------------------------------
+Ce script implémente une analyse en flux des colonnes 'altitude (m)' à 'alarms' sur
+l'ensemble des vols (variance, corrélations deux à deux, dépendance au seul temps) et
+produit une spécification de sélection enregistrée en JSON. L'entraînement et
+l'inférence appliquent cette spécification : les colonnes sans information ne sont
+plus lues, normalisées ni passées au modèle.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Analyse en un passage, par blocs de lignes (`analyse_features`) : effectif, sommes
+      et produits croisés (float64, décalés par une référence pour la stabilité
+      numérique), d'où moyenne, écart-type et matrice de corrélation du corpus.
+    - Détection des colonnes ne dépendant que du temps : un sous-échantillon du premier
+      vol sert de référence, et l'écart maximal des autres vols aux mêmes instants est suivi.
+    - Spécification (`build_spec`) : colonnes constantes et colonnes redondantes
+      (|corrélation| >= `corr_threshold` avec une colonne déjà conservée, dans l'ordre
+      des colonnes) sont retirées, avec leur motif. Les colonnes fonction du temps seul
+      sont signalées (`time_only`) mais conservées par défaut (`drop_time_only=False`).
+    - Instance partagée `feature_selection`, utilisée par `prepare_data`, `prepare_frame`,
+      `load_aggregated`, l'index de fenêtres et le flux de simulation.
+
+Bibliothèques requises :
+    - os, json, hashlib : Fichiers de la spécification et étiquette de cache.
+    - numpy, pandas : Lecture par blocs et statistiques.
+
+Utilisation :
+    1. Exécutez ce script pour analyser `training_folder` et écrire `selection_features.json`.
+    2. Les scripts d'entraînement et d'inférence chargent la spécification avec
+       `feature_selection.load("selection_features.json")` si le fichier existe.
+    3. Un modèle entraîné avec une spécification doit être utilisé avec la même.
+
+Remarques :
+    - Une colonne constante sauf dans quelques scénarios (comme `engine_rpm`) a une
+      variance non nulle sur le corpus et est conservée : c'est elle qui signale ces scénarios.
+    - De même, `pitch` n'est égal à `aoa * 0.5` qu'en dehors des scénarios de décrochage
+      et de panne hydraulique : avec ces scénarios dans le corpus, sa corrélation avec
+      `aoa` reste sous un seuil strict et elle est conservée.
+    - Une colonne fonction du temps seul a la même distribution dans les vols avec et
+      sans crash (comme `roll` et `yaw`). Dans les vols simulés de durée fixe, les
+      colonnes de phase de vol (`altitude`, `flaps`, `gear`, `autopilot`) le sont aussi :
+      elles apportent le contexte de la phase, c'est pourquoi elles ne sont retirées
+      qu'avec `drop_time_only=True` (et jamais celles de `always_keep`).
+    - Toute colonne retirée change le nombre d'entrées du modèle : un modèle entraîné
+      sans spécification ne peut pas être utilisé avec une spécification.
+    - La dépendance au seul temps suppose des vols échantillonnés à partir de t = 0 au
+      même pas ; elle n'est testée qu'aux instants sous-échantillonnés (`reference_stride`).
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+#%% CONSTANTES
+FIRST_COLUMN = 'altitude (m)'
+LAST_COLUMN = 'alarms'
+
+#%% FONCTIONS
+def analyse_features(folder, chunk_size=1_000_000, reference_stride=100):
+    """
+    Calcule en un passage les statistiques des colonnes d'entrée d'un dossier de vols.
+
+    Paramètres:
+        - folder (str): Dossier des fichiers CSV.
+        - chunk_size (int): Nombre de lignes lues à la fois.
+        - reference_stride (int): Pas du sous-échantillonnage du vol de référence.
+
+    Retourne:
+        - dict: `columns`, `n_samples`, `mean`, `std`, `correlation` (matrice) et
+          `time_deviation` (écart maximal au vol de référence aux mêmes instants).
+    """
+    columns, shift = None, None
+    n, total, cross = 0, None, None
+    reference_file, reference_parts, reference, time_deviation = None, [], None, None
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith(".csv"):
+            continue
+        offset = 0
+        for chunk in pd.read_csv(os.path.join(folder, file_name), chunksize=chunk_size):
+            X = chunk.loc[:, FIRST_COLUMN:LAST_COLUMN]
+            if columns is None:
+                columns = list(X.columns)
+                reference_file = file_name
+                shift = X.values.mean(axis=0)
+                total = np.zeros(len(columns))
+                cross = np.zeros((len(columns), len(columns)))
+                time_deviation = np.zeros(len(columns))
+            X = X.values.astype(np.float64)
+
+            # Shifted sums for a numerically stable covariance
+            Xc = X - shift
+            n += len(Xc)
+            total += Xc.sum(axis=0)
+            cross += Xc.T @ Xc
+
+            # Reference flight at sub-sampled instants
+            rows = np.arange(-offset % reference_stride, len(X), reference_stride)
+            positions = (offset + rows) // reference_stride
+            if file_name == reference_file:
+                reference_parts.append(X[rows])
+            else:
+                if reference is None:
+                    reference = np.concatenate(reference_parts)
+                overlap = positions < len(reference)
+                if overlap.any():
+                    deviation = np.abs(X[rows[overlap]] - reference[positions[overlap]]).max(axis=0)
+                    time_deviation = np.maximum(time_deviation, deviation)
+            offset += len(X)
+
+    if columns is None:
+        raise ValueError(f"Aucun fichier CSV dans '{folder}'.")
+    mean = total / n
+    covariance = cross / n - np.outer(mean, mean)
+    std = np.sqrt(np.maximum(np.diag(covariance), 0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = covariance / np.outer(std, std)
+    return {
+        "columns": columns,
+        "n_samples": n,
+        "mean": (mean + shift).tolist(),
+        "std": std.tolist(),
+        "correlation": np.nan_to_num(correlation).tolist(),
+        "time_deviation": time_deviation.tolist() if reference is not None else None,
+    }
+
+
+def build_spec(stats, corr_threshold=0.9999, tolerance=1e-9, drop_time_only=False, always_keep=('altitude (m)',)):
+    """
+    Construit la spécification de sélection à partir des statistiques du corpus.
+
+    Paramètres:
+        - stats (dict): Résultat de `analyse_features`.
+        - corr_threshold (float): |Corrélation| à partir de laquelle une colonne est redondante.
+        - tolerance (float): Écart-type (ou écart au vol de référence) relatif en dessous
+          duquel une colonne est constante (ou fonction du temps seul).
+        - drop_time_only (bool): Retire les colonnes fonction du temps seul (sinon, elles
+          sont seulement signalées dans `time_only`).
+        - always_keep (tuple of str): Colonnes conservées quelle que soit l'analyse.
+
+    Retourne:
+        - dict: `columns` (toutes), `keep` (conservées, dans l'ordre du fichier),
+          `dropped` ({colonne: motif}), `time_only` (colonnes fonction du temps seul,
+          retirées ou non) et les statistiques résumées.
+
+    Remarque:
+        - Sans second vol, la dépendance au temps n'est pas testée.
+    """
+    columns, std = stats["columns"], np.asarray(stats["std"])
+    scale = tolerance * (1 + np.abs(np.asarray(stats["mean"])))
+    correlation = np.abs(np.asarray(stats["correlation"]))
+    time_only = [column for i, column in enumerate(columns) if std[i] > scale[i]
+                 and stats["time_deviation"] is not None and stats["time_deviation"][i] <= scale[i]]
+    keep, dropped = [], {}
+    for i, column in enumerate(columns):
+        if column in always_keep:
+            keep.append(i)
+        elif std[i] <= scale[i]:
+            dropped[column] = "constant"
+        elif drop_time_only and column in time_only:
+            dropped[column] = "time only"
+        else:
+            redundant = [columns[j] for j in keep if correlation[i, j] >= corr_threshold]
+            if redundant:
+                dropped[column] = f"redundant with {redundant[0]}"
+            else:
+                keep.append(i)
+    return {
+        "columns": columns,
+        "keep": [columns[i] for i in keep],
+        "dropped": dropped,
+        "time_only": time_only,
+        "corr_threshold": corr_threshold,
+        "n_samples": stats["n_samples"],
+        "mean": dict(zip(columns, stats["mean"])),
+        "std": dict(zip(columns, stats["std"])),
+    }
+
+#%% CLASSES
+class FeatureSelection:
+    """Colonnes d'entrée retenues, appliquées à la lecture des vols"""
+    def __init__(self) -> None:
+        self.columns = None
+
+    @property
+    def enabled(self):
+        """Vrai si une spécification a été chargée."""
+        return self.columns is not None
+
+    def load(self, path="selection_features.json"):
+        """
+        Charge une spécification écrite par ce script.
+
+        Paramètres:
+            - path (str): Fichier JSON de la spécification.
+        """
+        with open(path) as f:
+            self.columns = json.load(f)["keep"]
+
+    def close(self):
+        """Revient à toutes les colonnes."""
+        self.columns = None
+
+    @property
+    def tag(self):
+        """Étiquette courte des colonnes retenues, pour les noms de fichiers de cache ('' sans sélection)."""
+        if self.columns is None:
+            return ""
+        return "_" + hashlib.blake2b(json.dumps(self.columns).encode(), digest_size=4).hexdigest()
+
+    def usecols(self):
+        """Colonnes à lire dans un CSV (caractéristiques retenues et étiquette), None pour toutes."""
+        return None if self.columns is None else self.columns + ["crash"]
+
+    def select(self, data):
+        """
+        Extrait les caractéristiques retenues d'un vol.
+
+        Paramètres:
+            - data (pandas.DataFrame): Données d'un vol.
+
+        Retourne:
+            - numpy.ndarray: (échantillons, caractéristiques retenues).
+        """
+        if self.columns is None:
+            return data.loc[:, FIRST_COLUMN:LAST_COLUMN].values
+        return data[self.columns].values
+
+#%% INSTANCE PARTAGEE
+feature_selection = FeatureSelection()
+
+
+if __name__ == "__main__":
+    training_folder = "training_flights/"
+    spec_file = "selection_features.json"
+
+    stats = analyse_features(training_folder)
+    spec = build_spec(stats)
+    print(f"{'colonne':<26} {'moyenne':>12} {'écart-type':>12}  décision")
+    for column in spec["columns"]:
+        decision = spec["dropped"].get(column, "kept (time only)" if column in spec["time_only"] else "kept")
+        print(f"{column:<26} {spec['mean'][column]:>12.4g} {spec['std'][column]:>12.4g}  {decision}")
+    print(f"{len(spec['keep'])} colonnes conservées sur {len(spec['columns'])} ({spec['n_samples']} échantillons).")
+    print(f"Colonnes retirées : {', '.join(f'{c} ({r})' for c, r in spec['dropped'].items()) or 'aucune'}.")
+
+    with open(spec_file, "w") as f:
+        json.dump(spec, f, indent=2)
+    print(f"Spécification enregistrée dans '{spec_file}'.")
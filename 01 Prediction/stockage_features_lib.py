@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Stockage des données prétraitées en tableaux projetés en mémoire
+----------------------------------------------------------------
+Ce script implémente un magasin de caractéristiques : les données X / y prétraitées
+de chaque vol (sélection des colonnes, agrégation, normalisation, mise en forme) sont
+écrites une seule fois en fichiers `.npy`, puis relues par projection mémoire (memmap)
+lors des exécutions suivantes, sans copie. Les processus d'entraînement et
+d'évaluation lancés en parallèle partagent ainsi les mêmes pages du cache système.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Clé d'entrée : empreinte (BLAKE2b) du contenu du fichier source et de la
+      configuration de prétraitement (colonnes, fenêtre, paramètres de normalisation).
+    - Empreintes des fichiers source mémorisées par (chemin, taille, date de modification) :
+      un fichier inchangé n'est pas relu pour être haché.
+    - Écriture atomique de chaque entrée (dossier temporaire renommé) : plusieurs
+      processus peuvent remplir le magasin en même temps sans entrée partielle.
+    - Statistiques brutes par fichier (minimum et maximum de chaque caractéristique),
+      pour ajuster un normaliseur partagé sans relire les données.
+    - Instance partagée `feature_store`, utilisée par `prepare_data` lorsqu'elle est ouverte.
+
+Bibliothèques requises :
+    - os, json, hashlib, tempfile : Gestion des fichiers et empreintes.
+    - numpy : Écriture et projection mémoire des tableaux `.npy`.
+
+Utilisation :
+    1. Un script ouvre le magasin : `feature_store.open("features/")`.
+    2. `prepare_data` lit alors les entrées existantes par projection mémoire et crée
+       les entrées manquantes.
+
+Remarques :
+    - Les tableaux relus sont en lecture seule (float32 pour X).
+    - Le magasin n'est jamais purgé automatiquement : supprimez le dossier pour le vider.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+#%% CLASSES
+class FeatureStore:
+    """Magasin de données prétraitées, indexé par empreinte du fichier et de la configuration"""
+    def __init__(self) -> None:
+        self.folder = None
+        self.digests = {}
+
+    @property
+    def enabled(self):
+        """Vrai si le magasin a été ouvert."""
+        return self.folder is not None
+
+    def open(self, folder="features/"):
+        """
+        Ouvre (et crée si besoin) le dossier du magasin.
+
+        Paramètres:
+            - folder (str): Dossier du magasin.
+        """
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        digests_path = os.path.join(folder, "digests.json")
+        if os.path.exists(digests_path):
+            with open(digests_path) as f:
+                self.digests = json.load(f)
+
+    def close(self):
+        """Désactive le magasin."""
+        self.folder = None
+        self.digests = {}
+
+    def file_digest(self, file_path):
+        """
+        Empreinte du contenu d'un fichier, recalculée seulement s'il a changé.
+
+        Paramètres:
+            - file_path (str): Fichier source.
+
+        Retourne:
+            - str: Empreinte BLAKE2b hexadécimale du contenu.
+        """
+        stat = os.stat(file_path)
+        signature = f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if signature not in self.digests:
+            h = hashlib.blake2b(digest_size=16)
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            self.digests[signature] = h.hexdigest()
+            self._write_json("digests.json", self.digests)
+        return self.digests[signature]
+
+    def key(self, file_path, config):
+        """
+        Clé d'une entrée.
+
+        Paramètres:
+            - file_path (str): Fichier source.
+            - config (dict): Configuration de prétraitement (sérialisable en JSON).
+
+        Retourne:
+            - str: Empreinte du fichier et de la configuration.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.file_digest(file_path).encode())
+        h.update(json.dumps(config, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Projette une entrée en mémoire.
+
+        Paramètres:
+            - key (str): Clé de l'entrée.
+
+        Retourne:
+            - dict ou None: Tableaux de l'entrée (memmap en lecture seule), None si absente.
+        """
+        entry = os.path.join(self.folder, key)
+        if not os.path.isdir(entry):
+            return None
+        return {os.path.splitext(name)[0]: np.load(os.path.join(entry, name), mmap_mode="r")
+                for name in os.listdir(entry) if name.endswith(".npy")}
+
+    def put(self, key, **arrays):
+        """
+        Écrit une entrée de façon atomique, puis la projette en mémoire.
+
+        Paramètres:
+            - key (str): Clé de l'entrée.
+            - arrays (numpy.ndarray): Tableaux à enregistrer, nommés.
+
+        Retourne:
+            - dict: Tableaux de l'entrée (memmap en lecture seule).
+
+        Remarque:
+            - Si un autre processus a écrit la même entrée entre-temps, la sienne est conservée.
+        """
+        tmp = tempfile.mkdtemp(dir=self.folder, prefix=".tmp-")
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name + ".npy"), array)
+        try:
+            os.rename(tmp, os.path.join(self.folder, key))
+        except OSError:  # written concurrently by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+        return self.get(key)
+
+    def _write_json(self, name, content):
+        tmp = os.path.join(self.folder, f".{name}.{os.getpid()}")
+        with open(tmp, "w") as f:
+            json.dump(content, f)
+        os.replace(tmp, os.path.join(self.folder, name))
+
+#%% INSTANCE PARTAGEE
+feature_store = FeatureStore()
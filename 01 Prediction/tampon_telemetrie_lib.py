@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Tampon circulaire de télémétrie en direct, avec statistiques glissantes incrémentales
+-------------------------------------------------------------------------------------
+Ce script implémente un tampon circulaire qui conserve les `window_len` derniers
+échantillons de nombreux vols dans un seul tableau NumPy préalloué, et tient à jour à
+chaque échantillon les statistiques de la fenêtre glissante (moyenne, variance,
+minimum, maximum, taux de variation) sans la reparcourir.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Stockage : tableau (vols, 2 * window_len, caractéristiques) ; chaque échantillon
+      est écrit deux fois (case `i` et case `i + window_len`), de sorte que la fenêtre
+      d'un vol est toujours une tranche contiguë, dans l'ordre chronologique, du tableau
+      (`window`) : aucune copie.
+    - Ajout d'un échantillon pour un ou plusieurs vols à la fois (`push`), chaque vol
+      ayant sa propre position.
+    - Moyenne et variance : sommes glissantes (ajout de l'entrant, retrait du sortant),
+      recalculées exactement une fois par tour du tampon pour éviter la dérive numérique.
+    - Minimum et maximum : algorithme de van Herk / Gil-Werman en flux ; minimum courant
+      du tour en cours et minimums suffixes du tour précédent, calculés une fois par tour.
+    - Coût par échantillon en O(1) amorti, quel que soit `window_len`.
+    - Sorties pour les détecteurs : dernier échantillon au format du modèle LSTM
+      (`latest`) ou statistiques de fenêtre au format de `agregation_lib` (`features`).
+
+Bibliothèques requises :
+    - numpy : Tableaux préalloués et calculs vectorisés.
+    - agregation_lib : Ordre des agrégats (`AGGREGATES`).
+
+Utilisation :
+    buffer = TelemetryRingBuffer(n_flights=64, window_len=1000, n_features=16)
+    for flights, samples in telemetry:              # samples : (len(flights), caractéristiques)
+        buffer.push(flights, scaler.transform(samples))
+        y_prob = model(buffer.latest(flights))      # LSTM, entrée (vols, 1, caractéristiques)
+        X_stats = buffer.features(flights)          # préfiltre à base de statistiques
+
+Remarques :
+    - Les statistiques d'un vol qui n'a pas encore rempli sa fenêtre portent sur ses
+      échantillons reçus ; elles valent NaN pour un vol sans échantillon.
+    - Les sommes sont tenues en float64 ; les données et les extremums en float32.
+    - Les vues retournées par `window` sont réécrites par les ajouts suivants : copiez-les
+      pour les conserver.
+"""
+
+#%% BIBLIOTHEQUES
+import numpy as np
+from agregation_lib import AGGREGATES
+
+#%% CLASSES
+class TelemetryRingBuffer:
+    """Fenêtres glissantes de plusieurs vols dans un tableau préalloué"""
+    def __init__(self, n_flights, window_len, n_features, sample_rate_hz=1000) -> None:
+        """
+        Paramètres:
+            - n_flights (int): Nombre de vols suivis.
+            - window_len (int): Nombre d'échantillons de la fenêtre glissante.
+            - n_features (int): Nombre de caractéristiques par échantillon.
+            - sample_rate_hz (float): Fréquence d'échantillonnage, pour le taux de variation.
+        """
+        self.n_flights = n_flights
+        self.window_len = window_len
+        self.n_features = n_features
+        self.sample_rate_hz = sample_rate_hz
+        self.data = np.zeros((n_flights, 2 * window_len, n_features), dtype=np.float32)
+        self.count = np.zeros(n_flights, dtype=np.int64)
+        self.sum = np.zeros((n_flights, n_features))
+        self.sumsq = np.zeros((n_flights, n_features))
+        # Extremes of the current lap and suffix extremes of the previous lap (index window_len: empty suffix)
+        self.lap_min = np.full((n_flights, n_features), np.inf, dtype=np.float32)
+        self.lap_max = np.full((n_flights, n_features), -np.inf, dtype=np.float32)
+        self.suffix_min = np.full((n_flights, window_len + 1, n_features), np.inf, dtype=np.float32)
+        self.suffix_max = np.full((n_flights, window_len + 1, n_features), -np.inf, dtype=np.float32)
+
+    def reset(self, flight):
+        """
+        Vide la fenêtre d'un vol (nouveau vol sur la même ligne du tableau).
+
+        Paramètres:
+            - flight (int): Indice du vol.
+        """
+        self.count[flight] = 0
+        self.sum[flight] = 0
+        self.sumsq[flight] = 0
+        self.lap_min[flight] = np.inf
+        self.lap_max[flight] = -np.inf
+        self.suffix_min[flight] = np.inf
+        self.suffix_max[flight] = -np.inf
+
+    def push(self, flights, samples):
+        """
+        Ajoute un échantillon à chacun des vols indiqués.
+
+        Paramètres:
+            - flights (int ou array-like): Indice(s) des vols, sans doublon.
+            - samples (numpy.ndarray): Échantillons, (len(flights), caractéristiques).
+        """
+        flights = np.atleast_1d(flights)
+        samples = np.asarray(samples, dtype=np.float32).reshape(len(flights), self.n_features)
+        n = self.window_len
+        slot = self.count[flights] % n
+
+        # Running sums: add the incoming sample, remove the one leaving the window
+        evicted = np.where((self.count[flights] >= n)[:, None], self.data[flights, slot], 0).astype(np.float64)
+        self.sum[flights] += samples - evicted
+        self.sumsq[flights] += np.square(samples, dtype=np.float64) - evicted ** 2
+
+        self.data[flights, slot] = samples
+        self.data[flights, slot + n] = samples
+        self.count[flights] += 1
+
+        # Extremes of the current lap, restarted at its first slot
+        first = (slot == 0)[:, None]
+        self.lap_min[flights] = np.where(first, samples, np.minimum(self.lap_min[flights], samples))
+        self.lap_max[flights] = np.where(first, samples, np.maximum(self.lap_max[flights], samples))
+
+        # End of a lap: the window is exactly this lap, once per window_len samples
+        for flight in flights[slot == n - 1]:
+            window = self.data[flight, n:]
+            self.suffix_min[flight, :n] = np.minimum.accumulate(window[::-1])[::-1]
+            self.suffix_max[flight, :n] = np.maximum.accumulate(window[::-1])[::-1]
+            self.sum[flight] = window.sum(axis=0, dtype=np.float64)
+            self.sumsq[flight] = np.square(window, dtype=np.float64).sum(axis=0)
+
+    def window(self, flight):
+        """
+        Fenêtre d'un vol, sans copie.
+
+        Paramètres:
+            - flight (int): Indice du vol.
+
+        Retourne:
+            - numpy.ndarray: Vue (échantillons reçus, au plus window_len ; caractéristiques),
+              du plus ancien au plus récent.
+        """
+        end = self.window_len + (self.count[flight] - 1) % self.window_len + 1 if self.count[flight] else self.window_len
+        return self.data[flight, end - min(self.count[flight], self.window_len):end]
+
+    def _selection(self, flights):
+        flights = np.arange(self.n_flights) if flights is None else np.atleast_1d(flights)
+        filled = np.minimum(self.count[flights], self.window_len)
+        last_slot = (self.count[flights] - 1) % self.window_len
+        return flights, filled, last_slot
+
+    def mean(self, flights=None):
+        """Moyenne glissante, (vols, caractéristiques)."""
+        flights, filled, _ = self._selection(flights)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sum[flights] / filled[:, None]
+
+    def var(self, flights=None):
+        """Variance glissante (population), (vols, caractéristiques)."""
+        flights, filled, _ = self._selection(flights)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.sum[flights] / filled[:, None]
+            return np.maximum(self.sumsq[flights] / filled[:, None] - mean ** 2, 0)
+
+    def std(self, flights=None):
+        """Écart-type glissant, (vols, caractéristiques)."""
+        return np.sqrt(self.var(flights))
+
+    def min(self, flights=None):
+        """Minimum glissant, (vols, caractéristiques)."""
+        flights, filled, last_slot = self._selection(flights)
+        result = np.minimum(self.suffix_min[flights, last_slot + 1], self.lap_min[flights])
+        return np.where((filled > 0)[:, None], result, np.nan)
+
+    def max(self, flights=None):
+        """Maximum glissant, (vols, caractéristiques)."""
+        flights, filled, last_slot = self._selection(flights)
+        result = np.maximum(self.suffix_max[flights, last_slot + 1], self.lap_max[flights])
+        return np.where((filled > 0)[:, None], result, np.nan)
+
+    def last(self, flights=None):
+        """Dernier échantillon reçu, (vols, caractéristiques)."""
+        flights, filled, last_slot = self._selection(flights)
+        return np.where((filled > 0)[:, None], self.data[flights, last_slot + self.window_len], np.nan)
+
+    def first(self, flights=None):
+        """Plus ancien échantillon de la fenêtre, (vols, caractéristiques)."""
+        flights, filled, last_slot = self._selection(flights)
+        return np.where((filled > 0)[:, None], self.data[flights, last_slot + self.window_len - np.maximum(filled, 1) + 1], np.nan)
+
+    def rate_of_change(self, flights=None):
+        """Taux de variation sur la fenêtre (unités par seconde), (vols, caractéristiques)."""
+        _, filled, _ = self._selection(flights)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            duration_s = np.where(filled > 1, filled - 1, np.nan) / self.sample_rate_hz
+            return (self.last(flights) - self.first(flights)) / duration_s[:, None]
+
+    def latest(self, flights=None):
+        """
+        Dernier échantillon de chaque vol, au format d'entrée du modèle LSTM.
+
+        Paramètres:
+            - flights (array-like ou None): Indices des vols (None : tous).
+
+        Retourne:
+            - numpy.ndarray: (vols, 1, caractéristiques), en float32.
+        """
+        return self.last(flights).astype(np.float32)[:, None, :]
+
+    def features(self, flights=None):
+        """
+        Statistiques de fenêtre de chaque vol, au format de `agregation_lib`.
+
+        Paramètres:
+            - flights (array-like ou None): Indices des vols (None : tous).
+
+        Retourne:
+            - numpy.ndarray: (vols, caractéristiques * 6), agrégats dans l'ordre de
+              `AGGREGATES` (moyenne, écart-type, min, max, dernière valeur, différence).
+        """
+        statistics = {
+            "mean": self.mean(flights),
+            "std": self.std(flights),
+            "min": self.min(flights),
+            "max": self.max(flights),
+            "last": self.last(flights),
+            "diff": self.last(flights) - self.first(flights),
+        }
+        return np.hstack([statistics[name] for name in AGGREGATES]).astype(np.float32)
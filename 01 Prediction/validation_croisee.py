@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Validation croisée par vol du modèle LSTM, en parallèle
+-------------------------------------------------------
+Ce script évalue le modèle LSTM par validation croisée en k plis, en répartissant des
+vols entiers entre les plis : aucun vol n'a d'échantillons à la fois en entraînement et
+en test. Les plis sont entraînés dans des processus parallèles et les métriques sont
+agrégées avec des intervalles de confiance.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Répartition des vols en `n_folds` plis (`flight_folds`), stratifiée par scénario
+      si le fichier `scenarios.json` écrit par le simulateur est présent, sinon par
+      étiquette du vol (crash ou normal).
+    - Pour le pli k : test sur les vols du pli k, arrêt anticipé sur les vols du pli
+      k + 1, entraînement sur les autres vols.
+    - Exécution des plis dans `n_workers` processus, chacun limité à
+      `cpu_budget // n_workers` threads TensorFlow.
+    - Métriques de chaque pli (F1 au seuil de référence et au meilleur seuil, ROC AUC,
+      précision moyenne), moyenne et intervalle de confiance de Student sur les plis,
+      et métriques de l'ensemble des prédictions de test regroupées.
+
+Paramètres :
+    - `training_folder` : Dossier des fichiers CSV des vols.
+    - `window` : Taille des fenêtres d'agrégation (voir `agregation_lib`).
+    - `n_folds`, `seed`, `stratify` : Nombre de plis, graine de la répartition et stratification.
+    - `epochs`, `batch_size` : Paramètres d'entraînement de chaque pli.
+    - `confidence` : Niveau des intervalles de confiance.
+    - `cpu_budget`, `n_workers` : Nombre de cœurs alloués et de processus parallèles.
+    - `threshold` : Seuil de référence des métriques.
+    - `results_file` : Fichier JSON des résultats.
+
+Bibliothèques requises :
+    - multiprocessing : Processus parallèles.
+    - numpy, scipy : Répartition des vols et intervalles de confiance.
+    - pandas : Étiquette de chaque vol lorsque les scénarios sont inconnus.
+    - modele_lstm_lib : Entraînement (`train_model`) et évaluation (`evaluate_model`),
+      importé uniquement dans les processus de calcul.
+
+Remarques :
+    - Il faut au moins 3 plis (test, validation et entraînement disjoints).
+    - Les processus sont lancés avec la méthode 'spawn' : TensorFlow n'est jamais
+      importé dans le processus principal.
+    - Avec peu de plis, l'intervalle de confiance est large : il reflète la variabilité
+      d'un vol à l'autre, qui est la quantité utile pour choisir un modèle.
+"""
+
+#%% BIBLIOTHEQUES
+import os
+import json
+import numpy as np
+import pandas as pd
+import multiprocessing as mp
+from scipy import stats
+
+#%% PARAMETRES
+training_folder = "training_flights/"
+window = 100
+n_folds = 5
+seed = 0
+stratify = True
+epochs = 1
+batch_size = 512
+confidence = 0.95
+cpu_budget = os.cpu_count()
+n_workers = min(n_folds, cpu_budget)
+threshold = 0.3
+results_file = "validation_croisee.json"
+
+#%% FONCTIONS
+def flight_strata(folder):
+    """
+    Strate de chaque vol d'un dossier.
+
+    Paramètres:
+        - folder (str): Dossier des fichiers CSV.
+
+    Retourne:
+        - dict: Scénario de chaque fichier (d'après `scenarios.json`), ou à défaut
+          'crash' / 'normal' d'après la première ligne de la colonne `crash`.
+    """
+    files = sorted(f for f in os.listdir(folder) if f.endswith(".csv"))
+    manifest_path = os.path.join(folder, "scenarios.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if all(name in manifest for name in files):
+            return {name: manifest[name] for name in files}
+    return {name: "crash" if pd.read_csv(os.path.join(folder, name), usecols=["crash"], nrows=1)["crash"].iloc[0]
+            else "normal" for name in files}
+
+
+def flight_folds(strata, n_folds, seed=0, stratify=True):
+    """
+    Répartit des vols entiers entre les plis.
+
+    Paramètres:
+        - strata (dict): Strate de chaque vol (voir `flight_strata`).
+        - n_folds (int): Nombre de plis.
+        - seed (int): Graine de la répartition.
+        - stratify (bool): Répartit chaque strate équitablement entre les plis.
+
+    Retourne:
+        - list of list: Noms des fichiers de chaque pli.
+
+    Exceptions:
+        - ValueError: S'il y a moins de 3 plis ou moins de vols que de plis.
+    """
+    if n_folds < 3 or len(strata) < n_folds:
+        raise ValueError(f"{len(strata)} vols pour {n_folds} plis : il faut au moins 3 plis et un vol par pli.")
+    rng = np.random.default_rng(seed)
+    groups = {}
+    for name, stratum in sorted(strata.items()):
+        groups.setdefault(stratum if stratify else None, []).append(name)
+
+    # Round-robin over the shuffled flights of each stratum, continuing across strata
+    folds = [[] for _ in range(n_folds)]
+    position = 0
+    for stratum in sorted(groups, key=str):
+        for name in rng.permutation(groups[stratum]):
+            folds[position % n_folds].append(str(name))
+            position += 1
+    return folds
+
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Moyenne et intervalle de confiance de Student d'une série de scores.
+
+    Paramètres:
+        - values (list of float): Scores des plis.
+        - confidence (float): Niveau de confiance.
+
+    Retourne:
+        - dict: `mean`, `std`, `low`, `high`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+    half = float(stats.t.ppf((1 + confidence) / 2, len(values) - 1) * std / np.sqrt(len(values))) if len(values) > 1 else 0.0
+    return {"mean": mean, "std": std, "low": mean - half, "high": mean + half}
+
+
+def init_worker(threads):
+    """
+    Initialise un processus de calcul : limite les threads de TensorFlow.
+
+    Paramètres:
+        - threads (int): Nombre de threads intra-op alloués à ce processus.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_fold(task):
+    """
+    Entraîne et évalue un pli.
+
+    Paramètres:
+        - task (tuple): (numéro du pli, liste des plis).
+
+    Retourne:
+        - dict: Numéro du pli, vols de test, métriques et comptes `StreamingMetrics`
+          des prédictions de test (pour le regroupement).
+    """
+    import time
+    from sklearn.preprocessing import MinMaxScaler
+    from modele_lstm_lib import train_model, evaluate_model
+
+    fold, folds = task
+    start = time.perf_counter()
+    test_files = folds[fold]
+    validation_files = folds[(fold + 1) % len(folds)]
+    train_files = [name for k, names in enumerate(folds) if k not in (fold, (fold + 1) % len(folds)) for name in names]
+
+    scaler = MinMaxScaler()
+    model = train_model(training_folder, window, epochs=epochs, batch_size=batch_size, verbose=0, scaler=scaler,
+                        seed=seed + fold, files=train_files,
+                        validation_files=[os.path.join(training_folder, name) for name in validation_files])
+    metrics = evaluate_model(model, training_folder, window, scaler=scaler, files=test_files)
+    summary = metrics.summary(threshold)
+    return {
+        "fold": fold,
+        "test_files": test_files,
+        "f1": summary["at_threshold"]["f1"],
+        "best_f1": summary["best"]["f1"],
+        "roc_auc": summary["roc_auc"],
+        "average_precision": summary["average_precision"],
+        "duration_s": time.perf_counter() - start,
+        "metrics": metrics,
+    }
+
+
+if __name__ == "__main__":
+    strata = flight_strata(training_folder)
+    folds = flight_folds(strata, n_folds, seed, stratify)
+    for k, names in enumerate(folds):
+        print(f"Pli {k} : {', '.join(f'{n} ({strata[n]})' for n in names)}")
+    print(f"{n_folds} plis sur {n_workers} processus x {max(1, cpu_budget // n_workers)} thread(s).")
+
+    ctx = mp.get_context("spawn")
+    results = []
+    with ctx.Pool(n_workers, initializer=init_worker, initargs=(max(1, cpu_budget // n_workers),)) as pool:
+        for result in pool.imap_unordered(run_fold, [(k, folds) for k in range(n_folds)]):
+            results.append(result)
+            print(f"Pli {result['fold']} : F1 {result['f1']:.3f}, meilleur F1 {result['best_f1']:.3f}, "
+                  f"ROC AUC {result['roc_auc']:.3f} en {result['duration_s']:.0f} s")
+    results.sort(key=lambda r: r["fold"])
+
+    # Fold statistics and pooled test predictions
+    pooled = results[0]["metrics"]
+    for result in results[1:]:
+        pooled.merge(result["metrics"])
+    report = {
+        "n_folds": n_folds,
+        "confidence": confidence,
+        "folds": [{k: v for k, v in r.items() if k != "metrics"} for r in results],
+        "summary": {name: confidence_interval([r[name] for r in results], confidence)
+                    for name in ("f1", "best_f1", "roc_auc", "average_precision")},
+        "pooled": pooled.summary(threshold),
+    }
+
+    print(f"{'métrique':<18} {'moyenne':>8} {'écart-type':>11} {f'IC {100 * confidence:.0f} %':>18}")
+    for name, ci in report["summary"].items():
+        print(f"{name:<18} {ci['mean']:>8.3f} {ci['std']:>11.3f}   [{ci['low']:.3f}, {ci['high']:.3f}]")
+
+    with open(results_file, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats enregistrés dans '{results_file}'.")
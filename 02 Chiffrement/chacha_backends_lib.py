@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+Implémentations interchangeables de ChaCha20 et mesures de performance
+----------------------------------------------------------------------
+Ce script regroupe les implémentations de ChaCha20 disponibles derrière une même
+interface (« backends »), mesure leurs performances, et choisit automatiquement la plus
+rapide pour chaque taille de message. L'implémentation en Python pur reste toujours
+disponible et sert de solution de repli.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Backends :
+        - 'pure' : `chacha_lib.ChaCha20_cipher` (Python pur, toujours disponible) ;
+        - 'numpy' : `chacha_numpy_lib.ChaCha20Stream` (si NumPy est installé) ;
+        - 'cryptography' : ChaCha20 du paquet `cryptography` (s'il est installé ;
+          ChaCha20 à 20 rounds uniquement).
+      Chaque backend fournit un contexte par message : `new_context(name, key, nonce)`
+      retourne une fonction qui chiffre (ou déchiffre) le message.
+    - Mesures (`benchmark_backend`) : débit sur un gros volume (Mo/s), latence par paquet
+      (médiane et 99e centile, de 16 à 1500 octets) et coût de création du contexte.
+    - Choix automatique (`BackendDispatcher`) : sans rapport de mesures, ordre de
+      préférence par défaut ('cryptography', puis 'numpy' au-delà de `NUMPY_MIN_BYTES`
+      octets, puis 'pure') ; avec un rapport chargé, le backend le plus rapide mesuré
+      pour la taille du message.
+
+Bibliothèques requises :
+    - chacha_lib : Implémentation en Python pur.
+    - numpy, chacha_numpy_lib (optionnels) : Implémentation vectorisée.
+    - cryptography (optionnel) : Implémentation native.
+
+Utilisation :
+    1. Exécutez ce script pour mesurer les backends et écrire `rapport_chiffrement.json`.
+    2. Chiffrez avec le backend le plus rapide :
+    from chacha_backends_lib import dispatcher
+    dispatcher.load("rapport_chiffrement.json")   # optionnel
+    ciphertext = dispatcher.encrypt(key, nonce, plaintext)
+
+Remarques :
+    - Exécuter ce script mesure les backends disponibles et écrit le rapport
+      `rapport_chiffrement.json` (ChaCha20 pur : environ 0,5 Mo/s ; NumPy : environ
+      110 Mo/s, mais une latence fixe de l'ordre de la milliseconde par paquet ;
+      cryptography : plusieurs Go/s et une dizaine de µs par paquet).
+    - Tous les backends donnent le même résultat (vérifié par `check_backends`) : le
+      choix du backend n'affecte que la vitesse.
+"""
+
+#%% BIBLIOTHEQUES
+import json
+import time
+import platform
+from chacha_lib import (ChaCha20_cipher, chacha20_block, chacha20_xor_keystream, CHACHA20_ROUNDS, CHACHA_VARIANTS,
+                        check_rounds)
+try:
+    import numpy as np
+    from chacha_numpy_lib import ChaCha20Stream
+except ImportError:
+    np = None
+try:
+    import cryptography
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+except ImportError:
+    cryptography = None
+
+#%% CONSTANTES
+PACKET_SIZES = (16, 64, 256, 512, 1024, 1500)
+NUMPY_MIN_BYTES = 512   # below this, the fixed cost of the NumPy kernels dominates
+
+#%% FONCTIONS
+def _pure_context(key, nonce, counter, rounds):
+    return _PureStream(key, nonce, counter, rounds).update
+
+
+def _numpy_context(key, nonce, counter, rounds):
+    stream = ChaCha20Stream(key, nonce, counter, rounds)
+    return lambda data: bytes(stream.update(data))
+
+
+def _cryptography_context(key, nonce, counter, rounds):
+    # The 16-byte "nonce" of the cryptography package is the block counter followed by the nonce
+    encryptor = Cipher(algorithms.ChaCha20(bytes(key), counter.to_bytes(4, "little") + bytes(nonce)), mode=None).encryptor()
+    return encryptor.update
+
+
+def available_backends(rounds=CHACHA20_ROUNDS):
+    """
+    Backends installés qui acceptent un nombre de rounds.
+
+    Paramètres:
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - list of str: Noms des backends, 'pure' en dernier.
+    """
+    check_rounds(rounds)
+    names = []
+    if cryptography is not None and rounds == 20:
+        names.append("cryptography")
+    if np is not None:
+        names.append("numpy")
+    names.append("pure")
+    return names
+
+
+def new_context(name, key, nonce, counter=1, rounds=CHACHA20_ROUNDS):
+    """
+    Crée le contexte de chiffrement d'un message avec un backend.
+
+    Paramètres:
+        - name (str): Nom du backend.
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - counter (int): Compteur du premier bloc.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - callable: Fonction data -> bytes, qui chiffre (ou déchiffre) le message ; pour
+          tous les backends, des appels successifs continuent le flux de clé (le message
+          peut être traité en plusieurs morceaux).
+
+    Exceptions:
+        - ValueError: Si le backend n'est pas disponible pour ce nombre de rounds.
+    """
+    if name not in available_backends(rounds):
+        raise ValueError(f"Backend '{name}' indisponible pour ChaCha{rounds} (disponibles : {available_backends(rounds)}).")
+    factory = {"pure": _pure_context, "numpy": _numpy_context, "cryptography": _cryptography_context}[name]
+    return factory(key, nonce, counter, rounds)
+
+
+def check_backends(rounds=CHACHA20_ROUNDS, size=1500):
+    """
+    Vérifie que tous les backends disponibles donnent le même texte chiffré, d'un seul
+    appel ou en deux morceaux de tailles quelconques (suite du flux de clé).
+
+    Paramètres:
+        - rounds (int): Nombre de rounds.
+        - size (int): Taille du message de test.
+
+    Exceptions:
+        - AssertionError: Si deux backends diffèrent.
+    """
+    key, nonce = bytes(range(32)), bytes(range(12))
+    message = bytes(i % 251 for i in range(size))
+    results = {name: new_context(name, key, nonce, rounds=rounds)(message) for name in available_backends(rounds)}
+    assert len(set(results.values())) == 1, f"Backends en désaccord : {sorted(results)}"
+    for name in available_backends(rounds):
+        context = new_context(name, key, nonce, rounds=rounds)
+        split = size // 3
+        assert context(message[:split]) + context(message[split:]) == results[name], \
+            f"Le backend '{name}' ne continue pas le flux de clé entre deux appels."
+
+
+def _timings(function, repeats):
+    """Durées (secondes) de `repeats` appels de `function`, après quelques appels de chauffe."""
+    for _ in range(min(5, repeats)):
+        function()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)
+
+
+def _summary_us(timings):
+    """Médiane et 99e centile (microsecondes) de durées triées."""
+    return {"median_us": 1e6 * timings[len(timings) // 2],
+            "p99_us": 1e6 * timings[min(len(timings) - 1, int(0.99 * len(timings)))]}
+
+
+def benchmark_backend(name, bulk_bytes=1 << 22, packet_sizes=PACKET_SIZES, repeats=200, rounds=CHACHA20_ROUNDS):
+    """
+    Mesure les performances d'un backend.
+
+    Paramètres:
+        - name (str): Nom du backend.
+        - bulk_bytes (int): Taille du message du test de débit.
+        - packet_sizes (tuple of int): Tailles des paquets du test de latence.
+        - repeats (int): Nombre de mesures par taille de paquet et pour la création de contexte.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - dict: `bulk_mb_s` (débit, meilleur de 3 essais), `setup` (création d'un contexte)
+          et `packets` ({taille: latence}) ; latences en médiane et 99e centile (µs).
+
+    Remarque:
+        - La latence d'un paquet comprend la création de son contexte (un nonce par paquet).
+    """
+    key, nonce = bytes(range(32)), bytes(range(12))
+    bulk = bytes(bulk_bytes)
+    best = min(_timings(lambda: new_context(name, key, nonce, rounds=rounds)(bulk), 3))
+    setup = _timings(lambda: new_context(name, key, nonce, rounds=rounds), repeats)
+    packets = {}
+    for size in packet_sizes:
+        packet = bytes(size)
+        packets[size] = _summary_us(_timings(lambda: new_context(name, key, nonce, rounds=rounds)(packet), repeats))
+    return {"bulk_mb_s": bulk_bytes / best / 1e6, "setup": _summary_us(setup), "packets": packets}
+
+
+def environment():
+    """Description de la machine et des versions, pour le rapport."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": np.__version__ if np is not None else None,
+        "cryptography": cryptography.__version__ if cryptography is not None else None,
+    }
+
+#%% CLASSES
+class _PureStream:
+    """Flux ChaCha20 en Python pur : compteur courant et octets restants du dernier bloc"""
+    def __init__(self, key, nonce, counter, rounds) -> None:
+        self.cipher = ChaCha20_cipher(key, nonce, counter, rounds)
+        self.leftover = b""
+
+    def update(self, data):
+        """Chiffre (ou déchiffre) la suite du message avec la suite du flux de clé."""
+        data = memoryview(data).cast("B")
+        n = min(len(self.leftover), len(data))
+        out = bytearray(a ^ b for a, b in zip(data[:n], self.leftover[:n]))
+        self.leftover = self.leftover[n:]
+        whole = n + (len(data) - n) // 64 * 64
+        out += chacha20_xor_keystream(self.cipher, data[n:whole])
+        if whole < len(data):
+            # Partial last block: its unused keystream is kept for the next call
+            block = chacha20_block(self.cipher)
+            tail = len(data) - whole
+            out += bytes(a ^ b for a, b in zip(data[whole:], block[:tail]))
+            self.leftover = block[tail:]
+        return bytes(out)
+
+
+class BackendDispatcher:
+    """Choix du backend ChaCha20 le plus rapide pour chaque taille de message"""
+    def __init__(self) -> None:
+        self.ranking = None   # [(max size, [backends, fastest first])] by increasing size, from a report
+
+    def load(self, path="rapport_chiffrement.json"):
+        """
+        Charge un rapport écrit par ce script : pour chaque taille de paquet mesurée,
+        les backends classés par latence médiane croissante ; au-delà, par débit décroissant.
+
+        Paramètres:
+            - path (str): Fichier JSON du rapport.
+        """
+        with open(path) as f:
+            results = json.load(f)["backends"]
+        sizes = sorted({int(size) for r in results.values() for size in r["packets"]})
+        self.ranking = [(size, sorted((name for name, r in results.items() if str(size) in r["packets"]),
+                                      key=lambda name: results[name]["packets"][str(size)]["median_us"]))
+                        for size in sizes]
+        self.ranking.append((None, sorted(results, key=lambda name: -results[name]["bulk_mb_s"])))
+
+    def select(self, length, rounds=CHACHA20_ROUNDS):
+        """
+        Backend à utiliser pour un message.
+
+        Paramètres:
+            - length (int): Taille du message (octets).
+            - rounds (int): Nombre de rounds.
+
+        Retourne:
+            - str: Nom d'un backend disponible ('pure' en dernier recours).
+
+        Remarque:
+            - Avec un rapport chargé, le plus rapide des backends disponibles pour ce
+              nombre de rounds dans la plus petite taille mesurée >= `length` ; l'ordre par
+              défaut s'applique si aucun backend classé n'est disponible.
+        """
+        available = available_backends(rounds)
+        if self.ranking is not None:
+            names = next(names for size, names in self.ranking if size is None or length <= size)
+            for name in names:
+                if name in available:
+                    return name
+        if "cryptography" in available:
+            return "cryptography"
+        if "numpy" in available and length >= NUMPY_MIN_BYTES:
+            return "numpy"
+        return "pure"
+
+    def encrypt(self, key, nonce, data, counter=1, rounds=CHACHA20_ROUNDS):
+        """
+        Chiffre (ou déchiffre) un message avec le backend choisi par `select`.
+
+        Paramètres:
+            - key (bytes): Clé de 32 octets.
+            - nonce (bytes): Nonce de 12 octets.
+            - data (bytes-like): Message.
+            - counter (int): Compteur du premier bloc.
+            - rounds (int): Nombre de rounds.
+
+        Retourne:
+            - bytes: Message chiffré (ou déchiffré).
+        """
+        name = self.select(memoryview(data).nbytes, rounds)
+        return new_context(name, key, nonce, counter, rounds)(data)
+
+    decrypt = encrypt
+
+#%% INSTANCE PARTAGEE
+dispatcher = BackendDispatcher()
+
+
+def test_backends():
+    """
+    Teste que tous les backends disponibles s'accordent, pour chaque variante qu'ils
+    acceptent, et que le choix automatique chiffre correctement.
+
+    Exceptions:
+        - AssertionError: Si deux backends diffèrent.
+    """
+    print("test_backends function")
+    for rounds in CHACHA_VARIANTS:
+        check_backends(rounds, size=200)
+    key, nonce = bytes(range(32)), bytes(range(12))
+    for size in (16, 5000):
+        message = bytes(size)
+        assert dispatcher.decrypt(key, nonce, dispatcher.encrypt(key, nonce, message)) == message
+        assert dispatcher.encrypt(key, nonce, message) == new_context("pure", key, nonce)(message)
+    print("test_backends : Success")
+
+
+if __name__ == "__main__":
+    bulk_bytes = 1 << 23        # bulk throughput message (8 Mio)
+    pure_bulk_bytes = 1 << 18   # smaller for the pure Python backend (256 Kio)
+    repeats = 200
+    report_file = "rapport_chiffrement.json"
+
+    check_backends()
+    results = {}
+    for name in available_backends():
+        print(f"Mesure du backend '{name}'...")
+        results[name] = benchmark_backend(name, pure_bulk_bytes if name == "pure" else bulk_bytes, PACKET_SIZES, repeats)
+
+    print(f"{'backend':<14} {'débit (Mo/s)':>13} {'contexte (µs)':>14}" + "".join(f" {f'{size} o (µs)':>12}" for size in PACKET_SIZES))
+    for name, r in results.items():
+        print(f"{name:<14} {r['bulk_mb_s']:>13.2f} {r['setup']['median_us']:>14.1f}"
+              + "".join(f" {r['packets'][size]['median_us']:>12.1f}" for size in PACKET_SIZES))
+
+    with open(report_file, "w") as f:
+        json.dump({"environment": environment(), "repeats": repeats, "backends": results}, f, indent=2)
+    dispatcher.load(report_file)
+    print("Backend choisi : " + ", ".join(f"{'> ' + str(PACKET_SIZES[-1]) if size is None else '<= ' + str(size)} o -> {name}"
+                                          for size, (name, *_) in dispatcher.ranking))
+    print(f"Rapport enregistré dans '{report_file}'.")
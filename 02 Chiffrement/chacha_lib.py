@@ -16,6 +16,13 @@ Date de création:
 Description des fonctionnalités :
     - ChaCha20 context :
       Gestion de l'état interne, du compteur, et du nonce pour le chiffrement.
+    - ChaCha20 cipher :
+      Contexte construit une fois à partir d'une clé binaire de 32 octets (mots de clé
+      précalculés) ; préparer un message ne met à jour que le compteur et le nonce.
+    - Variantes à rounds réduits :
+      Le nombre de rounds (8, 12 ou 20) est un paramètre du contexte. Les trames
+      (`encrypt_frame`) portent la variante dans leur en-tête, et une trame d'une autre
+      variante que celle du contexte est refusée.
     - Configuration initiale :
       Génération et configuration des clés et des nonces pour ChaCha20.
     - Fonctions principales :
@@ -32,16 +39,26 @@ Constantes définies :
     - `CHACHA20_KEY_SIZE` : Taille de la clé (256 bits ou 32 octets).
     - `CHACHA20_IV_SIZE` : Taille du nonce (96 bits ou 12 octets).
     - `CHACHA20_BLOCK_SIZE` : Taille d'un bloc de sortie (512 bits ou 64 octets).
+    - `CHACHA20_ROUNDS` : Nombre de rounds par défaut (20).
+    - `CHACHA_VARIANTS` : Nombres de rounds acceptés : ChaCha8, ChaCha12 et ChaCha20.
+    - `FRAME_MAGIC`, `FRAME_HEADER_SIZE` : En-tête des trames (magique, variante, nonce).
 
 Utilisation prévue :
-    1. Configurez une clé et un nonce en utilisant des fonctions hexadécimales.
-    2. Utilisez `chacha20_encrypt` pour chiffrer un message.
-    3. Utilisez `chacha20_decrypt` pour déchiffrer le message chiffré.
+    1. Créez un contexte `cipher = ChaCha20_cipher(key)` à partir d'une clé de 32 octets.
+    2. Utilisez `cipher.encrypt(plaintext, nonce)` pour chiffrer un message, avec un nonce
+       de 12 octets jamais réutilisé avec la même clé.
+    3. Utilisez `cipher.decrypt(ciphertext, nonce)` pour déchiffrer le message chiffré.
+    (`chacha20_encrypt` et `chacha20_decrypt` acceptent toujours des clés et nonces
+    hexadécimaux.)
 
 Tests inclus :
     - `test_quarter_round` : Vérifie le comportement de la fonction `quarter_round`.
     - `test_state_quarter_round` : Valide les modifications dans l'état interne après 
       l'application de transformations.
+    - `test_chacha20_ops` : Vérifie `chacha20_block` et `chacha20_encrypt` avec les
+      vecteurs de test de la RFC 8439 (sections 2.3.2 et 2.4.2).
+    - `test_chacha_variants` : Vérifie ChaCha8, ChaCha12 et ChaCha20 (clé et nonce nuls)
+      et le refus d'une trame d'une autre variante.
 
 Attention :
     - Ce script est une implémentation éducative de ChaCha20. Pour un usage en 
@@ -49,23 +66,184 @@ Attention :
       telle que `cryptography` en Python.
 
 """
+#%% BIBLIOTHEQUES
+import struct
+
 #%% CONSTANTES
 CHACHA20_STATE_SIZE = 16
 CHACHA20_KEY_SIZE = 32
 CHACHA20_IV_SIZE = 12
 CHACHA20_BLOCK_SIZE = 64
+CHACHA20_ROUNDS = 20
+CHACHA_VARIANTS = (8, 12, 20)
+FRAME_MAGIC = b"CH"
+FRAME_HEADER_SIZE = len(FRAME_MAGIC) + 1 + CHACHA20_IV_SIZE
 
 TEST = False
 
 #%% FONCTIONS
 class ChaCha20_ctx :
     """ChaCha20 state context"""
-    def __init__(self,state,nonce) -> None:
+    def __init__(self,state,nonce,rounds=CHACHA20_ROUNDS) -> None:
         self.state = state
+        self.rounds = check_rounds(rounds)
         self.counter = 0
         self.nonce = nonce
 
+class ChaCha20_cipher :
+    """ChaCha20 context built once from a binary key, with the key words precomputed"""
+    def __init__(self,key,nonce=bytes(CHACHA20_IV_SIZE),counter=1,rounds=CHACHA20_ROUNDS) -> None:
+        """
+        Paramètres:
+            - key (bytes): Clé de 32 octets.
+            - nonce (bytes): Nonce de 12 octets.
+            - counter (int): Compteur du premier bloc (1 dans la RFC 8439).
+            - rounds (int): Nombre de rounds : 20 (ChaCha20), 12 (ChaCha12) ou 8 (ChaCha8),
+              identique aux deux extrémités d'une liaison.
+
+        Exceptions:
+            - ValueError: Si la clé ou le nonce ne respectent pas les tailles attendues, ou
+              si le nombre de rounds n'est pas une variante connue.
+        """
+        if len(key) != CHACHA20_KEY_SIZE :
+            raise ValueError(f"La clé doit faire {CHACHA20_KEY_SIZE} octets ({len(key)} reçus).")
+        self.rounds = check_rounds(rounds)
+        self.key_words = struct.unpack("<8I",key)
+        self.state = [0x61707865,0x3320646e,0x79622d32,0x6b206574,*self.key_words,0,0,0,0]
+        self.set_nonce(nonce,counter)
+
+    def set_nonce(self,nonce,counter=1) :
+        """
+        Prépare un nouveau message : seuls les mots du compteur et du nonce changent.
+
+        Paramètres:
+            - nonce (bytes): Nonce de 12 octets.
+            - counter (int): Compteur du premier bloc.
+
+        Exceptions:
+            - ValueError: Si le nonce ne fait pas 12 octets.
+        """
+        if len(nonce) != CHACHA20_IV_SIZE :
+            raise ValueError(f"Le nonce doit faire {CHACHA20_IV_SIZE} octets ({len(nonce)} reçus).")
+        self.state[12] = counter
+        self.state[13:16] = struct.unpack("<3I",nonce)
+
+    def encrypt(self,plaintext,nonce,counter=1) :
+        """
+        Chiffre un message.
+
+        Paramètres:
+            - plaintext (str, bytes, bytearray ou memoryview): Texte clair.
+            - nonce (bytes): Nonce de 12 octets du message, jamais réutilisé avec la même clé.
+            - counter (int): Compteur du premier bloc.
+
+        Retourne:
+            - bytearray: Texte chiffré.
+
+        Remarque:
+            - Le nonce est obligatoire : chiffrer deux messages avec le nonce du contexte
+              réutiliserait le même flux de clé.
+        """
+        self.set_nonce(nonce,counter)
+        return chacha20_xor_keystream(self,plaintext)
+
+    def decrypt(self,ciphertext,nonce,counter=1) :
+        """
+        Déchiffre un message (même opération que `encrypt`).
+
+        Paramètres:
+            - ciphertext (bytes, bytearray ou memoryview): Texte chiffré.
+            - nonce (bytes): Nonce de 12 octets utilisé pour chiffrer le message.
+            - counter (int): Compteur du premier bloc.
+
+        Retourne:
+            - bytearray: Texte clair.
+        """
+        return self.encrypt(ciphertext,nonce,counter)
+
+    def encrypt_frame(self,plaintext,nonce) :
+        """
+        Chiffre un message dans une trame dont l'en-tête indique la variante et le nonce.
+
+        Paramètres:
+            - plaintext (str, bytes, bytearray ou memoryview): Texte clair.
+            - nonce (bytes): Nonce de 12 octets.
+
+        Retourne:
+            - bytearray: En-tête (`FRAME_MAGIC`, nombre de rounds, nonce) suivi du texte chiffré.
+        """
+        return bytearray(chacha_frame_header(self.rounds,nonce)) + self.encrypt(plaintext,nonce)
+
+    def decrypt_frame(self,frame) :
+        """
+        Déchiffre une trame produite par `encrypt_frame`.
+
+        Paramètres:
+            - frame (bytes, bytearray ou memoryview): Trame reçue.
+
+        Retourne:
+            - bytearray: Texte clair.
+
+        Exceptions:
+            - ValueError: Si l'en-tête est invalide ou si la trame a été chiffrée avec une
+              autre variante que celle du contexte.
+        """
+        rounds, nonce = chacha_parse_frame_header(frame)
+        if rounds != self.rounds :
+            raise ValueError(f"Trame ChaCha{rounds} reçue par un contexte ChaCha{self.rounds}.")
+        return self.decrypt(memoryview(frame)[FRAME_HEADER_SIZE:],nonce)
+
 # ChaCha20 functions
+def check_rounds(rounds) :
+    """
+    Vérifie un nombre de rounds.
+
+    Paramètres:
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - int: Le nombre de rounds.
+
+    Exceptions:
+        - ValueError: Si ce n'est pas une variante de `CHACHA_VARIANTS`.
+    """
+    if rounds not in CHACHA_VARIANTS :
+        raise ValueError(f"Variante ChaCha{rounds} inconnue (variantes : {CHACHA_VARIANTS}).")
+    return rounds
+
+def chacha_frame_header(rounds,nonce) :
+    """
+    Construit l'en-tête d'une trame chiffrée.
+
+    Paramètres:
+        - rounds (int): Nombre de rounds de la variante.
+        - nonce (bytes): Nonce de 12 octets du message.
+
+    Retourne:
+        - bytes: `FRAME_MAGIC`, un octet pour le nombre de rounds, puis le nonce.
+    """
+    if len(nonce) != CHACHA20_IV_SIZE :
+        raise ValueError(f"Le nonce doit faire {CHACHA20_IV_SIZE} octets ({len(nonce)} reçus).")
+    return FRAME_MAGIC + bytes([check_rounds(rounds)]) + bytes(nonce)
+
+def chacha_parse_frame_header(frame) :
+    """
+    Lit l'en-tête d'une trame chiffrée.
+
+    Paramètres:
+        - frame (bytes, bytearray ou memoryview): Trame reçue.
+
+    Retourne:
+        - tuple: (nombre de rounds, nonce).
+
+    Exceptions:
+        - ValueError: Si la trame est trop courte, sans `FRAME_MAGIC`, ou d'une variante inconnue.
+    """
+    header = bytes(memoryview(frame)[:FRAME_HEADER_SIZE])
+    if len(header) < FRAME_HEADER_SIZE or header[:len(FRAME_MAGIC)] != FRAME_MAGIC :
+        raise ValueError("En-tête de trame ChaCha invalide.")
+    return check_rounds(header[len(FRAME_MAGIC)]),header[len(FRAME_MAGIC) + 1:]
+
 def generate_hex_key(key) :
     """
     Génère une clé hexadécimale à partir d'une chaîne de caractères.
@@ -98,8 +276,8 @@ def chacha20_setup(ctx,key,nonce) :
 
     Paramètres:
         - ctx (ChaCha20_ctx): Objet contenant l'état interne, le compteur, et le nonce.
-        - key (str): Clé hexadécimale de 256 bits (64 caractères).
-        - nonce (str): Nonce hexadécimal de 96 bits (24 caractères).
+        - key (str ou bytes): Clé hexadécimale de 256 bits (64 caractères), ou ses 32 octets.
+        - nonce (str ou bytes): Nonce hexadécimal de 96 bits (24 caractères), ou ses 12 octets.
 
     Retourne:
         - ChaCha20_ctx: Contexte mis à jour avec l'état initialisé.
@@ -112,23 +290,23 @@ def chacha20_setup(ctx,key,nonce) :
           définies par ChaCha20 ("expand 32-byte k").
         - Les 32 octets de la clé sont utilisés pour remplir les positions state[4] à state[11].
         - Le nonce (12 octets) est utilisé pour remplir les positions state[13] à state[15].
+        - Pour chiffrer plusieurs messages avec la même clé, `ChaCha20_cipher` évite de
+          relire la clé à chaque message.
     """
     ctx.state[0] = 0x61707865
     ctx.state[1] = 0x3320646e
     ctx.state[2] = 0x79622d32
     ctx.state[3] = 0x6b206574
-    ctx.state[4] = int(key[0:8],16)
-    ctx.state[5] = int(key[8:16],16)
-    ctx.state[6] = int(key[16:24],16)
-    ctx.state[7] = int(key[24:32],16)
-    ctx.state[8] = int(key[32:40],16)
-    ctx.state[9] = int(key[40:48],16)
-    ctx.state[10] = int(key[48:56],16)
-    ctx.state[11] = int(key[56:64],16)
+    # Key and nonce words are little-endian (RFC 8439, section 2.3)
+    if isinstance(key,str) :
+        key = bytes.fromhex(key)
+    if isinstance(nonce,str) :
+        nonce = bytes.fromhex(nonce)
+    if len(key) != CHACHA20_KEY_SIZE or len(nonce) != CHACHA20_IV_SIZE :
+        raise ValueError("La clé doit faire 32 octets et le nonce 12 octets.")
+    ctx.state[4:12] = struct.unpack("<8I",key)
     ctx.state[12] = ctx.counter
-    ctx.state[13] = int(nonce[0:8],16)
-    ctx.state[14] = int(nonce[8:16],16)
-    ctx.state[15] = int(nonce[16:24],16)
+    ctx.state[13:16] = struct.unpack("<3I",nonce)
     return ctx
 
 def quarter_round(a,b,c,d) :
@@ -142,32 +320,40 @@ def quarter_round(a,b,c,d) :
         - tuple: (a, b, c, d) après transformation, sous forme d'entiers 32 bits.
 
     Remarque:
-        - Cette transformation utilise des opérations d'addition, de XOR, et de rotation gauche.
+        - Cette transformation utilise des opérations d'addition modulo 2**32, de XOR, et de rotation gauche.
         - Elle est une étape fondamentale dans le calcul des blocs ChaCha20.
     """
-    a += b; d ^= a; d = ROTL(d,16)
-    c += d; b ^= c; b = ROTL(b,12)
-    a += b; d ^= a; d = ROTL(d,8)
-    c += d; b ^= c; b = ROTL(b,7)
-    return a & 0xffffffff,b & 0xffffffff,c & 0xffffffff,d & 0xffffffff
+    a = (a + b) & 0xffffffff; d ^= a; d = ROTL(d,16)
+    c = (c + d) & 0xffffffff; b ^= c; b = ROTL(b,12)
+    a = (a + b) & 0xffffffff; d ^= a; d = ROTL(d,8)
+    c = (c + d) & 0xffffffff; b ^= c; b = ROTL(b,7)
+    return a,b,c,d
 
 
 def chacha20_block(ctx) :
     """
-    Calcule un bloc de chiffrement ChaCha20 à partir de l'état interne.
+    Calcule un bloc de flux de clé ChaCha20 à partir de l'état interne.
 
     Paramètres:
         - ctx (ChaCha20_ctx): Contexte ChaCha20 contenant l'état interne.
 
     Retourne:
-        - ChaCha20_ctx: Contexte avec l'état mis à jour après calcul du bloc.
+        - bytes: Bloc de 64 octets de flux de clé (16 mots sérialisés en little-endian).
+
+    Exceptions:
+        - ValueError: Si le compteur de blocs (state[12]) dépasse 32 bits.
 
     Remarque:
-        - Le bloc est calculé en appliquant 20 itérations de quarter rounds sur l'état interne.
-        - La sortie est utilisée pour chiffrer ou déchiffrer les données.
+        - Le bloc est calculé en appliquant `ctx.rounds` rounds (20 pour ChaCha20), soit
+          `ctx.rounds // 2` doubles rounds de quarter rounds, sur une copie de l'état, puis
+          en ajoutant l'état d'entrée (RFC 8439, section 2.3).
+        - L'état d'entrée n'est pas modifié, à l'exception du compteur de blocs (state[12])
+          qui est incrémenté pour le bloc suivant.
     """
-    x = ctx.state
-    for i in range(10) :
+    if ctx.state[12] > 0xffffffff :
+        raise ValueError("Le compteur de blocs dépasse 32 bits : changez de nonce.")
+    x = list(ctx.state[:CHACHA20_STATE_SIZE])
+    for i in range(ctx.rounds // 2) :
         x[0],x[4],x[8],x[12] = quarter_round(x[0],x[4],x[8],x[12])
         x[1],x[5],x[9],x[13] = quarter_round(x[1],x[5],x[9],x[13])
         x[2],x[6],x[10],x[14] = quarter_round(x[2],x[6],x[10],x[14])
@@ -176,9 +362,32 @@ def chacha20_block(ctx) :
         x[1],x[6],x[11],x[12] = quarter_round(x[1],x[6],x[11],x[12])
         x[2],x[7],x[8],x[13] = quarter_round(x[2],x[7],x[8],x[13])
         x[3],x[4],x[9],x[14] = quarter_round(x[3],x[4],x[9],x[14])
-    for i in range(16) :
-        x[i] += ctx.state[i]
-    return ctx
+    block = b"".join(((x[i] + ctx.state[i]) & 0xffffffff).to_bytes(4,"little") for i in range(CHACHA20_STATE_SIZE))
+    ctx.state[12] += 1
+    return block
+
+def chacha20_xor_keystream(ctx,data) :
+    """
+    Combine des données par XOR avec le flux de clé, à partir de l'état courant du contexte.
+
+    Paramètres:
+        - ctx (ChaCha20_ctx ou ChaCha20_cipher): Contexte initialisé ; son compteur de
+          blocs (state[12]) avance d'un bloc par tranche de 64 octets.
+        - data (str, bytes, bytearray ou memoryview): Données ; une chaîne est encodée en UTF-8.
+
+    Retourne:
+        - bytearray: Données chiffrées ou déchiffrées.
+    """
+    if isinstance(data,str) :
+        data = data.encode("utf-8")
+    out = bytearray(len(data))
+    for start in range(0,len(data),CHACHA20_BLOCK_SIZE) :
+        chunk = data[start:start + CHACHA20_BLOCK_SIZE]
+        keystream = chacha20_block(ctx)[:len(chunk)]
+        # XOR of the whole chunk as one integer
+        xored = int.from_bytes(chunk,"little") ^ int.from_bytes(keystream,"little")
+        out[start:start + len(chunk)] = xored.to_bytes(len(chunk),"little")
+    return out
 
 def chacha20_encrypt(ctx,plaintext,key,nonce) :
     """
@@ -194,23 +403,15 @@ def chacha20_encrypt(ctx,plaintext,key,nonce) :
         - bytearray: Texte chiffré sous forme d'octets.
 
     Remarque:
-        - Si `plaintext` est une chaîne de caractères, chaque caractère est converti en octet avant chiffrement.
-        - La fonction réutilise `chacha20_setup` pour initialiser l'état et `chacha20_block` pour calculer les blocs.
+        - Si `plaintext` est une chaîne de caractères, elle est encodée en UTF-8 avant chiffrement.
+        - La fonction réutilise `chacha20_setup` pour initialiser l'état (le premier bloc
+          utilise `ctx.counter`) et `chacha20_xor_keystream` pour chiffrer, un bloc
+          `chacha20_block` par tranche de 64 octets.
+        - `ctx.counter` n'est pas modifié : chiffrer puis déchiffrer avec le même contexte
+          utilise le même flux de clé.
     """
-    ciphertext = bytearray()
-    # print("key : ",key, "nonce : ",nonce)
     ctx = chacha20_setup(ctx, key, nonce)
-    for block in plaintext:
-
-        if ctx.counter % len(ctx.state) == 0 :
-            ctx = chacha20_block(ctx)
-
-        if(type(block) is int) :
-            ciphertext += bytes([(block) ^ ctx.state[ctx.counter % len(ctx.state)]%256])
-        else :
-            ciphertext += bytes([ord(block) ^ ctx.state[ctx.counter % len(ctx.state)]%256])
-
-    return ciphertext
+    return chacha20_xor_keystream(ctx,plaintext)
 
 
 def chacha20_decrypt(ctx,ciphertext,key,nonce) :
@@ -303,4 +504,89 @@ def test_state_quarter_round () :
     assert c[14] == 0x2098d9d6
     assert c[15] == 0x91dbd320
 
-    print("test_state_quarter_round : Success")
\ No newline at end of file
+    print("test_state_quarter_round : Success")
+
+def test_chacha20_ops () :
+    """
+    Teste `chacha20_block` et `chacha20_encrypt` avec les vecteurs de la RFC 8439.
+
+    Exceptions:
+        - AssertionError: Si le bloc ou le texte chiffré ne correspondent pas aux vecteurs.
+
+    Remarque:
+        - Vérifie aussi que l'état d'entrée n'est modifié que par l'incrément du compteur,
+          et que chiffrer puis déchiffrer avec le même contexte redonne le texte clair.
+    """
+    print("test_chacha20_ops function")
+    key = bytes(range(32)).hex()
+
+    # Section 2.3.2 : one block
+    ctx = ChaCha20_ctx([0]*CHACHA20_STATE_SIZE,0)
+    ctx.counter = 1
+    ctx = chacha20_setup(ctx,key,"000000090000004a00000000")
+    state = list(ctx.state)
+    block = chacha20_block(ctx)
+    assert block == bytes.fromhex(
+        "10f1e7e4d13b5915500fdd1fa32071c4c7d1f4c733c068030422aa9ac3d46c4e"
+        "d2826446079faa0914c2d705d98b02a2b5129cd1de164eb9cbd083e8a2503c4e")
+    assert ctx.state[12] == 2
+    assert ctx.state[:12] == state[:12] and ctx.state[13:] == state[13:]
+
+    # Section 2.4.2 : encryption of a 114-byte message
+    ctx = ChaCha20_ctx([0]*CHACHA20_STATE_SIZE,0)
+    ctx.counter = 1
+    plaintext = ("Ladies and Gentlemen of the class of '99: If I could offer you only one tip "
+                 "for the future, sunscreen would be it.")
+    ciphertext = chacha20_encrypt(ctx,plaintext,key,"000000000000004a00000000")
+    assert ciphertext == bytes.fromhex(
+        "6e2e359a2568f98041ba0728dd0d6981e97e7aec1d4360c20a27afccfd9fae0b"
+        "f91b65c5524733ab8f593dabcd62b3571639d624e65152ab8f530c359f0861d8"
+        "07ca0dbf500d6a6156a38e088a22b65e52bc514d16ccf806818ce91ab7793736"
+        "5af90bbf74a35be6b40b8eedf2785e42874d")
+    assert chacha20_decrypt(ctx,ciphertext,key,"000000000000004a00000000").decode("utf-8") == plaintext
+
+    # Binary context, reused for a second message
+    cipher = ChaCha20_cipher(bytes(range(32)))
+    assert cipher.encrypt(plaintext,bytes.fromhex("000000000000004a00000000")) == ciphertext
+    cipher.encrypt(b"other message",bytes(CHACHA20_IV_SIZE))
+    assert cipher.decrypt(ciphertext,bytes.fromhex("000000000000004a00000000")).decode("utf-8") == plaintext
+
+    print("test_chacha20_ops : Success")
+
+def test_chacha_variants () :
+    """
+    Teste ChaCha8, ChaCha12 et ChaCha20 avec une clé, un nonce et un compteur nuls, et les
+    trames : une trame d'une autre variante que celle du contexte doit être refusée.
+
+    Exceptions:
+        - AssertionError: Si un bloc ne correspond pas aux vecteurs, ou si une trame d'une
+          autre variante est acceptée.
+
+    Remarque:
+        - Avec une clé et un nonce nuls, l'état est le même que dans la version d'origine
+          de ChaCha (compteur et nonce de 64 bits) : ce sont ses vecteurs de test publiés.
+    """
+    print("test_chacha_variants function")
+    expected = {
+        8 : "3e00ef2f895f40d67f5bb8e81f09a5a12c840ec3ce9a7f3b181be188ef711a1e"
+            "984ce172b9216f419f445367456d5619314a42a3da86b001387bfdb80e0cfe42",
+        12 : "9bf49a6a0755f953811fce125f2683d50429c3bb49e074147e0089a52eae155f"
+             "0564f879d27ae3c02ce82834acfa8c793a629f2ca0de6919610be82f411326be",
+        20 : "76b8e0ada0f13d90405d6ae55386bd28bdd219b8a08ded1aa836efcc8b770dc7"
+             "da41597c5157488d7724e03fb8d84a376a43b8f41518a11cc387b669b2ee6586",
+    }
+    for rounds,block in expected.items() :
+        cipher = ChaCha20_cipher(bytes(CHACHA20_KEY_SIZE),counter=0,rounds=rounds)
+        assert chacha20_block(cipher) == bytes.fromhex(block)
+
+    key, nonce = bytes(range(32)), bytes(range(12))
+    frame = ChaCha20_cipher(key,rounds=12).encrypt_frame(b"telemetry",nonce)
+    assert chacha_parse_frame_header(frame) == (12,nonce)
+    assert ChaCha20_cipher(key,rounds=12).decrypt_frame(frame) == b"telemetry"
+    try :
+        ChaCha20_cipher(key,rounds=20).decrypt_frame(frame)
+    except ValueError :
+        pass
+    else :
+        raise AssertionError("Trame ChaCha12 acceptée par un contexte ChaCha20.")
+    print("test_chacha_variants : Success")
@@ -0,0 +1,723 @@
+# -*- coding: utf-8 -*-
+"""
+Implémentation vectorisée de ChaCha20 avec NumPy
+------------------------------------------------
+Ce script implémente le générateur de flux de clé ChaCha20 (RFC 8439) en calculant
+de nombreux blocs à la fois : l'état est un tableau NumPy de mots de 32 bits non
+signés avec une colonne (« voie ») par valeur du compteur de blocs, et chaque
+opération des quarter rounds s'applique à toutes les voies en une seule instruction.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Conversion de la clé (32 octets) et du nonce (12 octets) en mots de 32 bits
+      little-endian, comme le prévoit la RFC 8439.
+    - `chacha20_blocks` : calcul de `n_blocks` blocs consécutifs, sous forme d'un
+      tableau (4, 4, n_blocks) de lignes de l'état : les quarter rounds de colonne
+      portent sur les 4 colonnes à la fois, les quarter rounds de diagonale après
+      rotation des lignes ; les rotations de bits sont des décalages vectorisés
+      (`chacha20_rounds`, sur des états initiaux quelconques). Toutes les fonctions
+      acceptent `rounds` (20, 12 ou 8) pour les variantes ChaCha12 et ChaCha8.
+    - `chacha20_keystream` : flux de clé sérialisé (octets little-endian).
+    - `chacha20_xor` : chiffrement / déchiffrement de données de toute taille, par
+      tranches de `CHUNK_BLOCKS` blocs pour borner la mémoire.
+    - `ChaCha20Stream` : chiffrement en flux par appels successifs (`update`,
+      `encrypt_into`) sur des bytes, bytearray, memoryview ou tableaux NumPy ; les
+      octets de flux de clé non utilisés sont conservés d'un appel à l'autre et
+      `encrypt_into` écrit directement dans le tampon fourni, sans copie intermédiaire.
+    - `encrypt_file` : chiffrement d'un fichier en mémoire constante.
+    - `parallel_encrypt_into` : chiffrement d'un grand tampon sur plusieurs cœurs, par
+      segments alignés sur les compteurs de blocs (résultat identique au chiffrement
+      séquentiel) ; les calculs NumPy libèrent le GIL et se font dans des threads.
+    - `chacha20_xor_batch` : chiffrement de nombreux messages courts, chacun avec son
+      nonce, dans une seule matrice d'états (16, blocs) ; les longueurs différentes sont
+      gérées par des indices de positions dans le flux de clé.
+    - Accès direct : `ChaCha20Stream.seek` déduit le compteur de blocs et la position
+      dans le bloc d'une position en octets ; `decrypt_range` ne lit et ne déchiffre
+      que la plage demandée d'un message (fichier ou tampon).
+
+Constantes définies :
+    - `CHACHA20_CONSTANTS` : Constantes "expand 32-byte k" (state[0] à state[3]).
+    - `CHUNK_BLOCKS` : Nombre de blocs calculés à la fois par `chacha20_xor`, et taille
+      par défaut des segments de `parallel_encrypt_into`.
+
+Utilisation prévue :
+    1. Choisissez une clé de 32 octets et un nonce de 12 octets (jamais réutilisé avec la même clé).
+    2. `ciphertext = chacha20_xor(key, nonce, plaintext)`.
+    3. `plaintext = chacha20_xor(key, nonce, ciphertext)`.
+    4. Pour de gros volumes : `stream = ChaCha20Stream(key, nonce)` puis
+       `stream.encrypt_into(src, dst)` bloc après bloc, ou `encrypt_file`.
+    5. Pour extraire un passage d'un enregistrement chiffré :
+       `decrypt_range(key, nonce, "vol.bin", offset, length)`.
+
+Tests inclus :
+    - `test_numpy_block` : Bloc de la RFC 8439, section 2.3.2.
+    - `test_numpy_encrypt` : Chiffrement de la RFC 8439, section 2.4.2.
+    - `test_numpy_keystream` : Vecteurs de l'annexe A.1 (clé et nonce nuls).
+    - `test_numpy_stream` : Chiffrement en flux découpé en appels irréguliers.
+    - `test_numpy_seek` : Déchiffrement de plages à des positions quelconques.
+    - `test_numpy_parallel` : Chiffrement parallèle identique au chiffrement séquentiel.
+    - `test_numpy_batch` : Chiffrement par lots identique au chiffrement message par message.
+    - `test_numpy_variants` : ChaCha8 et ChaCha12 identiques à `chacha_lib`.
+
+Attention :
+    - Comme `chacha_lib`, cette implémentation est éducative ; elle n'est pas protégée
+      contre les attaques par canaux auxiliaires.
+"""
+#%% BIBLIOTHEQUES
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from chacha_lib import CHACHA20_ROUNDS, check_rounds
+
+#%% CONSTANTES
+CHACHA20_CONSTANTS = np.array([0x61707865, 0x3320646e, 0x79622d32, 0x6b206574], dtype=np.uint32)
+CHUNK_BLOCKS = 16384  # 1 MiB of keystream per chunk
+
+#%% FONCTIONS
+def key_words(key):
+    """
+    Convertit une clé ChaCha20 en mots de 32 bits.
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+
+    Retourne:
+        - numpy.ndarray: 8 mots uint32 (little-endian).
+
+    Exceptions:
+        - ValueError: Si la clé ne fait pas 32 octets.
+    """
+    if len(key) != 32:
+        raise ValueError(f"La clé doit faire 32 octets ({len(key)} reçus).")
+    return np.frombuffer(bytes(key), dtype="<u4").astype(np.uint32)
+
+
+def nonce_words(nonce):
+    """
+    Convertit un nonce ChaCha20 en mots de 32 bits.
+
+    Paramètres:
+        - nonce (bytes): Nonce de 12 octets.
+
+    Retourne:
+        - numpy.ndarray: 3 mots uint32 (little-endian).
+
+    Exceptions:
+        - ValueError: Si le nonce ne fait pas 12 octets.
+    """
+    if len(nonce) != 12:
+        raise ValueError(f"Le nonce doit faire 12 octets ({len(nonce)} reçus).")
+    return np.frombuffer(bytes(nonce), dtype="<u4").astype(np.uint32)
+
+
+def _rotl(x, n, tmp):
+    """Rotation à gauche en place de chaque mot de `x` de `n` bits (`tmp` : tableau de travail)."""
+    np.right_shift(x, 32 - n, out=tmp)
+    np.left_shift(x, n, out=x)
+    np.bitwise_or(x, tmp, out=x)
+
+
+def _quarter_rounds(a, b, c, d, tmp):
+    """Quarter rounds en place sur des lignes (4, voies) : une colonne de l'état par ligne."""
+    np.add(a, b, out=a); np.bitwise_xor(d, a, out=d); _rotl(d, 16, tmp)
+    np.add(c, d, out=c); np.bitwise_xor(b, c, out=b); _rotl(b, 12, tmp)
+    np.add(a, b, out=a); np.bitwise_xor(d, a, out=d); _rotl(d, 8, tmp)
+    np.add(c, d, out=c); np.bitwise_xor(b, c, out=b); _rotl(b, 7, tmp)
+
+
+def byte_view(buffer):
+    """Vue uint8, sans copie, d'un objet supportant le protocole tampon (contigu)."""
+    return np.frombuffer(memoryview(buffer).cast("B"), dtype=np.uint8)
+
+
+def initial_states(key, nonce, counter, n_blocks):
+    """
+    Construit les états initiaux de `n_blocks` blocs consécutifs.
+
+    Paramètres:
+        - key (bytes ou numpy.ndarray): Clé de 32 octets, ou ses 8 mots.
+        - nonce (bytes ou numpy.ndarray): Nonce de 12 octets, ou ses 3 mots.
+        - counter (int): Compteur du premier bloc.
+        - n_blocks (int): Nombre de blocs.
+
+    Retourne:
+        - numpy.ndarray: États initiaux, (16, n_blocks) en uint32.
+
+    Exceptions:
+        - ValueError: Si le compteur dépasse 32 bits.
+    """
+    if counter < 0 or counter + n_blocks > 2**32:
+        raise ValueError("Le compteur de blocs dépasse 32 bits : changez de nonce.")
+    key = key if isinstance(key, np.ndarray) else key_words(key)
+    nonce = nonce if isinstance(nonce, np.ndarray) else nonce_words(nonce)
+    state = np.empty((16, n_blocks), dtype=np.uint32)
+    state[0:4] = CHACHA20_CONSTANTS[:, None]
+    state[4:12] = key[:, None]
+    state[12] = np.arange(counter, counter + n_blocks, dtype=np.uint64).astype(np.uint32)
+    state[13:16] = nonce[:, None]
+    return state
+
+
+def chacha20_rounds(initial, rounds=CHACHA20_ROUNDS):
+    """
+    Applique la fonction de bloc ChaCha20 à des états initiaux quelconques, une voie par
+    état (compteurs et nonces peuvent différer d'une voie à l'autre).
+
+    Paramètres:
+        - initial (numpy.ndarray): États initiaux, (16, voies) en uint32.
+        - rounds (int): Nombre de rounds (20, 12 ou 8 : ChaCha20, ChaCha12, ChaCha8).
+
+    Retourne:
+        - numpy.ndarray: Blocs de sortie, (voies, 16) mots uint32.
+    """
+    n_lanes = initial.shape[1]
+    x = initial.reshape(4, 4, n_lanes).copy()
+    a, b, c, d = x[0], x[1], x[2], x[3]
+    tmp = np.empty_like(a)
+    for _ in range(check_rounds(rounds) // 2):
+        # Column rounds: (0, 4, 8, 12), (1, 5, 9, 13), ...
+        _quarter_rounds(a, b, c, d, tmp)
+        # Diagonal rounds: (0, 5, 10, 15), (1, 6, 11, 12), ... after rotating rows 1 to 3
+        b[:] = np.roll(b, -1, axis=0)
+        c[:] = np.roll(c, -2, axis=0)
+        d[:] = np.roll(d, -3, axis=0)
+        _quarter_rounds(a, b, c, d, tmp)
+        b[:] = np.roll(b, 1, axis=0)
+        c[:] = np.roll(c, 2, axis=0)
+        d[:] = np.roll(d, 3, axis=0)
+    x = x.reshape(16, n_lanes)
+    x += initial
+    return x.T
+
+
+def chacha20_blocks(key, nonce, counter, n_blocks, rounds=CHACHA20_ROUNDS):
+    """
+    Calcule `n_blocks` blocs ChaCha20 consécutifs, une voie par valeur du compteur.
+
+    Paramètres:
+        - key, nonce, counter, n_blocks: Voir `initial_states`.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - numpy.ndarray: Blocs de sortie, (n_blocks, 16) mots uint32.
+    """
+    return chacha20_rounds(initial_states(key, nonce, counter, n_blocks), rounds)
+
+
+def chacha20_keystream(key, nonce, counter, length, rounds=CHACHA20_ROUNDS):
+    """
+    Génère `length` octets de flux de clé à partir du bloc `counter`.
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - counter (int): Compteur du premier bloc.
+        - length (int): Nombre d'octets.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - numpy.ndarray: Flux de clé, `length` octets uint8.
+    """
+    n_blocks = -(-length // 64)
+    blocks = chacha20_blocks(key, nonce, counter, n_blocks, rounds)
+    return np.ascontiguousarray(blocks, dtype="<u4").view(np.uint8).reshape(-1)[:length]
+
+
+def chacha20_xor(key, nonce, data, counter=1, n_workers=1, rounds=CHACHA20_ROUNDS):
+    """
+    Chiffre ou déchiffre des données avec ChaCha20 (RFC 8439, section 2.4).
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - data (bytes, bytearray, memoryview ou numpy.ndarray): Données à chiffrer ou déchiffrer.
+        - counter (int): Compteur du premier bloc (1 dans la RFC 8439, 0 étant réservé
+          à la clé Poly1305 de l'AEAD).
+        - n_workers (int ou None): Nombre de threads (`parallel_encrypt_into`) ; None : un par cœur.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - bytes: Données chiffrées ou déchiffrées.
+
+    Remarque:
+        - Le flux de clé est calculé par tranches de `CHUNK_BLOCKS` blocs.
+    """
+    if n_workers == 1:
+        return bytes(ChaCha20Stream(key, nonce, counter, rounds).update(data))
+    out = bytearray(memoryview(data).nbytes)
+    parallel_encrypt_into(key, nonce, data, out, counter, n_workers, rounds=rounds)
+    return bytes(out)
+
+
+def parallel_encrypt_into(key, nonce, src, dst, counter=1, n_workers=None, segment_blocks=CHUNK_BLOCKS,
+                          rounds=CHACHA20_ROUNDS):
+    """
+    Chiffre (ou déchiffre) un grand tampon sur plusieurs cœurs.
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - src (bytes, bytearray, memoryview ou numpy.ndarray): Données, contiguës.
+        - dst (bytearray, memoryview ou numpy.ndarray): Tampon de sortie modifiable, d'au
+          moins `len(src)` octets ; peut être `src` lui-même.
+        - counter (int): Compteur du premier bloc.
+        - n_workers (int ou None): Nombre de threads (None : un par cœur).
+        - segment_blocks (int): Taille des segments, en blocs de 64 octets.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - int: Nombre d'octets écrits.
+
+    Remarque:
+        - Le tampon est découpé en segments alignés sur les blocs : le segment qui commence
+          à l'octet `start` utilise les blocs à partir de `counter + start // 64`, d'où un
+          résultat identique octet pour octet au chiffrement séquentiel.
+        - Les fonctions universelles de NumPy libèrent le GIL sur les grands tableaux : des
+          threads suffisent, et ils écrivent directement dans `dst`, sans mémoire partagée
+          à gérer ni copie entre processus.
+    """
+    src, dst = byte_view(src), byte_view(dst)
+    n = len(src)
+    if len(dst) < n:
+        raise ValueError(f"Le tampon de sortie est trop petit ({len(dst)} < {n} octets).")
+    segment = segment_blocks * 64
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or n <= segment:
+        return ChaCha20Stream(key, nonce, counter, rounds).encrypt_into(src, dst)
+
+    def encrypt_segment(start):
+        end = min(start + segment, n)
+        ChaCha20Stream(key, nonce, counter + start // 64, rounds).encrypt_into(src[start:end], dst[start:end])
+
+    with ThreadPoolExecutor(n_workers) as pool:
+        # list() re-raises the first exception of a segment
+        list(pool.map(encrypt_segment, range(0, n, segment)))
+    return n
+
+
+def encrypt_file(key, nonce, src_path, dst_path, counter=1, chunk_size=None, n_workers=1,
+                 rounds=CHACHA20_ROUNDS):
+    """
+    Chiffre ou déchiffre un fichier par blocs, en mémoire constante.
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - src_path (str): Fichier à lire.
+        - dst_path (str): Fichier à écrire.
+        - counter (int): Compteur du premier bloc.
+        - chunk_size (int ou None): Taille du tampon de lecture (octets). None : un segment
+          (`CHUNK_BLOCKS * 64` octets) par thread.
+        - n_workers (int ou None): Nombre de threads par tampon (None : un par cœur).
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - int: Nombre d'octets traités.
+
+    Exceptions:
+        - ValueError: Si `n_workers` n'est pas 1 et `chunk_size` n'est pas un multiple de 64.
+
+    Remarque:
+        - Un seul tampon est alloué : chaque bloc lu y est chiffré sur place puis écrit.
+        - Avec plusieurs threads, un tampon d'au plus un segment est chiffré par un seul
+          thread : le tampon par défaut en donne un à chaque thread.
+    """
+    if chunk_size is None:
+        chunk_size = (1 if n_workers == 1 else n_workers or os.cpu_count() or 1) * CHUNK_BLOCKS * 64
+    if n_workers != 1 and chunk_size % 64:
+        raise ValueError(f"La taille du tampon doit être un multiple de 64 octets ({chunk_size}).")
+    stream = ChaCha20Stream(key, nonce, counter, rounds)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    total = 0
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        while True:
+            n = src.readinto(buffer)
+            if not n:
+                break
+            if n_workers == 1:
+                stream.encrypt_into(view[:n], view[:n])
+            else:
+                parallel_encrypt_into(key, nonce, view[:n], view[:n], counter + total // 64, n_workers, rounds=rounds)
+            dst.write(view[:n])
+            total += n
+    return total
+
+
+def chacha20_xor_batch(key, nonces, messages, counter=1, rounds=CHACHA20_ROUNDS):
+    """
+    Chiffre (ou déchiffre) de nombreux messages courts, chacun avec son nonce, en un seul
+    calcul vectorisé.
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets, commune aux messages.
+        - nonces (list of bytes): Nonce de 12 octets de chaque message.
+        - messages (list of bytes-like): Messages, de longueurs quelconques.
+        - counter (int): Compteur du premier bloc de chaque message.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - list of bytes: Messages chiffrés (ou déchiffrés), dans l'ordre.
+
+    Exceptions:
+        - ValueError: Si les listes n'ont pas la même longueur ou si un nonce ne fait pas 12 octets.
+
+    Remarque:
+        - Les blocs de tous les messages forment une seule matrice d'états (16, blocs) :
+          le message i occupe `ceil(len_i / 64)` voies, avec son nonce et les compteurs
+          `counter`, `counter + 1`, ... Les messages sont concaténés, et chaque octet est
+          combiné avec l'octet de flux de clé de même position dans les blocs de son message
+          (les fins de blocs non utilisées sont ignorées).
+    """
+    if len(nonces) != len(messages):
+        raise ValueError(f"{len(nonces)} nonces pour {len(messages)} messages.")
+    if any(len(nonce) != 12 for nonce in nonces):
+        raise ValueError("Chaque nonce doit faire 12 octets.")
+    if not messages:
+        return []
+    lengths = np.array([memoryview(message).nbytes for message in messages], dtype=np.int64)
+    n_blocks = -(-lengths // 64)
+    if counter < 0 or counter + n_blocks.max() > 2**32:
+        raise ValueError("Le compteur de blocs dépasse 32 bits.")
+
+    # One lane per block: message index and block index within the message
+    first_block = np.cumsum(n_blocks) - n_blocks
+    lane_message = np.repeat(np.arange(len(messages)), n_blocks)
+    states = np.empty((16, int(n_blocks.sum())), dtype=np.uint32)
+    states[0:4] = CHACHA20_CONSTANTS[:, None]
+    states[4:12] = key_words(key)[:, None]
+    states[12] = counter + np.arange(states.shape[1]) - first_block[lane_message]
+    states[13:16] = np.frombuffer(b"".join(nonces), dtype="<u4").reshape(-1, 3)[lane_message].T
+    keystream = np.ascontiguousarray(chacha20_rounds(states, rounds), dtype="<u4").view(np.uint8).reshape(-1)
+
+    # Byte j of message i uses keystream byte 64 * first_block[i] + j
+    data = np.frombuffer(b"".join(bytes(message) for message in messages), dtype=np.uint8)
+    first_byte = np.cumsum(lengths) - lengths
+    positions = np.arange(len(data)) + np.repeat(64 * first_block - first_byte, lengths)
+    out = (data ^ keystream[positions]).tobytes()
+    return [out[start:start + length] for start, length in zip(first_byte, lengths)]
+
+
+def decrypt_range(key, nonce, source, offset, length, counter=1, rounds=CHACHA20_ROUNDS):
+    """
+    Déchiffre une plage d'un message chiffré sans déchiffrer ce qui la précède.
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - source (str, fichier binaire ou objet tampon): Chemin du fichier chiffré, fichier
+          ouvert en lecture binaire, ou message chiffré complet en mémoire.
+        - offset (int): Position du premier octet de la plage dans le message.
+        - length (int): Nombre d'octets de la plage (tronqué à la fin du message).
+        - counter (int): Compteur du premier bloc du message.
+        - rounds (int): Nombre de rounds.
+
+    Retourne:
+        - bytearray: Texte clair de la plage.
+
+    Remarque:
+        - Seuls les octets de la plage sont lus et les blocs qui les couvrent calculés :
+          le coût est proportionnel à `length`, pas à la taille du message.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return decrypt_range(key, nonce, f, offset, length, counter, rounds)
+    if hasattr(source, "read"):
+        source.seek(offset)
+        data = source.read(length)
+    else:
+        data = memoryview(source).cast("B")[offset:offset + length]
+    stream = ChaCha20Stream(key, nonce, counter, rounds)
+    stream.seek(offset)
+    return stream.update(data)
+
+
+def test_numpy_block():
+    """
+    Teste `chacha20_blocks` avec le vecteur de la RFC 8439, section 2.3.2.
+
+    Exceptions:
+        - AssertionError: Si le bloc sérialisé ne correspond pas au vecteur.
+    """
+    print("test_numpy_block function")
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000090000004a00000000")
+    expected = bytes.fromhex(
+        "10f1e7e4d13b5915500fdd1fa32071c4c7d1f4c733c068030422aa9ac3d46c4e"
+        "d2826446079faa0914c2d705d98b02a2b5129cd1de164eb9cbd083e8a2503c4e")
+    assert chacha20_keystream(key, nonce, 1, 64).tobytes() == expected
+    print("test_numpy_block : Success")
+
+
+def test_numpy_encrypt():
+    """
+    Teste `chacha20_xor` avec le vecteur de la RFC 8439, section 2.4.2.
+
+    Exceptions:
+        - AssertionError: Si le texte chiffré ou déchiffré ne correspond pas.
+    """
+    print("test_numpy_encrypt function")
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000000000004a00000000")
+    plaintext = (b"Ladies and Gentlemen of the class of '99: If I could offer you only one tip "
+                 b"for the future, sunscreen would be it.")
+    expected = bytes.fromhex(
+        "6e2e359a2568f98041ba0728dd0d6981e97e7aec1d4360c20a27afccfd9fae0b"
+        "f91b65c5524733ab8f593dabcd62b3571639d624e65152ab8f530c359f0861d8"
+        "07ca0dbf500d6a6156a38e088a22b65e52bc514d16ccf806818ce91ab7793736"
+        "5af90bbf74a35be6b40b8eedf2785e42874d")
+    assert chacha20_xor(key, nonce, plaintext) == expected
+    assert chacha20_xor(key, nonce, expected) == plaintext
+    print("test_numpy_encrypt : Success")
+
+
+def test_numpy_keystream():
+    """
+    Teste les deux premiers blocs de l'annexe A.1 de la RFC 8439 (clé et nonce nuls),
+    calculés en une seule fois sur deux voies.
+
+    Exceptions:
+        - AssertionError: Si le flux de clé ne correspond pas aux vecteurs.
+    """
+    print("test_numpy_keystream function")
+    keystream = chacha20_keystream(bytes(32), bytes(12), 0, 128).tobytes()
+    assert keystream[:64] == bytes.fromhex(
+        "76b8e0ada0f13d90405d6ae55386bd28bdd219b8a08ded1aa836efcc8b770dc7"
+        "da41597c5157488d7724e03fb8d84a376a43b8f41518a11cc387b669b2ee6586")
+    assert keystream[64:] == bytes.fromhex(
+        "9f07e7be5551387a98ba977c732d080dcb0f29a048e3656912c6533e32ee7aed"
+        "29b721769ce64e43d57133b074d839d531ed1f28510afb45ace10a1f4b794d6f")
+    print("test_numpy_keystream : Success")
+
+#%% CLASSES
+class ChaCha20Stream:
+    """Chiffrement ChaCha20 en flux, par appels successifs sur des tampons"""
+    def __init__(self, key, nonce, counter=1, rounds=CHACHA20_ROUNDS) -> None:
+        """
+        Paramètres:
+            - key (bytes): Clé de 32 octets.
+            - nonce (bytes): Nonce de 12 octets.
+            - counter (int): Compteur du premier bloc.
+            - rounds (int): Nombre de rounds (20, 12 ou 8).
+        """
+        self.key = key_words(key)
+        self.nonce = nonce_words(nonce)
+        self.rounds = check_rounds(rounds)
+        self.initial_counter = counter              # block of byte offset 0
+        self.counter = counter                      # next block to compute
+        self._block = np.empty(64, dtype=np.uint8)  # last keystream block
+        self._available = 0                         # unused bytes at the end of _block
+
+    def encrypt_into(self, src, dst):
+        """
+        Chiffre (ou déchiffre) `src` dans `dst`, à la suite des appels précédents.
+
+        Paramètres:
+            - src (bytes, bytearray, memoryview ou numpy.ndarray): Données, contiguës.
+            - dst (bytearray, memoryview ou numpy.ndarray): Tampon de sortie modifiable,
+              d'au moins `len(src)` octets ; peut être `src` lui-même (chiffrement sur place).
+
+        Retourne:
+            - int: Nombre d'octets écrits.
+
+        Exceptions:
+            - ValueError: Si `dst` est trop petit.
+
+        Remarque:
+            - Les octets de flux de clé non utilisés du dernier bloc sont conservés pour
+              l'appel suivant : découper un message en appels successifs ne change pas le résultat.
+        """
+        src, dst = byte_view(src), byte_view(dst)
+        n = len(src)
+        if len(dst) < n:
+            raise ValueError(f"Le tampon de sortie est trop petit ({len(dst)} < {n} octets).")
+
+        # Leftover keystream of the previous call
+        done = min(n, self._available)
+        if done:
+            start = 64 - self._available
+            np.bitwise_xor(src[:done], self._block[start:start + done], out=dst[:done])
+            self._available -= done
+
+        chunk = CHUNK_BLOCKS * 64
+        while done < n:
+            length = min(n - done, chunk)
+            n_blocks = -(-length // 64)
+            blocks = chacha20_blocks(self.key, self.nonce, self.counter, n_blocks, self.rounds)
+            keystream = np.ascontiguousarray(blocks, dtype="<u4").view(np.uint8).reshape(-1)
+            self.counter += n_blocks
+            np.bitwise_xor(src[done:done + length], keystream[:length], out=dst[done:done + length])
+            self._available = n_blocks * 64 - length
+            if self._available:
+                self._block[:] = keystream[-64:]
+            done += length
+        return n
+
+    def seek(self, offset):
+        """
+        Place le flux à l'octet `offset` du message, sans calculer les blocs précédents.
+
+        Paramètres:
+            - offset (int): Position en octets depuis le début du message.
+
+        Exceptions:
+            - ValueError: Si la position est négative ou au-delà du compteur 32 bits.
+
+        Remarque:
+            - Le compteur de blocs est `initial_counter + offset // 64` ; si la position
+              tombe au milieu d'un bloc, ce bloc est calculé et ses `offset % 64` premiers
+              octets sont sautés.
+        """
+        if offset < 0:
+            raise ValueError(f"Position négative : {offset}.")
+        block, skip = divmod(offset, 64)
+        self.counter = self.initial_counter + block
+        self._available = 0
+        if skip:
+            blocks = chacha20_blocks(self.key, self.nonce, self.counter, 1, self.rounds)
+            self._block[:] = np.ascontiguousarray(blocks, dtype="<u4").view(np.uint8).reshape(-1)
+            self.counter += 1
+            self._available = 64 - skip
+
+    def tell(self):
+        """Position courante du flux, en octets depuis le début du message."""
+        return (self.counter - self.initial_counter) * 64 - self._available
+
+    def update(self, data):
+        """
+        Chiffre (ou déchiffre) `data`, à la suite des appels précédents.
+
+        Paramètres:
+            - data (bytes, bytearray, memoryview ou numpy.ndarray): Données, contiguës.
+
+        Retourne:
+            - bytearray: Données chiffrées (ou déchiffrées).
+        """
+        out = bytearray(memoryview(data).nbytes)
+        self.encrypt_into(data, out)
+        return out
+
+
+def test_numpy_stream():
+    """
+    Teste `ChaCha20Stream` sur le vecteur de la RFC 8439 (section 2.4.2) découpé en
+    appels de tailles irrégulières, avec des tampons de types différents.
+
+    Exceptions:
+        - AssertionError: Si le résultat dépend du découpage ou du type de tampon.
+    """
+    print("test_numpy_stream function")
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000000000004a00000000")
+    plaintext = (b"Ladies and Gentlemen of the class of '99: If I could offer you only one tip "
+                 b"for the future, sunscreen would be it.")
+    expected = chacha20_xor(key, nonce, plaintext)
+
+    stream = ChaCha20Stream(key, nonce)
+    parts = [stream.update(plaintext[:1]), stream.update(bytearray(plaintext[1:63])),
+             stream.update(memoryview(plaintext)[63:65]), stream.update(np.frombuffer(plaintext[65:], np.uint8))]
+    assert b"".join(parts) == expected
+
+    stream = ChaCha20Stream(key, nonce)
+    dst = np.zeros(len(plaintext), dtype=np.uint8)
+    assert stream.encrypt_into(plaintext[:70], dst[:70]) == 70
+    stream.encrypt_into(plaintext[70:], memoryview(dst)[70:])
+    assert dst.tobytes() == expected
+
+    # In place
+    buffer = bytearray(expected)
+    ChaCha20Stream(key, nonce).encrypt_into(buffer, buffer)
+    assert buffer == plaintext
+    print("test_numpy_stream : Success")
+
+
+def test_numpy_seek():
+    """
+    Teste `ChaCha20Stream.seek` et `decrypt_range` contre le déchiffrement complet, pour
+    des positions au début, au milieu et à la limite d'un bloc.
+
+    Exceptions:
+        - AssertionError: Si une plage déchiffrée diffère du texte clair.
+    """
+    print("test_numpy_seek function")
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000000000004a00000000")
+    plaintext = bytes(range(256)) * 5
+    ciphertext = chacha20_xor(key, nonce, plaintext)
+    for offset, length in ((0, 10), (63, 2), (64, 64), (100, 300), (1200, 500)):
+        assert decrypt_range(key, nonce, ciphertext, offset, length) == plaintext[offset:offset + length]
+    stream = ChaCha20Stream(key, nonce)
+    stream.seek(130)
+    assert stream.tell() == 130
+    assert stream.update(ciphertext[130:131]) == plaintext[130:131]
+    assert stream.tell() == 131
+    print("test_numpy_seek : Success")
+
+
+def test_numpy_parallel():
+    """
+    Teste `parallel_encrypt_into` contre le chiffrement séquentiel, avec de petits
+    segments et une taille de données qui n'est pas un multiple de 64.
+
+    Exceptions:
+        - AssertionError: Si les deux résultats diffèrent.
+    """
+    print("test_numpy_parallel function")
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000000000004a00000000")
+    plaintext = np.random.default_rng(0).integers(0, 256, 64 * 37 + 5, dtype=np.uint8)
+    expected = chacha20_xor(key, nonce, plaintext, counter=7)
+    out = np.empty_like(plaintext)
+    parallel_encrypt_into(key, nonce, plaintext, out, counter=7, n_workers=4, segment_blocks=3)
+    assert out.tobytes() == expected
+    parallel_encrypt_into(key, nonce, out, out, counter=7, n_workers=4, segment_blocks=3)
+    assert out.tobytes() == plaintext.tobytes()
+    print("test_numpy_parallel : Success")
+
+
+def test_numpy_batch():
+    """
+    Teste `chacha20_xor_batch` contre `chacha20_xor` message par message, pour des
+    longueurs variées (dont un message vide et des messages de plusieurs blocs).
+
+    Exceptions:
+        - AssertionError: Si un message chiffré diffère.
+    """
+    print("test_numpy_batch function")
+    key = bytes(range(32))
+    rng = np.random.default_rng(0)
+    messages = [rng.integers(0, 256, size, dtype=np.uint8).tobytes() for size in (0, 1, 63, 64, 65, 200, 1500, 16)]
+    nonces = [rng.integers(0, 256, 12, dtype=np.uint8).tobytes() for _ in messages]
+    batch = chacha20_xor_batch(key, nonces, messages)
+    assert batch == [chacha20_xor(key, nonce, message) for nonce, message in zip(nonces, messages)]
+    assert chacha20_xor_batch(key, nonces, batch) == messages
+    print("test_numpy_batch : Success")
+
+
+def test_numpy_variants():
+    """
+    Teste les variantes ChaCha8 et ChaCha12 : vecteurs à clé et nonce nuls, et
+    chiffrement identique à celui de `chacha_lib`.
+
+    Exceptions:
+        - AssertionError: Si un flux de clé ou un texte chiffré diffère.
+    """
+    print("test_numpy_variants function")
+    import chacha_lib
+    assert chacha20_keystream(bytes(32), bytes(12), 0, 16, rounds=8).tobytes() == bytes.fromhex("3e00ef2f895f40d67f5bb8e81f09a5a1")
+    assert chacha20_keystream(bytes(32), bytes(12), 0, 16, rounds=12).tobytes() == bytes.fromhex("9bf49a6a0755f953811fce125f2683d5")
+    key, nonce = bytes(range(32)), bytes(range(12))
+    plaintext = bytes(range(256)) * 2
+    for rounds in (8, 12):
+        expected = chacha_lib.ChaCha20_cipher(key, rounds=rounds).encrypt(plaintext, nonce)
+        assert chacha20_xor(key, nonce, plaintext, rounds=rounds) == expected
+        assert chacha20_xor_batch(key, [nonce], [plaintext], rounds=rounds) == [expected]
+    print("test_numpy_variants : Success")
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+Chiffrement authentifié ChaCha20-Poly1305 en un passage
+-------------------------------------------------------
+Ce script implémente la construction AEAD ChaCha20-Poly1305 de la RFC 8439 : les
+données sont chiffrées avec ChaCha20 et authentifiées avec Poly1305 au cours du même
+passage, tranche par tranche, pendant que chaque tranche est encore en cache. Le
+scellement (chiffrement + étiquette) et l'ouverture (vérification + déchiffrement)
+fonctionnent en flux, par appels successifs à `update` puis `finalize`.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - `Poly1305` : authentificateur à usage unique (RFC 8439, section 2.5) en flux.
+      L'évaluation du polynôme est vectorisée : chaque bloc de 16 octets est découpé en
+      5 membres de 26 bits (uint64) et multiplié par la puissance de r qui lui revient
+      (tableau de puissances précalculé), puis les produits sont réduits et sommés ;
+      les petits messages passent par la méthode de Horner sur les entiers Python.
+    - `poly1305_key_gen` : clé Poly1305 à usage unique tirée du bloc ChaCha20 de
+      compteur 0 (section 2.6).
+    - `ChaCha20Poly1305Encryptor` / `ChaCha20Poly1305Decryptor` : scellement et
+      ouverture en flux (section 2.8), avec `update`, `encrypt_into` / `decrypt_into`
+      et `finalize`.
+    - `chacha20_poly1305_encrypt` / `chacha20_poly1305_decrypt` : versions en un appel.
+
+Constantes définies :
+    - `POLY1305_P` : Nombre premier 2**130 - 5.
+    - `POLY1305_TAG_SIZE` : Taille de l'étiquette (16 octets).
+    - `POLY1305_BLOCKS` : Nombre maximal de blocs de 16 octets évalués à la fois.
+    - `AEAD_CHUNK` : Taille des tranches chiffrées puis authentifiées ensemble.
+
+Bibliothèques requises :
+    - numpy : Membres de 26 bits et calculs vectorisés.
+    - hmac : Comparaison en temps constant des étiquettes.
+    - chacha_numpy_lib : Flux de clé ChaCha20.
+
+Utilisation prévue :
+    1. `ciphertext, tag = chacha20_poly1305_encrypt(key, nonce, plaintext, aad)`.
+    2. `plaintext = chacha20_poly1305_decrypt(key, nonce, ciphertext, tag, aad)`.
+    3. En flux : `sealer = ChaCha20Poly1305Encryptor(key, nonce, aad)`, des appels à
+       `sealer.update(record)`, puis `tag = sealer.finalize()`.
+
+Tests inclus :
+    - `test_poly1305` : Vecteur de la RFC 8439, section 2.5.2.
+    - `test_poly1305_key_gen` : Vecteur de la section 2.6.2.
+    - `test_chacha20_poly1305` : Vecteur de la section 2.8.2, en un appel et en flux,
+      et rejet d'un message modifié.
+
+Attention :
+    - En ouverture en flux, le texte clair rendu par `update` n'est authentifié qu'après
+      un `finalize` réussi : ne l'utilisez pas avant.
+    - Un nonce ne doit jamais être réutilisé avec la même clé.
+"""
+#%% BIBLIOTHEQUES
+import hmac
+import numpy as np
+from chacha_numpy_lib import ChaCha20Stream, chacha20_keystream, byte_view
+
+#%% CONSTANTES
+POLY1305_P = (1 << 130) - 5
+POLY1305_TAG_SIZE = 16
+POLY1305_BLOCKS = 4096     # 64 KiB of message per vectorised evaluation
+POLY1305_MIN_BLOCKS = 32   # below this, Horner's method on Python integers is faster
+AEAD_CHUNK = 1 << 18        # encrypted then authenticated while still in cache
+LIMB_MASK = (1 << 26) - 1
+
+#%% FONCTIONS
+def _limbs(value):
+    """Membres de 26 bits (5) d'un entier de 130 bits."""
+    return [(value >> (26 * i)) & LIMB_MASK for i in range(5)]
+
+
+def _pad16(length):
+    """Octets nuls complétant `length` à un multiple de 16."""
+    return bytes(-length % 16)
+
+
+def poly1305_key_gen(key, nonce):
+    """
+    Dérive la clé Poly1305 à usage unique d'un message (RFC 8439, section 2.6).
+
+    Paramètres:
+        - key (bytes): Clé ChaCha20 de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+
+    Retourne:
+        - bytes: Les 32 premiers octets du bloc ChaCha20 de compteur 0.
+    """
+    return chacha20_keystream(key, nonce, 0, 32).tobytes()
+
+
+def chacha20_poly1305_encrypt(key, nonce, plaintext, aad=b""):
+    """
+    Chiffre et authentifie un message (RFC 8439, section 2.8).
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - plaintext (bytes, bytearray, memoryview ou numpy.ndarray): Texte clair.
+        - aad (bytes): Données associées, authentifiées mais non chiffrées.
+
+    Retourne:
+        - tuple: (texte chiffré en bytes, étiquette de 16 octets).
+    """
+    sealer = ChaCha20Poly1305Encryptor(key, nonce, aad)
+    ciphertext = sealer.update(plaintext)
+    return bytes(ciphertext), sealer.finalize()
+
+
+def chacha20_poly1305_decrypt(key, nonce, ciphertext, tag, aad=b""):
+    """
+    Vérifie et déchiffre un message (RFC 8439, section 2.8).
+
+    Paramètres:
+        - key (bytes): Clé de 32 octets.
+        - nonce (bytes): Nonce de 12 octets.
+        - ciphertext (bytes, bytearray, memoryview ou numpy.ndarray): Texte chiffré.
+        - tag (bytes): Étiquette de 16 octets.
+        - aad (bytes): Données associées.
+
+    Retourne:
+        - bytes: Texte clair.
+
+    Exceptions:
+        - ValueError: Si l'étiquette ne correspond pas (message ou données associées modifiés).
+    """
+    opener = ChaCha20Poly1305Decryptor(key, nonce, aad)
+    plaintext = opener.update(ciphertext)
+    opener.finalize(tag)
+    return bytes(plaintext)
+
+#%% CLASSES
+class Poly1305:
+    """Authentificateur Poly1305 à usage unique, en flux"""
+    def __init__(self, key) -> None:
+        """
+        Paramètres:
+            - key (bytes): Clé à usage unique de 32 octets (r puis s).
+
+        Exceptions:
+            - ValueError: Si la clé ne fait pas 32 octets.
+        """
+        if len(key) != 32:
+            raise ValueError(f"La clé Poly1305 doit faire 32 octets ({len(key)} reçus).")
+        self.r = int.from_bytes(key[:16], "little") & 0x0ffffffc0ffffffc0ffffffc0fffffff
+        self.s = int.from_bytes(key[16:32], "little")
+        self.acc = 0
+        self._buffer = bytearray()   # incomplete block between updates
+        self._powers = [1]           # r**j mod p
+        self._table = None           # limbs of r**K ... r**1, (5, K) and times 5
+
+    def _power_table(self, k):
+        """Puissances de r en membres de 26 bits, pour au moins `k` blocs."""
+        if self._table is None or self._table[0].shape[1] < k:
+            size = min(POLY1305_BLOCKS, 1 << (k - 1).bit_length())
+            while len(self._powers) <= size:
+                self._powers.append(self._powers[-1] * self.r % POLY1305_P)
+            R = np.array([_limbs(v) for v in self._powers[size:0:-1]], dtype=np.uint64).T.copy()
+            self._table = (R, R * 5)
+        return self._table
+
+    def _process(self, blocks):
+        """Ajoute des blocs complets (tableau uint8 de longueur multiple de 16) à l'accumulateur."""
+        n = len(blocks) // 16
+        if n < POLY1305_MIN_BLOCKS:
+            raw, acc, r = blocks.tobytes(), self.acc, self.r
+            for i in range(0, len(raw), 16):
+                acc = (acc + int.from_bytes(raw[i:i + 16], "little") + (1 << 128)) * r % POLY1305_P
+            self.acc = acc
+            return
+
+        words = blocks.view("<u4").astype(np.uint64).reshape(-1, 4).T
+        R, R5 = self._power_table(min(n, POLY1305_BLOCKS))
+        size = R.shape[1]
+        for start in range(0, n, size):
+            k = min(size, n - start)
+            w = words[:, start:start + k]
+            # Message limbs, with the 2**128 bit of a full block
+            m = (w[0] & LIMB_MASK,
+                 ((w[0] >> 26) | (w[1] << 6)) & LIMB_MASK,
+                 ((w[1] >> 20) | (w[2] << 12)) & LIMB_MASK,
+                 ((w[2] >> 14) | (w[3] << 18)) & LIMB_MASK,
+                 (w[3] >> 8) | (1 << 24))
+            # Block i is multiplied by r**(k - i): limbs of the products modulo 2**130 - 5
+            r, r5 = R[:, size - k:], R5[:, size - k:]
+            h = np.empty((5, k), dtype=np.uint64)
+            for i in range(5):
+                h[i] = m[0] * r[i]
+                for j in range(1, 5):
+                    h[i] += m[j] * (r[i - j] if j <= i else r5[i - j + 5])
+            # Carry propagation keeps each limb near 26 bits, so that the sum cannot overflow
+            for i in range(4):
+                h[i + 1] += h[i] >> 26
+                h[i] &= LIMB_MASK
+            h[0] += (h[4] >> 26) * 5
+            h[4] &= LIMB_MASK
+            total = sum(int(limb) << (26 * i) for i, limb in enumerate(h.sum(axis=1)))
+            self.acc = (self.acc * self._powers[k] + total) % POLY1305_P
+
+    def update(self, data):
+        """
+        Ajoute des données au message authentifié.
+
+        Paramètres:
+            - data (bytes, bytearray, memoryview ou numpy.ndarray): Données, contiguës.
+        """
+        data = byte_view(data)
+        start = 0
+        if self._buffer:
+            start = min(16 - len(self._buffer), len(data))
+            self._buffer += data[:start].tobytes()
+            if len(self._buffer) < 16:
+                return
+            self._process(np.frombuffer(bytes(self._buffer), dtype=np.uint8))
+            self._buffer.clear()
+        end = start + (len(data) - start) // 16 * 16
+        if end > start:
+            self._process(data[start:end])
+        self._buffer += data[end:].tobytes()
+
+    def digest(self):
+        """
+        Termine le calcul.
+
+        Retourne:
+            - bytes: Étiquette de 16 octets.
+
+        Remarque:
+            - Un dernier bloc incomplet est complété par un octet 0x01 (section 2.5.1).
+        """
+        acc = self.acc
+        if self._buffer:
+            acc = (acc + int.from_bytes(bytes(self._buffer) + b"\x01", "little")) * self.r % POLY1305_P
+        return ((acc + self.s) & ((1 << 128) - 1)).to_bytes(16, "little")
+
+
+class ChaCha20Poly1305Encryptor:
+    """Scellement ChaCha20-Poly1305 en flux"""
+    def __init__(self, key, nonce, aad=b"") -> None:
+        """
+        Paramètres:
+            - key (bytes): Clé de 32 octets.
+            - nonce (bytes): Nonce de 12 octets.
+            - aad (bytes): Données associées, authentifiées mais non chiffrées.
+        """
+        self.stream = ChaCha20Stream(key, nonce, counter=1)
+        self.mac = Poly1305(poly1305_key_gen(key, nonce))
+        self.mac.update(aad)
+        self.mac.update(_pad16(len(aad)))
+        self.aad_length = len(aad)
+        self.length = 0
+
+    def encrypt_into(self, src, dst):
+        """
+        Chiffre `src` dans `dst` et authentifie le texte chiffré, tranche par tranche.
+
+        Paramètres:
+            - src (bytes, bytearray, memoryview ou numpy.ndarray): Texte clair, contigu.
+            - dst (bytearray, memoryview ou numpy.ndarray): Tampon de sortie modifiable
+              (peut être `src`).
+
+        Retourne:
+            - int: Nombre d'octets écrits.
+        """
+        src, dst = byte_view(src), byte_view(dst)
+        for start in range(0, len(src), AEAD_CHUNK):
+            end = min(start + AEAD_CHUNK, len(src))
+            self.stream.encrypt_into(src[start:end], dst[start:end])
+            self.mac.update(dst[start:end])
+        self.length += len(src)
+        return len(src)
+
+    def update(self, data):
+        """
+        Chiffre et authentifie une partie du message.
+
+        Paramètres:
+            - data (bytes, bytearray, memoryview ou numpy.ndarray): Texte clair.
+
+        Retourne:
+            - bytearray: Texte chiffré.
+        """
+        out = bytearray(memoryview(data).nbytes)
+        self.encrypt_into(data, out)
+        return out
+
+    def finalize(self):
+        """
+        Termine le message.
+
+        Retourne:
+            - bytes: Étiquette de 16 octets.
+        """
+        self.mac.update(_pad16(self.length))
+        self.mac.update(self.aad_length.to_bytes(8, "little") + self.length.to_bytes(8, "little"))
+        return self.mac.digest()
+
+
+class ChaCha20Poly1305Decryptor:
+    """Ouverture ChaCha20-Poly1305 en flux"""
+    def __init__(self, key, nonce, aad=b"") -> None:
+        """
+        Paramètres:
+            - key (bytes): Clé de 32 octets.
+            - nonce (bytes): Nonce de 12 octets.
+            - aad (bytes): Données associées, identiques à celles du scellement.
+        """
+        self.stream = ChaCha20Stream(key, nonce, counter=1)
+        self.mac = Poly1305(poly1305_key_gen(key, nonce))
+        self.mac.update(aad)
+        self.mac.update(_pad16(len(aad)))
+        self.aad_length = len(aad)
+        self.length = 0
+
+    def decrypt_into(self, src, dst):
+        """
+        Authentifie `src` et le déchiffre dans `dst`, tranche par tranche.
+
+        Paramètres:
+            - src (bytes, bytearray, memoryview ou numpy.ndarray): Texte chiffré, contigu.
+            - dst (bytearray, memoryview ou numpy.ndarray): Tampon de sortie modifiable
+              (peut être `src`).
+
+        Retourne:
+            - int: Nombre d'octets écrits.
+        """
+        src, dst = byte_view(src), byte_view(dst)
+        for start in range(0, len(src), AEAD_CHUNK):
+            end = min(start + AEAD_CHUNK, len(src))
+            self.mac.update(src[start:end])
+            self.stream.encrypt_into(src[start:end], dst[start:end])
+        self.length += len(src)
+        return len(src)
+
+    def update(self, data):
+        """
+        Authentifie et déchiffre une partie du message.
+
+        Paramètres:
+            - data (bytes, bytearray, memoryview ou numpy.ndarray): Texte chiffré.
+
+        Retourne:
+            - bytearray: Texte clair, non authentifié avant `finalize`.
+        """
+        out = bytearray(memoryview(data).nbytes)
+        self.decrypt_into(data, out)
+        return out
+
+    def finalize(self, tag):
+        """
+        Termine le message et vérifie son étiquette.
+
+        Paramètres:
+            - tag (bytes): Étiquette de 16 octets reçue.
+
+        Exceptions:
+            - ValueError: Si l'étiquette ne correspond pas.
+        """
+        self.mac.update(_pad16(self.length))
+        self.mac.update(self.aad_length.to_bytes(8, "little") + self.length.to_bytes(8, "little"))
+        if not hmac.compare_digest(self.mac.digest(), bytes(tag)):
+            raise ValueError("Étiquette Poly1305 invalide : message ou données associées modifiés.")
+
+
+def test_poly1305():
+    """
+    Teste `Poly1305` avec le vecteur de la RFC 8439, section 2.5.2, en un appel, par
+    petits morceaux, et sur un long message (chemin vectorisé) contre la méthode de Horner.
+
+    Exceptions:
+        - AssertionError: Si une étiquette ne correspond pas.
+    """
+    print("test_poly1305 function")
+    key = bytes.fromhex("85d6be7857556d337f4452fe42d506a80103808afb0db2fd4abff6af4149f51b")
+    message = b"Cryptographic Forum Research Group"
+    expected = bytes.fromhex("a8061dc1305136c6c22b8baf0c0127a9")
+    mac = Poly1305(key)
+    mac.update(message)
+    assert mac.digest() == expected
+    mac = Poly1305(key)
+    for i in range(0, len(message), 5):
+        mac.update(message[i:i + 5])
+    assert mac.digest() == expected
+
+    message = np.random.default_rng(0).integers(0, 256, 16 * 5000 + 7, dtype=np.uint8).tobytes()
+    mac = Poly1305(key)
+    mac.update(message[:16 * 40 + 3])
+    mac.update(message[16 * 40 + 3:])
+    reference = Poly1305(key)
+    for i in range(0, len(message), 16):
+        reference.update(message[i:i + 16])
+    assert mac.digest() == reference.digest()
+    print("test_poly1305 : Success")
+
+
+def test_poly1305_key_gen():
+    """
+    Teste `poly1305_key_gen` avec le vecteur de la RFC 8439, section 2.6.2.
+
+    Exceptions:
+        - AssertionError: Si la clé ne correspond pas.
+    """
+    print("test_poly1305_key_gen function")
+    key = bytes(range(0x80, 0xa0))
+    nonce = bytes.fromhex("000000000001020304050607")
+    assert poly1305_key_gen(key, nonce) == bytes.fromhex(
+        "8ad5a08b905f81cc815040274ab29471a833b637e3fd0da508dbb8e2fdd1a646")
+    print("test_poly1305_key_gen : Success")
+
+
+def test_chacha20_poly1305():
+    """
+    Teste le scellement et l'ouverture avec le vecteur de la RFC 8439, section 2.8.2.
+
+    Exceptions:
+        - AssertionError: Si le texte chiffré ou l'étiquette ne correspondent pas, ou si un
+          message modifié est accepté.
+    """
+    print("test_chacha20_poly1305 function")
+    key = bytes(range(0x80, 0xa0))
+    nonce = bytes.fromhex("070000004041424344454647")
+    aad = bytes.fromhex("50515253c0c1c2c3c4c5c6c7")
+    plaintext = (b"Ladies and Gentlemen of the class of '99: If I could offer you only one tip "
+                 b"for the future, sunscreen would be it.")
+    expected = bytes.fromhex(
+        "d31a8d34648e60db7b86afbc53ef7ec2a4aded51296e08fea9e2b5a736ee62d6"
+        "3dbea45e8ca9671282fafb69da92728b1a71de0a9e060b2905d6a5b67ecd3b36"
+        "92ddbd7f2d778b8c9803aee328091b58fab324e4fad675945585808b4831d7bc"
+        "3ff4def08e4b7a9de576d26586cec64b6116")
+    expected_tag = bytes.fromhex("1ae10b594f09e26a7e902ecbd0600691")
+
+    ciphertext, tag = chacha20_poly1305_encrypt(key, nonce, plaintext, aad)
+    assert ciphertext == expected and tag == expected_tag
+    assert chacha20_poly1305_decrypt(key, nonce, ciphertext, tag, aad) == plaintext
+
+    # Streaming, split at arbitrary positions
+    sealer = ChaCha20Poly1305Encryptor(key, nonce, aad)
+    parts = [sealer.update(plaintext[:10]), sealer.update(plaintext[10:99]), sealer.update(plaintext[99:])]
+    assert b"".join(parts) == expected and sealer.finalize() == expected_tag
+    opener = ChaCha20Poly1305Decryptor(key, nonce, aad)
+    assert opener.update(expected[:50]) + opener.update(expected[50:]) == plaintext
+    opener.finalize(expected_tag)
+
+    # Tampered ciphertext and associated data
+    tampered = bytearray(expected)
+    tampered[0] ^= 1
+    for args in ((bytes(tampered), expected_tag, aad), (expected, expected_tag, aad[:-1])):
+        try:
+            chacha20_poly1305_decrypt(key, nonce, *args)
+        except ValueError:
+            continue
+        raise AssertionError("Message modifié accepté.")
+    print("test_chacha20_poly1305 : Success")
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Réserve de flux de clé ChaCha20 calculée en arrière-plan
+--------------------------------------------------------
+Ce script implémente une réserve de flux de clé pour le chiffrement de petits paquets
+de télémétrie à faible latence : un thread calcule à l'avance les blocs ChaCha20 d'un
+couple clé / nonce dans un tampon circulaire borné, et chiffrer un paquet se réduit à
+un XOR vectorisé avec des octets de flux de clé déjà prêts.
+
+Auteurs:
+    Baptiste Lacotte
+    Can Kaya
+    Louis Simonnet
+    Lila Bourdeau
+
+Date de création:
+    2026/10/19
+
+Description des fonctionnalités :
+    - Tampon circulaire de `capacity` octets, rempli par tranches de `refill_blocks`
+      blocs par un thread producteur dès qu'il a la place ; les paquets plus grands que
+      `capacity - refill_blocks * 64` octets sont servis en plusieurs morceaux.
+    - `encrypt_into` / `update` : consomme les octets de flux de clé dans l'ordre du
+      compteur de blocs, donc le résultat est identique à `chacha20_xor` sur la
+      concaténation des paquets.
+    - Statistiques (`stats`) : paquets servis directement par la réserve (succès), ou
+      après attente du producteur (échecs), octets et temps total d'attente.
+    - Une erreur du producteur (par exemple le dépassement du compteur de blocs sur 32
+      bits) est conservée et relancée dans `encrypt_into` au lieu de le bloquer.
+
+Bibliothèques requises :
+    - threading : Thread producteur et synchronisation.
+    - numpy : Tampon circulaire et XOR vectorisé.
+    - chacha_lib : Variantes de ChaCha (nombre de rounds).
+    - chacha_numpy_lib : Calcul des blocs ChaCha20.
+
+Utilisation :
+    with KeystreamReservoir(key, nonce) as reservoir:
+        for packet in packets:
+            send(reservoir.update(packet))
+        print(reservoir.stats())
+
+Remarques :
+    - Les calculs NumPy du producteur libèrent le GIL : il progresse pendant que le
+      programme attend le réseau ou les capteurs.
+    - Une réserve correspond à un seul message ChaCha20 (un nonce) ; les paquets en sont
+      des tranches successives et doivent être déchiffrés dans le même ordre.
+"""
+
+#%% BIBLIOTHEQUES
+import time
+import threading
+import numpy as np
+from chacha_lib import CHACHA20_ROUNDS, check_rounds
+from chacha_numpy_lib import chacha20_blocks, key_words, nonce_words, byte_view, chacha20_xor
+
+#%% CLASSES
+class KeystreamReservoir:
+    """Flux de clé ChaCha20 précalculé par un thread dans un tampon circulaire borné"""
+    def __init__(self, key, nonce, counter=1, capacity_blocks=4096, refill_blocks=1024, rounds=CHACHA20_ROUNDS) -> None:
+        """
+        Paramètres:
+            - key (bytes): Clé de 32 octets.
+            - nonce (bytes): Nonce de 12 octets.
+            - counter (int): Compteur du premier bloc.
+            - capacity_blocks (int): Taille du tampon circulaire, en blocs de 64 octets.
+            - refill_blocks (int): Blocs calculés à chaque passage du producteur ; un
+              diviseur de `capacity_blocks`, au plus sa moitié.
+            - rounds (int): Nombre de rounds (20, 12 ou 8).
+
+        Exceptions:
+            - ValueError: Si `refill_blocks` ne divise pas `capacity_blocks` ou dépasse sa moitié.
+        """
+        if capacity_blocks % refill_blocks or capacity_blocks < 2 * refill_blocks:
+            raise ValueError(f"refill_blocks ({refill_blocks}) doit diviser capacity_blocks ({capacity_blocks}) "
+                             "et en être au plus la moitié.")
+        self.key = key_words(key)
+        self.nonce = nonce_words(nonce)
+        self.rounds = check_rounds(rounds)
+        self.counter = counter               # next block computed by the producer
+        self.capacity = capacity_blocks * 64
+        self.refill_blocks = refill_blocks
+        self.ring = np.empty(self.capacity, dtype=np.uint8)
+        self.produced = 0                    # total keystream bytes written
+        self.consumed = 0                    # total keystream bytes used
+        self.hits = 0
+        self.misses = 0
+        self.wait_s = 0.0
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.error = None                    # exception raised by the producer
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """Démarre le thread producteur."""
+        self.running = True
+        self.thread = threading.Thread(target=self._produce, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Arrête le thread producteur."""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _produce(self):
+        """Boucle du producteur : remplit le tampon dès qu'une tranche y tient."""
+        size = self.refill_blocks * 64
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: not self.running or self.capacity - (self.produced - self.consumed) >= size)
+                if not self.running:
+                    return
+                start = self.produced % self.capacity
+            # Free space is never read by the consumer: computed without the lock
+            try:
+                blocks = chacha20_blocks(self.key, self.nonce, self.counter, self.refill_blocks, self.rounds)
+            except Exception as error:
+                # Reported to the consumer instead of leaving it waiting
+                with self.condition:
+                    self.error = error
+                    self.running = False
+                    self.condition.notify_all()
+                return
+            self.ring[start:start + size] = np.ascontiguousarray(blocks, dtype="<u4").view(np.uint8).reshape(-1)
+            self.counter += self.refill_blocks
+            with self.condition:
+                self.produced += size
+                self.condition.notify_all()
+
+    def encrypt_into(self, src, dst):
+        """
+        Chiffre (ou déchiffre) un paquet avec les octets suivants du flux de clé.
+
+        Paramètres:
+            - src (bytes, bytearray, memoryview ou numpy.ndarray): Paquet, contigu.
+            - dst (bytearray, memoryview ou numpy.ndarray): Tampon de sortie modifiable.
+
+        Retourne:
+            - int: Nombre d'octets écrits.
+
+        Exceptions:
+            - RuntimeError: Si le producteur n'est pas démarré, ou s'est arrêté (erreur du
+              producteur, relancée comme cause, ou `close`) avant d'avoir produit assez
+              de flux de clé.
+            - ValueError: Si `dst` est trop petit.
+        """
+        if self.thread is None:
+            raise RuntimeError("La réserve n'est pas démarrée (start() ou bloc with).")
+        src, dst = byte_view(src), byte_view(dst)
+        n = len(src)
+        if len(dst) < n:
+            raise ValueError(f"Le tampon de sortie est trop petit ({len(dst)} < {n} octets).")
+        done = 0
+        while done < n:
+            # Large packets are served in pieces that leave room for one refill,
+            # otherwise the producer could not make progress while we wait
+            length = min(n - done, self.capacity - self.refill_blocks * 64)
+            with self.condition:
+                if self.produced - self.consumed >= length:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    t0 = time.perf_counter()
+                    self.condition.wait_for(lambda: self.produced - self.consumed >= length or not self.running)
+                    self.wait_s += time.perf_counter() - t0
+                    if self.produced - self.consumed < length:
+                        if self.error is not None:
+                            raise RuntimeError("Le producteur de flux de clé s'est arrêté sur une erreur.") from self.error
+                        raise RuntimeError("La réserve a été fermée.")
+                start = self.consumed % self.capacity
+            # The producer never overwrites unconsumed keystream: XOR without the lock
+            first = min(length, self.capacity - start)
+            np.bitwise_xor(src[done:done + first], self.ring[start:start + first], out=dst[done:done + first])
+            if first < length:
+                np.bitwise_xor(src[done + first:done + length], self.ring[:length - first],
+                               out=dst[done + first:done + length])
+            with self.condition:
+                self.consumed += length
+                self.condition.notify_all()
+            done += length
+        return n
+
+    def update(self, data):
+        """
+        Chiffre (ou déchiffre) un paquet.
+
+        Paramètres:
+            - data (bytes, bytearray, memoryview ou numpy.ndarray): Paquet.
+
+        Retourne:
+            - bytearray: Paquet chiffré.
+        """
+        out = bytearray(memoryview(data).nbytes)
+        self.encrypt_into(data, out)
+        return out
+
+    def stats(self):
+        """
+        Statistiques d'utilisation de la réserve.
+
+        Retourne:
+            - dict: `hits`, `misses`, `hit_rate`, `bytes`, `wait_s` (attente totale du
+              producteur) et `available` (octets prêts).
+        """
+        with self.condition:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "bytes": self.consumed,
+                "wait_s": self.wait_s,
+                "available": self.produced - self.consumed,
+            }
+
+#%% FONCTIONS
+def test_reservoir():
+    """
+    Teste `KeystreamReservoir` : des paquets de tailles variées, dont un plus grand que
+    le tampon, doivent donner le même résultat que `chacha20_xor` sur leur concaténation,
+    et une erreur du producteur doit être relancée chez le consommateur.
+
+    Exceptions:
+        - AssertionError: Si les résultats diffèrent ou si les statistiques sont incohérentes.
+    """
+    print("test_reservoir function")
+    key = bytes(range(32))
+    nonce = bytes.fromhex("000000000000004a00000000")
+    rng = np.random.default_rng(0)
+    packets = [rng.integers(0, 256, size, dtype=np.uint8).tobytes() for size in (16, 1500, 1, 64, 700, 5000, 33)]
+    with KeystreamReservoir(key, nonce, capacity_blocks=32, refill_blocks=8) as reservoir:
+        ciphertext = b"".join(reservoir.update(packet) for packet in packets)
+        stats = reservoir.stats()
+    assert ciphertext == chacha20_xor(key, nonce, b"".join(packets))
+    assert stats["bytes"] == len(ciphertext) and stats["hits"] + stats["misses"] >= len(packets)
+
+    # Producer error (32-bit block counter overflow): raised, not waited on forever
+    with KeystreamReservoir(key, nonce, counter=2**32 - 8, capacity_blocks=32, refill_blocks=8) as reservoir:
+        reservoir.update(bytes(512))
+        try:
+            reservoir.update(bytes(64))
+            raise AssertionError("L'erreur du producteur n'a pas été relancée.")
+        except RuntimeError as error:
+            assert isinstance(error.__cause__, ValueError)
+    print("test_reservoir : Success")
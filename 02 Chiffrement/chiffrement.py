@@ -18,14 +18,19 @@ Date de création:
 
 Description des fonctionnalités :
     - Exécution de tests pour valider les fonctions de l'algorithme ChaCha20.
+    - Création d'une clé de 32 octets (SHA-256 d'une phrase secrète) et d'un nonce
+      aléatoire de 12 octets.
     - Création d'un contexte ChaCha20 pour gérer l'état du chiffrement.
-    - Génération de clés hexadécimales pour le nonce et la clé de chiffrement.
     - Chiffrement d'un texte clair en texte chiffré.
     - Déchiffrement du texte chiffré et comparaison avec le texte d'origine.
     - Affichage des résultats pour validation.
 
 Bibliothèques requises :
     - chacha_lib : Bibliothèque personnalisée contenant les fonctions ChaCha20.
+    - chacha_numpy_lib : Version vectorisée (NumPy) du flux de clé ChaCha20.
+    - chacha_poly1305_lib : Chiffrement authentifié ChaCha20-Poly1305.
+    - chacha_reservoir_lib : Réserve de flux de clé calculée en arrière-plan.
+    - chacha_backends_lib : Choix de l'implémentation la plus rapide.
 
 Utilisation :
     Ce programme peut être utilisé pour des projets impliquant des démonstrations 
@@ -33,35 +38,51 @@ Utilisation :
     permettent d'explorer et de comprendre les principes de cet algorithme.
 """
 
+import os
+import hashlib
 import chacha_lib as lib
+import chacha_numpy_lib as nlib
+import chacha_poly1305_lib as alib
+import chacha_reservoir_lib as rlib
+import chacha_backends_lib as blib
 
 if(lib.TEST) :
         lib.test_quarter_round()
         lib.test_state_quarter_round()
         lib.test_chacha20_ops()
+        lib.test_chacha_variants()
+        nlib.test_numpy_block()
+        nlib.test_numpy_encrypt()
+        nlib.test_numpy_keystream()
+        nlib.test_numpy_stream()
+        nlib.test_numpy_seek()
+        nlib.test_numpy_parallel()
+        nlib.test_numpy_batch()
+        nlib.test_numpy_variants()
+        alib.test_poly1305()
+        alib.test_poly1305_key_gen()
+        alib.test_chacha20_poly1305()
+        rlib.test_reservoir()
+        blib.test_backends()
 else :
 
-        # création du contexte
-        ctx = lib.ChaCha20_ctx([0]*lib.CHACHA20_STATE_SIZE * 2,0)
+        # création de la clé (32 octets) à partir d'une phrase secrète
+        key = hashlib.sha256("This is a key".encode("utf-8")).digest()
 
-        # création du nonce
-        nonce = lib.generate_hex_key("This is a nonce")
-        if len(nonce) != lib.CHACHA20_KEY_SIZE :
-            nonce = str(nonce) + "0"*(2*lib.CHACHA20_KEY_SIZE - len(nonce))
+        # création du nonce (12 octets, jamais réutilisé avec la même clé)
+        nonce = os.urandom(lib.CHACHA20_IV_SIZE)
 
-        # création de la clé
-        key = lib.generate_hex_key("This is a key")
-        if len(key) != lib.CHACHA20_KEY_SIZE :
-            key = str(key) + "0"*(2*lib.CHACHA20_KEY_SIZE - len(key)) # A vérifier (*2 ?)
+        # création du contexte, une fois par clé
+        cipher = lib.ChaCha20_cipher(key)
 
         # création du plaintext
         plaintext = "This is a highly secret message containing highly secrets informations"
 
         # encryption du plaintext
-        ciphertext = lib.chacha20_encrypt(ctx,plaintext,key,nonce)
+        ciphertext = cipher.encrypt(plaintext,nonce)
 
         # # decryption du plaintext
-        new_plaintext = lib.chacha20_decrypt(ctx,ciphertext,key,nonce).decode("utf-8")
+        new_plaintext = cipher.decrypt(ciphertext,nonce).decode("utf-8")
 
         # vérification du plaintext
         if plaintext == new_plaintext :